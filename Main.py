@@ -1,47 +1,95 @@
 import customtkinter as ctk
-import cv2
-import face_recognition
-import numpy as np
 import os
 import sys
 import time
-import random
 import threading
-from PIL import Image, ImageTk
 import tkinter as tk
-from pyzbar.pyzbar import decode
-import urllib3
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 project_root = os.path.dirname(os.path.abspath(__file__))
 if project_root not in sys.path: sys.path.insert(0, project_root)
 
+# Modul berat baru ke-import pas pertama dipake (atau udah duluan di-preload)
+from lib.lazy import lazy_import
+cv2 = lazy_import("cv2")
+ImageTk = lazy_import("PIL.ImageTk")
+
 try:
     from context.AuthContext import auth_context
     from lib.api import init_api 
     from lib.api_base import get_api_base_url
-except ImportError:
-    print("❌ Import Error"); sys.exit(1)
-
-import mediapipe as mp
+    from lib.audit import AuditStore
+    from lib.auth_manager import AuthManager
+    from lib.calibration import DEFAULT_PROFILE, PROFILES
+    from lib.evidence import SnapshotWriter
+    from lib import gallery
+    from lib.face_chip import crop_face_region, scale_box
+    from lib.face_detect import create_detector
+    from lib.face_quality import QualityThresholds, assess_face
+    from lib.frame_pool import FramePool, to_display_image
+    from lib.gallery_store import save_gallery_store
+    from lib.landmark_encoder import encode_aligned_batch, encode_locations_batch, five_points, landmarks_match_box
+    from lib.motion import MotionGate
+    from lib.result_bus import ResultBus
+    from lib.tracing import Tracer, WORKERS_TID, now as trace_now
+    from lib.tracking import CHALLENGE, PROCESSING_API, STANDBY, SUCCESS, FaceTracker, css_to_box, liveness_moves
+    from lib.preload import MAX_FACES, Preloader
+    from Scanner import decode_centers
+except ImportError as e:
+    print(f"❌ Import Error: {e}"); sys.exit(1)
 
 class AppSIMPEL(ctk.CTk):
-    def __init__(self):
+    def __init__(self, preloaded=None):
+        """
+        Args:
+            preloaded: lib.preload.Preloader yang udah jalan (opsional). Kalo gak ada,
+                AppSIMPEL bikin & start sendiri. Kamera, FaceMesh, encoder, galeri,
+                dan koneksi API warm-up barengan, UI gak nungguin.
+        """
         super().__init__()
+        self.preloaded = preloaded
         
         # API & Auth
         self.auth = auth_context  # Store auth context reference
         self.api_base_url = get_api_base_url()
         self.api = init_api(self.api_base_url) 
-        if not self.auth.is_authenticated(): self.show_login_required(); return
-        self.api.set_token(self.auth.get_token())
+        self.auth_manager = AuthManager(self.auth, self.api)
+        # Token hasil restore session.json dicek lokal, yang expired gak usah dicoba ke server
+        if not self.auth_manager.validate_session(): self.show_login_required(); return
+        # Renew gagal sampe token expired: thread auth gak boleh nyentuh Tk, dioper ke main thread
+        self.auth_manager.add_expired_listener(lambda: self.after(0, self.on_session_expired))
+        self.auth_manager.start() # Auto-renew token sebelum expired
+
+        # --- Network Config ---
+        self.KEEPALIVE_INTERVAL = 30 # detik, 0 = keep-alive ping mati
+        if self.KEEPALIVE_INTERVAL: self.api.start_keepalive(self.KEEPALIVE_INTERVAL)
+
+        # Audit log tiap percobaan scan (SQLite WAL, ditulis thread background)
+        self.audit = AuditStore(os.path.join(project_root, "audit", "audit.db")).start()
+        # Bukti tiap ScanQrPeminjaman/ScanQrPengembalian (wajah + frame QR), ditulis di background
+        self.snapshots = SnapshotWriter(os.path.join(project_root, "evidence")).start()
+        # Tracing transaksi QR -> state -> API, file Chrome trace di traces/ (lib.tracing)
+        self.TRACE_SAMPLE_RATE = 0.1 # Peluang transaksi biasa disimpen
+        self.TRACE_KEEP_SLOW_MS = 8000 # Transaksi selama ini (atau error) selalu disimpen
+        self.tracer = Tracer(os.path.join(project_root, "traces"), self.TRACE_SAMPLE_RATE, self.TRACE_KEEP_SLOW_MS)
+        self.api.tracer = self.tracer
 
         # --- Performance Config ---
-        self.FR_SCALING = 0.2
-        self.FR_TOLERANCE = 0.60
-        self.BR_THRESHOLD = 95
-        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        # FR_SCALING, FR_TOLERANCE, BR_THRESHOLD, ukuran mesh & interval dari profil performa
+        # (lib.calibration); default dulu, profil hasil kalibrasi host diterapin di poll_startup
+        self.perf_profile = None
+        self.profile_applied = False
+        self.apply_profile(PROFILES[DEFAULT_PROFILE])
+        self.FR_DETECTOR = "hog" # "hog" / "haar" / "dnn" / "landmarks" (lib.face_detect)
+        self.FR_LANDMARK_ENCODER = True # Alignment dari landmark MediaPipe, skip shape predictor dlib
+        self.clahe = gallery.create_clahe()
+        # Quality gate: cuma frame yang lolos yang di-encode, yang terbaik dalam window yang dipake
+        self.FACE_QUALITY = QualityThresholds()
+        # Idle mode: gak ada wajah/QR selama IDLE_AFTER detik -> cuma frame differencing, loop diperlambat
+        self.IDLE_AFTER = 20
+        self.IDLE_INTERVAL = 100 # ms per tick pas idle (aktif FRAME_INTERVAL)
+        self.IDLE_RENDER_EVERY = 2 # render tiap N tick idle
+        self.MOTION_THRESHOLD = 6.0
+        self.MAX_FACES = MAX_FACES # Orang yang di-track barengan (max_num_faces FaceMesh)
         
         # Window
         self.title("🛡️ SIMPEL - Ultra Performance")
@@ -49,66 +97,130 @@ class AppSIMPEL(ctk.CTk):
         self.after(0, lambda: self.state('zoomed'))
         ctk.set_appearance_mode("dark")
 
-        # Engines
-        self.known_face_encodings = []
-        self.known_face_names = []
-        self.load_known_faces()
-        
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        # Engines (diisi pas task startup-nya kelar, lihat poll_startup)
+        # br_threshold galeri diambil dari profil (sama kayak GalleryWatcher), bukan default di atas
+        self.startup = preloaded or Preloader(os.path.join(project_root, "assets"), api=self.api).start()
+        self.face_gallery = None # lib.gallery.FaceGallery, di-swap atomik sama GalleryWatcher
+        self.gallery_watcher = None
+        self.gallery_ready = False # Galeri lokal ke-load, atau matching lewat match daemon (lib.match_service)
+        self.local_gallery_loading = False
+        self.face_mesh = None
+        self.cap = None
 
         # Threading Flags
-        self.face_data_lock = threading.Lock()
         self.is_qr_processing = False
         self.is_detecting_face = False
         self.is_identifying_face = False
         self.is_mesh_processing = False # 🔥 New Flag for MediaPipe
         
+        # Worker gak nulis state app langsung: hasilnya di-publish ke bus dengan seq frame sumber,
+        # main thread yang nerapin (apply_results), hasil basi dibuang
+        self.frame_seq = 0
+        self.results = ResultBus()
+        self.seen_seq = {} # stage -> seq hasil terakhir yang udah diterapin
+
         self.cached_face_locations = None
-        self.cached_rgb_small = None
-        self.last_known_lms = None
+        # Tiap wajah punya state sendiri (identitas, QR, challenge, state transaksi), lihat lib.tracking
+        self.tracker = FaceTracker(self.MAX_FACES, best_frame_window=self.BEST_FRAME_WINDOW,
+                                   on_drop=self.on_track_dropped)
+        # Buffer frame di-reuse tiap tick (lib.frame_pool), worker minjem view read-only
+        self.frame_pool = FramePool()
+        self.raw_frame = None # Buffer cap.read(), dipake ulang tiap tick
+        self.motion_gate = MotionGate(self.IDLE_AFTER, self.MOTION_THRESHOLD)
+        self.idle_ticks = 0
+        self.last_qr_at = 0
+        self.face_detector = None # Dibikin di detect worker pertama (biar cv2/model gak ke-load di __init__)
+        self.last_face_quality = None # lib.face_quality.FaceQuality terakhir (debug)
         
+        self.last_qr_scan_time = 0
         self.last_detect_time = 0
         self.last_identify_time = 0
+        self.api_degraded = False # Circuit breaker OPEN = server offline
         
         self.reset_all_states()
         self.setup_ui()
         
-        # Camera
-        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        self.cap.set(cv2.CAP_PROP_FPS, 30) # Lock camera ke 30 FPS
+        self.first_frame_at = None # perf_counter pas frame pertama tampil (buat benchmark startup)
         
+        self.poll_startup()
         self.update_frame()
 
+    def apply_profile(self, profile):
+        """Terapin lib.calibration.PerfProfile (ukuran capture dipake Preloader pas buka kamera)"""
+        self.perf_profile = profile
+        self.FR_SCALING = profile.fr_scaling
+        self.FR_TOLERANCE = profile.fr_tolerance
+        self.BR_THRESHOLD = profile.br_threshold
+        self.MESH_SIZE = tuple(profile.mesh_size) # (w, h) frame MediaPipe
+        self.FRAME_INTERVAL = profile.frame_interval_ms # ms per tick pas aktif
+        self.QR_INTERVAL = profile.qr_interval
+        self.DETECT_INTERVAL = profile.detect_interval
+        self.IDENTIFY_INTERVAL = profile.identify_interval
+        self.BEST_FRAME_WINDOW = profile.identify_interval # detik, samain sama interval identify
+        tracker = getattr(self, "tracker", None)
+        if tracker is not None: tracker.set_window(self.BEST_FRAME_WINDOW)
+
+    def poll_startup(self):
+        """Ambil resource yang udah siap dari startup graph & update status warm-up di header"""
+        # Dibaca sebelum ambil hasil: task yang kelar di tengah pass ini masih ke-poll sekali lagi
+        pending = self.startup.pending()
+        if not self.profile_applied and self.startup.profile_ready():
+            self.profile_applied = True
+            self.apply_profile(self.startup.profile)
+            print(f"⚙️ Profil performa: {self.perf_profile.name}")
+        if self.cap is None and self.startup.done("camera"):
+            self.cap = self.startup.get("camera")
+        if self.face_mesh is None and self.startup.done("face_mesh"):
+            self.face_mesh = self.startup.get("face_mesh")
+        if not self.gallery_ready and self.startup.done("gallery"):
+            self.load_known_faces()
+
+        failed = [n for n in ("camera", "face_mesh", "face_recognition", "gallery") if self.startup.failed(n)]
+        if failed:
+            self.startup_label.configure(text=f"⚠️ Gagal: {', '.join(failed)}", text_color="#f87171")
+        elif pending:
+            self.startup_label.configure(text=f"⏳ Warming up: {', '.join(pending)}", text_color="#facc15")
+        else:
+            self.startup_label.configure(text="")
+        if pending: self.after(100, self.poll_startup)
+
     def apply_enhancement(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        if np.mean(gray) < self.BR_THRESHOLD:
-            lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-            l, a, b = cv2.split(lab)
-            enhanced_l = self.clahe.apply(l)
-            return cv2.cvtColor(cv2.merge([enhanced_l, a, b]), cv2.COLOR_LAB2BGR), True
-        return frame, False
+        return gallery.apply_enhancement(frame, self.clahe, self.BR_THRESHOLD)
 
     def load_known_faces(self):
-        path = os.path.join(project_root, "assets")
-        if not os.path.exists(path): return
-        for f in os.listdir(path):
-            if f.lower().endswith((".jpg", ".png", ".jpeg")):
-                img = cv2.imread(os.path.join(path, f))
-                enhanced, _ = self.apply_enhancement(img)
-                rgb = cv2.cvtColor(enhanced, cv2.COLOR_BGR2RGB)
-                encs = face_recognition.face_encodings(rgb)
-                if encs:
-                    self.known_face_encodings.append(encs[0])
-                    self.known_face_names.append(os.path.splitext(f)[0].replace("_", " ").title())
-        print(f"✅ DB Loaded: {len(self.known_face_names)} faces")
+        self.gallery_ready = True
+        face_gallery = self.startup.get("gallery")
+        if face_gallery is None:
+            print("🔗 Galeri & matching lewat match daemon lokal")
+            return
+        self.start_local_gallery(face_gallery)
+
+    def start_local_gallery(self, face_gallery):
+        self.face_gallery = face_gallery
+        print(f"✅ DB Loaded: {len(self.face_gallery)} faces")
+        # Hot-reload: foto baru/diganti/dihapus di assets/ langsung kepake tanpa restart
+        self.gallery_watcher = gallery.GalleryWatcher(
+            os.path.join(project_root, "assets"), self.face_gallery,
+            on_swap=self.swap_gallery, threshold=self.BR_THRESHOLD).start()
+
+    def swap_gallery(self, new_gallery):
+        # Satu assign = atomik; identify_face_worker yang lagi jalan tetap pake snapshot lama
+        self.face_gallery = new_gallery
+        # Dipanggil dari thread watcher, jadi nulis store di sini gak nge-block UI
+        if self.startup.store_dtype:
+            try:
+                save_gallery_store(new_gallery, self.startup.store_path, self.startup.store_dtype)
+            except Exception as e:
+                print(f"⚠️ Gagal update gallery store: {e}")
 
     def setup_ui(self):
         self.header = ctk.CTkFrame(self, height=60, corner_radius=0, fg_color="#162032")
         self.header.pack(side="top", fill="x")
         ctk.CTkButton(self.header, text="🚪 LOGOUT", width=100, fg_color="#dc2626", command=self.logout).pack(side="left", padx=20)
+        self.conn_label = ctk.CTkLabel(self.header, text="● ONLINE", font=("Arial", 14, "bold"), text_color="#4ade80")
+        self.conn_label.pack(side="right", padx=20)
+        self.startup_label = ctk.CTkLabel(self.header, text="", font=("Arial", 12), text_color="#facc15")
+        self.startup_label.pack(side="right", padx=10)
         ctk.CTkLabel(self.header, text="🛡️ SIMPEL SCANNER SYSTEM", font=("Arial", 20, "bold"), text_color="#22d3ee").pack(pady=15)
         
         self.video_frame = ctk.CTkFrame(self, fg_color="black")
@@ -116,103 +228,283 @@ class AppSIMPEL(ctk.CTk):
         self.video_label = tk.Label(self.video_frame, bg="black")
         self.video_label.pack(expand=True, fill="both")
 
+    def update_connection_badge(self):
+        if self.api_degraded:
+            self.conn_label.configure(text="● SERVER OFFLINE", text_color="#f87171")
+        else:
+            self.conn_label.configure(text="● ONLINE", text_color="#4ade80")
+
+    def reset_track(self, track):
+        """Transaksi 1 orang kelar/batal: tutup trace-nya, balik STANDBY (orang lain gak kena)"""
+        if track.trace is not None: self.tracer.finish("abandoned", tx=track.trace) # Outcome dari run_api yang dipake
+        track.trace = None
+        track.reset(self.frame_seq)
+
+    def on_track_dropped(self, track):
+        # Orangnya keluar frame sebelum transaksinya kelar
+        if track.trace is not None: self.tracer.finish("abandoned", tx=track.trace)
+        track.trace = None
+
     def reset_all_states(self):
-        self.current_state = 'STANDBY'
-        self.identified_user = None
-        self.current_qr_data = None
-        self.blink_count = 0
-        self.eye_closed = False
-        self.active_challenge = random.choice(["Tengok Kanan", "Tengok Kiri", "Buka Mulut"])
-        self.face_detected_start_time = 0
-        self.no_face_counter = 0
+        self.tracker.clear()
+
+    def apply_results(self):
+        """Terapin hasil worker yang baru dari snapshot bus (main thread doang)"""
+        snap = self.results.snapshot()
+
+        mesh = snap.newer("mesh", self.seen_seq.get("mesh", 0))
+        if mesh:
+            self.seen_seq["mesh"] = mesh.seq
+            # Asosiasi wajah ke track; track yang gak kelihatan > 5 update dibuang (hysteresis)
+            self.tracker.update(mesh.value)
+
+        faces = snap.newer("faces", self.seen_seq.get("faces", 0))
+        if faces:
+            self.seen_seq["faces"] = faces.seq
+            self.cached_face_locations = faces.value or None
+
+        qr = snap.newer("qr", self.seen_seq.get("qr", 0))
+        if qr:
+            self.seen_seq["qr"] = qr.seq
+            codes, decode_start, decode_end, qr_frame = qr.value
+            for data, center in codes: self.bind_qr(data, center, qr.seq, decode_start, decode_end, qr_frame)
+            self.last_qr_at = time.time()
+
+        # Identitas dari track yang udah dibuang (orangnya pergi) otomatis gak kepake
+        identity = snap.newer("identity", self.seen_seq.get("identity", 0))
+        if identity:
+            self.seen_seq["identity"] = identity.seq
+            for track_id, name, chip, seq in identity.value:
+                track = self.tracker.get(track_id)
+                # Track gak ada / wajah dari frame sebelum reset (bisa jadi orang sebelumnya)
+                if track is None or seq <= track.reset_seq: continue
+                track.identified_user = name
+                track.face_chip = chip
+                if track.trace is not None: track.trace.instant("identified", user=name)
+
+    def bind_qr(self, data, center, seq, decode_start, decode_end, qr_frame=None):
+        """QR ikut orang terdekat yang belum pegang QR; QR yang udah kebind gak pindah orang"""
+        if any(t.qr_data == data for t in self.tracker.tracks): return
+        track = self.tracker.nearest(center, where=lambda t: t.qr_data is None and seq > t.reset_seq)
+        if track is None: return
+        track.qr_data = data
+        track.qr_frame = qr_frame
+        # 1 trace per orang (paralel), ditutup di reset_track / on_track_dropped
+        track.trace = self.tracer.begin("scan", start=decode_start, exclusive=False, qr=data, track=track.id)
+        if track.trace:
+            track.trace.add("qr_decode", decode_start, decode_end, cat="qr", tid=WORKERS_TID)
+            track.trace.state(track.state, at=decode_start)
 
     # --- 🚀 WORKERS (ASYNCHRONOUS) ---
 
-    def mediapipe_worker(self, frame_rgb):
-        """Thread khusus MediaPipe biar UI gak freezing"""
+    def mediapipe_worker(self, frame_rgb, seq):
+        """Thread khusus MediaPipe biar UI gak freezing. frame_rgb: PooledFrame, di-release di sini"""
         try:
-            res = self.face_mesh.process(frame_rgb)
-            if res.multi_face_landmarks:
-                self.last_known_lms = res.multi_face_landmarks[0].landmark
-                self.no_face_counter = 0
-                if self.face_detected_start_time == 0: self.face_detected_start_time = time.time()
-            else:
-                self.no_face_counter += 1
-                if self.no_face_counter > 5: self.last_known_lms = None
+            res = self.face_mesh.process(frame_rgb.array)
+            faces = [f.landmark for f in res.multi_face_landmarks] if res.multi_face_landmarks else []
+            self.results.publish("mesh", seq, faces)
         finally:
+            frame_rgb.release()
             self.is_mesh_processing = False
 
-    def detect_face_worker(self, frame_copy):
+    def get_face_detector(self):
+        if self.face_detector is None:
+            try:
+                self.face_detector = create_detector(self.FR_DETECTOR)
+            except Exception as e:
+                print(f"⚠️ Detektor '{self.FR_DETECTOR}' gagal ({e}), balik ke HOG")
+                self.face_detector = create_detector("hog")
+        return self.face_detector
+
+    def detect_face_worker(self, frame_ref, seq):
         try:
-            small = cv2.resize(frame_copy, (0, 0), fx=self.FR_SCALING, fy=self.FR_SCALING)
+            frame = frame_ref.view()
+            small = cv2.resize(frame, (0, 0), fx=self.FR_SCALING, fy=self.FR_SCALING)
             processed, _ = self.apply_enhancement(small)
             rgb_small = cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
-            locs = face_recognition.face_locations(rgb_small, model="hog")
-            with self.face_data_lock:
-                self.cached_face_locations = locs if locs else None
-                self.cached_rgb_small = rgb_small
-                if not locs: self.identified_user = None
-        finally: self.is_detecting_face = False
-
-    def identify_face_worker(self):
+            tracks = [t for t in self.tracker.tracks if t.visible] # Snapshot (list di-replace main thread)
+            detector = self.get_face_detector()
+            if detector.needs_landmarks:
+                locs = [loc for t in tracks for loc in detector.detect(rgb_small, lms=t.lms)]
+            else:
+                locs = detector.detect(rgb_small)
+            self.results.publish("faces", seq, list(locs))
+            if not locs:
+                for track in tracks: track.best_face.clear()
+                return
+            sh, sw = rgb_small.shape[:2]
+            h, w = frame.shape[:2]
+            owners = self.tracker.assign_boxes([css_to_box(loc, sw, sh) for loc in locs])
+            for loc, track in zip(locs, owners):
+                # Wajah yang belum punya track (belum kebaca FaceMesh) di-skip: state & UI nempel ke track
+                if track is None: continue
+                # Quality gate murah (ukuran, blur, cahaya, yaw) sebelum encode yang mahal
+                quality = assess_face(rgb_small, loc, track.lms, self.FACE_QUALITY)
+                self.last_face_quality = quality
+                if not quality.passed: continue
+                # Crop resolusi penuh diambil sekarang (buffer frame balik ke pool habis worker ini),
+                # landmark MediaPipe ikut disimpen buat alignment pas encode
+                full_loc = scale_box(loc, 1 / self.FR_SCALING)
+                chip, chip_loc, transform = crop_face_region(frame, full_loc)
+                if chip is None: continue
+                track.best_face.offer(quality.score, (seq, chip.copy(), chip_loc, transform, full_loc, (w, h), track.lms))
+        finally:
+            frame_ref.release()
+            self.is_detecting_face = False
+
+    def identify_face_worker(self, tracks):
+        """Kandidat terbaik semua orang di-encode barengan: 1 panggilan encoder buat semua wajah"""
         try:
-            with self.face_data_lock:
-                locs, rgb = self.cached_face_locations, self.cached_rgb_small
-            if not locs or rgb is None: return
-            encs = face_recognition.face_encodings(rgb, locs)
-            if encs and self.known_face_encodings:
-                dist = face_recognition.face_distance(self.known_face_encodings, encs[0])
-                idx = np.argmin(dist)
-                if dist[idx] <= self.FR_TOLERANCE:
-                    self.identified_user = self.known_face_names[idx]
+            aligned, located, chips = [], [], {}
+            for track in tracks:
+                candidate = track.best_face.take()
+                # Gak ada frame yang lolos quality gate: jangan encode, jangan ganti hasil (biar gak kedip UNKNOWN)
+                if candidate is None: continue
+                seq, chip, chip_loc, transform, loc, (w, h), lms = candidate
+                chips[track.id] = chip # Sebelum enhancement, buat snapshot bukti
+                chip, _ = self.apply_enhancement(chip)
+                rgb_chip = cv2.cvtColor(chip, cv2.COLOR_BGR2RGB)
+                if self.FR_LANDMARK_ENCODER and landmarks_match_box(lms, loc, w, h):
+                    aligned.append((track.id, seq, rgb_chip, five_points(lms, w, h, transform)))
+                else:
+                    # Gak ada landmark / landmark-nya udah gak nempel di box: jalur shape predictor dlib
+                    located.append((track.id, seq, rgb_chip, chip_loc))
+            items = aligned + located
+            if not items: return
+            face_gallery = self.face_gallery # Ambil snapshot sekali di awal
+            encs = (encode_aligned_batch([(rgb, points) for _, _, rgb, points in aligned])
+                    + encode_locations_batch([(rgb, loc) for _, _, rgb, loc in located]))
+            client = self.startup.match_client
+            # Match daemon dulu; gak bisa dihubungin -> galeri in-process
+            matches = client.match_many(encs, self.FR_TOLERANCE) if client is not None else None
+            if matches is None:
+                if face_gallery is None:
+                    # Daemon mati & galeri lokal belum ada: load di background, frame ini dilewatin
+                    self.load_gallery_fallback()
                     return
-            self.identified_user = "UNKNOWN"
+                matches = face_gallery.match_many(encs, self.FR_TOLERANCE)
+            names = [(track_id, name or "UNKNOWN", chips[track_id], seq)
+                     for (track_id, seq, *_), (name, _) in zip(items, matches)]
+            self.results.publish("identity", max(seq for _, seq, _, _ in items), names)
         finally: self.is_identifying_face = False
 
+    def load_gallery_fallback(self):
+        if self.local_gallery_loading: return
+        self.local_gallery_loading = True
+        print("⚠️ Match daemon gak bisa dihubungin, load galeri lokal")
+
+        def load():
+            try:
+                face_gallery = self.startup.load_local_gallery()
+            except Exception as e:
+                print(f"❌ Gagal load galeri lokal: {e}")
+                self.local_gallery_loading = False
+                return
+            self.after(0, lambda: self.start_local_gallery(face_gallery))
+
+        threading.Thread(target=load, name="gallery-fallback", daemon=True).start()
+
     # --- 🎥 MAIN LOOP ---
 
     def update_frame(self):
-        ret, frame = self.cap.read()
+        # Kamera belum siap (masih warm-up di startup graph): cek lagi bentar lagi
+        if self.cap is None:
+            if not self.startup.failed("camera"): self.after(self.FRAME_INTERVAL, self.update_frame)
+            return
+        ret, raw = self.cap.read(self.raw_frame)
         if not ret: return
-
-        frame = cv2.flip(frame, 1)
-        display_frame = frame.copy()
+        self.raw_frame = raw
+        self.frame_seq += 1
+        seq = self.frame_seq
+        self.apply_results()
+
+        # Idle gate: frame differencing di thumbnail kecil, pipeline berat cuma jalan kalo ACTIVE
+        was_idle = self.motion_gate.idle
+        if not self.motion_gate.update(raw, self.has_activity()):
+            if not was_idle: self.enter_idle()
+            self.idle_tick(raw)
+            return
+        if was_idle: print("👋 Ada gerakan, scanner aktif lagi")
+
+        # Frame (read-only buat worker) & display (digambarin UI) dari pool, bukan alokasi baru
+        pool = self.frame_pool
+        frame = pool.acquire_like(raw)
+        cv2.flip(raw, 1, dst=frame.array)
+        display = pool.acquire_like(raw)
+        display.array[...] = frame.array
+        display_frame = display.array
         now = time.time()
 
+        # Status server (circuit breaker) -> badge di header
+        degraded = self.api.is_degraded()
+        if degraded != self.api_degraded:
+            self.api_degraded = degraded
+            self.update_connection_badge()
+
         # 1. MediaPipe Thread (Liveness) - Paling Penting!
-        if not self.is_mesh_processing:
+        if self.face_mesh is not None and not self.is_mesh_processing:
             self.is_mesh_processing = True
             # Pake frame resize biar MediaPipe makin enteng
-            mini_mp = cv2.cvtColor(cv2.resize(frame, (640, 360)), cv2.COLOR_BGR2RGB)
-            threading.Thread(target=self.mediapipe_worker, args=(mini_mp,), daemon=True).start()
+            mesh_w, mesh_h = self.MESH_SIZE
+            with pool.acquire((mesh_h, mesh_w, 3)) as mini:
+                mini_mp = pool.acquire((mesh_h, mesh_w, 3))
+                cv2.resize(frame.array, self.MESH_SIZE, dst=mini.array)
+                cv2.cvtColor(mini.array, cv2.COLOR_BGR2RGB, dst=mini_mp.array)
+            threading.Thread(target=self.mediapipe_worker, args=(mini_mp, seq), daemon=True).start()
 
         # 2. QR Thread
-        if int(now * 10) % 5 == 0 and not self.is_qr_processing:
+        if not self.is_qr_processing and (now - self.last_qr_scan_time > self.QR_INTERVAL):
+            self.last_qr_scan_time = now
             self.is_qr_processing = True
-            threading.Thread(target=self.qr_worker, args=(frame.copy(),), daemon=True).start()
+            threading.Thread(target=self.qr_worker, args=(frame.retain(), seq), daemon=True).start()
 
-        # 3. FR Pipeline
-        if not self.is_detecting_face and (now - self.last_detect_time > 0.5):
+        # 3. FR Pipeline (nunggu encoder & galeri selesai warm-up)
+        if self.startup.done("face_recognition") and not self.is_detecting_face and (now - self.last_detect_time > self.DETECT_INTERVAL):
             self.last_detect_time = now
             self.is_detecting_face = True
-            threading.Thread(target=self.detect_face_worker, args=(frame.copy(),), daemon=True).start()
+            threading.Thread(target=self.detect_face_worker, args=(frame.retain(), seq), daemon=True).start()
 
-        if not self.is_identifying_face and self.cached_face_locations and (now - self.last_identify_time > 1.2):
-            self.last_identify_time = now
-            self.is_identifying_face = True
-            threading.Thread(target=self.identify_face_worker, daemon=True).start()
+        if self.gallery_ready and not self.is_identifying_face and (now - self.last_identify_time > self.IDENTIFY_INTERVAL):
+            ready = [t for t in self.tracker.tracks if t.best_face.has_candidate()]
+            if ready:
+                self.last_identify_time = now
+                self.is_identifying_face = True
+                threading.Thread(target=self.identify_face_worker, args=(ready,), daemon=True).start()
 
-        # 4. Logic UI & Render
-        if self.last_known_lms:
-            self.process_ui_logic(display_frame, self.last_known_lms)
-        else:
-            if self.current_state not in ['PROCESSING_API', 'SUCCESS']: self.reset_all_states()
+        # 4. Logic UI & Render (tiap orang; track yang lagi transaksi tapi wajahnya ilang tetep jalan tanpa UI)
+        for track in self.tracker.tracks:
+            if track.missed <= self.tracker.max_missed: self.process_ui_logic(display_frame, track)
 
         self.render_ui(display_frame)
-        # Lock di 30 FPS (33ms) biar CPU gak panas
-        self.after(33, self.update_frame)
-
-    def process_ui_logic(self, img, lms):
+        display.release(); frame.release()
+        if self.first_frame_at is None: self.first_frame_at = time.perf_counter()
+        # Lock FPS sesuai profil (balanced: 33ms = 30 FPS) biar CPU gak panas
+        self.after(self.FRAME_INTERVAL, self.update_frame)
+
+    def has_activity(self):
+        """Ada wajah / QR baru kebaca / transaksi lagi jalan"""
+        return (len(self.tracker) > 0 or bool(self.cached_face_locations)
+                or time.time() - self.last_qr_at < 2 or self.tracker.busy)
+
+    def enter_idle(self):
+        print("💤 Gak ada aktivitas, masuk idle mode")
+        self.cached_face_locations = None
+        # Hasil worker yang masih jalan (dari frame sebelum idle) gak usah diterapin
+        for stage in ("mesh", "faces"): self.seen_seq[stage] = self.frame_seq
+        self.reset_all_states()
+        self.idle_ticks = 0
+
+    def idle_tick(self, raw):
+        """Tick idle: render dengan rate rendah, semua worker berat di-skip"""
+        self.idle_ticks += 1
+        if self.idle_ticks % self.IDLE_RENDER_EVERY == 0:
+            with self.frame_pool.acquire_like(raw) as frame:
+                cv2.flip(raw, 1, dst=frame.array)
+                self.render_ui(frame.array)
+        self.after(self.IDLE_INTERVAL, self.update_frame)
+
+    def process_ui_logic(self, img, track):
+        lms = track.lms
         h, w, _ = img.shape
         # Landmark mapping (MediaPipe)
         x_min = int(lms[234].x * w); y_min = int(lms[10].y * h)
@@ -221,49 +513,42 @@ class AppSIMPEL(ctk.CTk):
 
         # Draw UI
         # Draw UI
-        if not self.current_qr_data:
+        if not track.qr_data:
             self.draw_text(img, "SCAN QR DULU", cx, y_min-30, (50, 50, 255))
         else:
             # FIX: If QR found & state is STANDBY, switch to CHALLENGE automatically
-            if self.current_state == 'STANDBY':
-                self.current_state = 'CHALLENGE'
+            if track.state == STANDBY:
+                track.set_state(CHALLENGE)
             
-            if self.current_state == 'CHALLENGE':
-                self.draw_text(img, f"TASK: {self.active_challenge}", cx, y_min-30, (255, 150, 0))
-                self.check_liveness(lms)
-            elif self.current_state == 'PROCESSING_API':
+            if track.state == CHALLENGE and self.api_degraded:
+                # Server offline: jangan mulai transaksi, langsung kasih tau user
+                self.draw_text(img, "SERVER OFFLINE, COBA LAGI", cx, y_min-30, (0, 0, 255))
+            elif track.state == CHALLENGE:
+                self.draw_text(img, f"TASK: {track.challenge}", cx, y_min-30, (255, 150, 0))
+                self.check_liveness(track)
+            elif track.state == PROCESSING_API:
                 self.draw_text(img, "MOHON TUNGGU...", cx, y_min-30, (255, 255, 0))
-            elif self.current_state == 'SUCCESS':
+            elif track.state == SUCCESS:
                 self.draw_text(img, "AKSES DITERIMA", cx, y_min-30, (0, 255, 0))
         
-        if self.identified_user:
-            color = (0, 255, 0) if self.identified_user != "UNKNOWN" else (0, 0, 255)
-            self.draw_text(img, f"USER: {self.identified_user}", cx, y_max+40, color)
+        if track.identified_user:
+            color = (0, 255, 0) if track.identified_user != "UNKNOWN" else (0, 0, 255)
+            self.draw_text(img, f"USER: {track.identified_user}", cx, y_max+40, color)
         
         # Fancy Border
         cv2.rectangle(img, (x_min, y_min), (x_max, y_max), (255, 255, 255), 2)
 
-    def check_liveness(self, lms):
+    def check_liveness(self, track):
         # Pose & Blink detection
-        nose = lms[4].x; re = lms[234].x; le = lms[454].x
-        ratio = (nose - re) / (le - re) if (le - re) != 0 else 0.5
-        
-        moves = []
-        if ratio < 0.35: moves.append("Tengok Kiri")
-        elif ratio > 0.65: moves.append("Tengok Kanan")
-        if abs(lms[13].y - lms[14].y) > 0.05: moves.append("Buka Mulut")
-
-        if self.active_challenge in moves:
-            self.current_state = 'PROCESSING_API'
-            threading.Thread(target=self.run_api, args=(self.current_qr_data,), daemon=True).start()
+        if track.challenge in liveness_moves(track.lms):
+            track.set_state(PROCESSING_API)
+            threading.Thread(target=self.run_api, args=(track,), daemon=True).start()
 
     def render_ui(self, frame):
         try:
             w_lbl, h_lbl = self.video_label.winfo_width(), self.video_label.winfo_height()
             if w_lbl > 100:
-                # Resize cuma sekali pas mau ditampilin
-                img = cv2.resize(frame, (w_lbl, h_lbl), interpolation=cv2.INTER_LINEAR)
-                img = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+                img = to_display_image(self.frame_pool, frame, w_lbl, h_lbl)
                 
                 # OPTIMIZATION: Use ImageTk instead of CTkImage for speed
                 imgtk = ImageTk.PhotoImage(image=img)
@@ -271,24 +556,52 @@ class AppSIMPEL(ctk.CTk):
                 self.video_label.configure(image=imgtk)
         except: pass
 
-    def qr_worker(self, frame):
+    def qr_worker(self, frame_ref, seq):
         try:
-            decoded = decode(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
-            if decoded: self.current_qr_data = decoded[0].data.decode('utf-8')
-        finally: self.is_qr_processing = False
+            start = trace_now()
+            frame = frame_ref.view()
+            codes = decode_centers(frame)
+            if codes:
+                # Copy cuma pas ada QR (buffer pool balik habis ini); dipake snapshot bukti transaksi
+                self.results.publish("qr", seq, (codes, start, trace_now(), frame.copy()))
+        finally:
+            frame_ref.release()
+            self.is_qr_processing = False
 
     def draw_text(self, img, text, x, y, color):
         cv2.putText(img, text, (x - 80, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,0,0), 3)
         cv2.putText(img, text, (x - 80, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
 
-    def run_api(self, qr):
+    def run_api(self, track):
+        # Span ApiClient di thread ini masuk ke trace transaksi orang ini
+        with self.tracer.activate(track.trace):
+            self.process_transaction(track)
+
+    def process_transaction(self, track):
+        # Snapshot konteks transaksi buat audit (state track bisa berubah selama request jalan)
+        qr, user, challenge = track.qr_data, track.identified_user, track.challenge
+        face_chip, qr_frame = track.face_chip, track.qr_frame
+        timings = {"face_to_api_ms": (time.time() - track.first_seen) * 1000}
+        outcome, status, error, endpoint = "error", None, None, None
+        api_start = time.perf_counter()
         try:
+            # Cek token lokal dulu, jangan sampe transaksi mati di tengah gara-gara 401
+            if not self.auth_manager.ensure_valid():
+                print("⌛ Session expired, silakan login ulang")
+                outcome = "session_expired"
+                self.after(2000, lambda: self.reset_track(track))
+                return
+
+
             # Step 1: GET data peminjaman
+            t0 = time.perf_counter()
             res = self.api.get(f"/api/Borrowing/GetScanDataByQr/{qr}")
+            timings["get_ms"] = (time.perf_counter() - t0) * 1000
             
             if not res or not res.get('peminjaman_detail'):
                 print("❌ Invalid QR or no data")
-                self.after(2000, self.reset_all_states)
+                outcome = "invalid_qr"
+                self.after(2000, lambda: self.reset_track(track))
                 return
             
             # Step 2: Check status (booked vs dipinjam)
@@ -297,46 +610,72 @@ class AppSIMPEL(ctk.CTk):
             print(f"📦 Status: {status}")
             
             # Step 3: Call endpoint yang sesuai
+            t0 = time.perf_counter()
             if status == 'dipinjam':
                 # PENGEMBALIAN (barang lagi dipinjam, mau dikembaliin)
+                endpoint = "ScanQrPengembalian"
                 final_res = self.api.post(f"/api/Borrowing/ScanQrPengembalian/{qr}")
                 print("✅ POST ScanQrPengembalian called")
             elif status == 'booked':
                 # PEMINJAMAN (barang udah dibook, mau diambil)
+                endpoint = "ScanQrPeminjaman"
                 final_res = self.api.post(f"/api/Borrowing/ScanQrPeminjaman/{qr}")
                 print("✅ POST ScanQrPeminjaman called")
             else:
                 # Status tidak dikenal
                 print(f"⚠️ Unknown status: {status}")
-                self.after(2000, self.reset_all_states)
+                outcome = "unknown_status"
+                self.after(2000, lambda: self.reset_track(track))
                 return
+            timings["post_ms"] = (time.perf_counter() - t0) * 1000
             
             # Step 4: Handle response
             if final_res:
-                self.current_state = 'SUCCESS'
-                self.after(3000, self.reset_all_states)
+                outcome = "success"
+                track.set_state(SUCCESS)
+                self.after(3000, lambda: self.reset_track(track))
             else:
                 print("⚠️ POST endpoint failed")
-                self.after(2000, self.reset_all_states)
+                outcome = "post_failed"
+                self.after(2000, lambda: self.reset_track(track))
                 
         except Exception as e:
             print(f"❌ API Error: {e}")
-            self.after(2000, self.reset_all_states)
+            error = str(e)
+            self.after(2000, lambda: self.reset_track(track))
+        finally:
+            if track.trace is not None: track.trace.annotate(outcome=outcome, user=user, status=status)
+            self.audit.record(outcome, qr=qr, user=user, challenge=challenge, status=status,
+                              api_ms=(time.perf_counter() - api_start) * 1000, timings=timings, error=error)
+            # Cuma antri (gak nunggu encode/tulis); queue penuh -> snapshot dibuang
+            if endpoint: self.snapshots.submit({"qr": qr, "user": user, "endpoint": endpoint, "outcome": outcome,
+                                                "challenge": challenge}, face=face_chip, qr_frame=qr_frame)
 
     def logout(self):
         # Clear token dari auth context & hapus session file
+        self.auth_manager.stop()
+        if self.gallery_watcher: self.gallery_watcher.stop()
+        if self.startup.match_client: self.startup.match_client.close()
+        self.audit.close()
+        self.snapshots.close()
         self.auth.sign_out()
         
         # Clear token dari API client
         self.api.clear_token()
+        self.api.stop_keepalive()
         
         # Release camera
-        if hasattr(self, 'cap'): self.cap.release()
+        if getattr(self, 'cap', None) is not None: self.cap.release()
         
         # Destroy & exit
         self.destroy()
         sys.exit(0)
 
+    def on_session_expired(self):
+        """Token expired & gak bisa di-renew: transaksi berikutnya pasti ditolak, jadi logout"""
+        print("⌛ Session expired, logout...")
+        self.logout()
+
     def show_login_required(self):
         ctk.CTkLabel(self, text="🔑 LOGIN REQUIRED").pack(expand=True)
         self.after(2000, self.destroy)
@@ -1,40 +1,308 @@
 # scanner.py
-import cv2
-from pyzbar.pyzbar import decode
+"""
+Scanner QR yang bisa dipake ulang.
+
+    for qr in scan_frames(camera_frames(0)):      # generator, tanpa window
+        print(qr.data)
+
+    start_scanner()                                # window kamera, balikin QR pertama
+
+Batch offline (formulir hasil scan, arsip snapshot/rekaman kamera), paralel
+di process pool, output JSON lines ke stdout, statistik throughput ke stderr:
+
+    python Scanner.py batch scans/ rekaman.mp4 --workers 4 --stride 5
+    python Scanner.py batch arsip/ --unique > hasil.jsonl
+"""
+import argparse
+import bisect
 import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from lib.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+pyzbar = lazy_import("pyzbar.pyzbar")
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".webm")
+DEDUPE_FRAMES = 30  # QR sama di source yang sama dalam N frame = duplikat
+SEGMENT_FRAMES = 600  # Video dipecah per N frame biar 1 video panjang bisa dikerjain banyak worker
+
+
+class QRResult(NamedTuple):
+    data: str
+    rect: Tuple[int, int, int, int]  # (x, y, w, h)
+    frame_index: int = 0
+    source: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {"source": self.source, "frame": self.frame_index, "data": self.data, "rect": list(self.rect)}
+
+
+def decode_frame(frame, frame_index: int = 0, source: Optional[str] = None) -> List[QRResult]:
+    """Decode semua QR di 1 frame BGR/grayscale"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    out = []
+    for obj in pyzbar.decode(gray):
+        try:
+            data = obj.data.decode("utf-8")
+        except UnicodeDecodeError:
+            data = obj.data.decode("latin-1")
+        out.append(QRResult(data, tuple(obj.rect), frame_index, source))
+    return out
+
+
+def decode_centers(frame) -> List[Tuple[str, Tuple[float, float]]]:
+    """(data, pusat QR ternormalisasi 0..1) semua QR di frame, buat nentuin QR-nya dipegang orang yang mana"""
+    h, w = frame.shape[:2]
+    return [(qr.data, ((qr.rect[0] + qr.rect[2] / 2) / w, (qr.rect[1] + qr.rect[3] / 2) / h))
+            for qr in decode_frame(frame)]
+
+
+def camera_frames(index: int = 0, flip: bool = False) -> Iterator:
+    """Generator frame dari kamera. Kamera dilepas pas generator ditutup."""
+    cap = cv2.VideoCapture(index)
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret: break
+            yield cv2.flip(frame, 1) if flip else frame
+    finally:
+        cap.release()
+
+
+def video_frames(path: str, start: int = 0, count: Optional[int] = None, stride: int = 1) -> Iterator[Tuple[int, object]]:
+    """Generator (frame_index, frame) dari file video, tiap `stride` frame"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened(): raise IOError(f"Gagal buka video {path}")
+    try:
+        if start: cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index, end = start, None if count is None else start + count
+        while end is None or index < end:
+            # grab() doang buat frame yang di-skip, gak usah decode gambarnya
+            if (index - start) % stride:
+                if not cap.grab(): break
+            else:
+                ret, frame = cap.read()
+                if not ret: break
+                yield index, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def scan_frames(frames: Iterable, dedupe_frames: int = DEDUPE_FRAMES, source: Optional[str] = None) -> Iterator[QRResult]:
+    """
+    Generator QR baru dari aliran frame.
+
+    Args:
+        frames: Iterable frame, atau (frame_index, frame)
+        dedupe_frames: QR dengan isi sama yang muncul lagi dalam N frame gak di-yield ulang (0 = semua)
+        source: Label source yang ditempel ke hasil
+    """
+    last_seen: Dict[str, int] = {}
+    for i, item in enumerate(frames):
+        index, frame = item if isinstance(item, tuple) else (i, item)
+        for qr in decode_frame(frame, index, source):
+            prev = last_seen.get(qr.data)
+            last_seen[qr.data] = index
+            if dedupe_frames and prev is not None and index - prev <= dedupe_frames: continue
+            yield qr
 
-def start_scanner():
-    last_qr_data = None
-    cap = cv2.VideoCapture(0) 
 
+def start_scanner(index: int = 0, show: bool = True) -> Optional[str]:
+    """
+    Loop kamera sampe ketemu QR. Return isi QR pertama, None kalo di-stop ('q') atau kamera mati.
+    """
     print("Scanner Aktif... (Tekan 'q' di jendela kamera buat stop)")
+    frames = camera_frames(index)
+    try:
+        for i, frame in enumerate(frames):
+            detected = decode_frame(frame, i)
+            if detected:
+                return detected[0].data # <--- Ini yang bakal ditangkep Main.py
+            if show:
+                cv2.imshow('Scanner Window', frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'): break
+        return None
+    finally:
+        frames.close()
+        if show: cv2.destroyAllWindows()
+
+
+# ============ BATCH ============
+
+def _scan_image(path: str) -> Tuple[List[Dict], int]:
+    frame = cv2.imread(path)
+    if frame is None: raise IOError(f"Gagal baca {path}")
+    return [qr.to_dict() for qr in decode_frame(frame, 0, path)], 1
+
+
+def _scan_video_segment(path: str, start: int, count: Optional[int], stride: int, dedupe_frames: int) -> Tuple[List[Dict], int]:
+    decoded = 0
+
+    def counted():
+        nonlocal decoded
+        for item in video_frames(path, start, count, stride):
+            decoded += 1
+            yield item
+
+    results = [qr.to_dict() for qr in scan_frames(counted(), dedupe_frames, path)]
+    return results, decoded
+
+
+def scan_task(task: Tuple) -> Dict:
+    """Jalan di worker process. Error per file dibalikin, gak bikin batch mati."""
+    kind, path = task[0], task[1]
+    start = time.perf_counter()
+    try:
+        if kind == "image":
+            results, frames = _scan_image(path)
+        else:
+            results, frames = _scan_video_segment(path, *task[2:])
+        return {"source": path, "results": results, "frames": frames, "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"source": path, "results": [], "frames": 0, "error": str(e), "seconds": time.perf_counter() - start}
+
+
+def collect_sources(paths: Iterable[str]) -> List[str]:
+    """Expand folder (rekursif) jadi list file gambar/video, urut"""
+    out = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                out.extend(os.path.join(root, f) for f in sorted(files)
+                           if f.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS))
+        else:
+            out.append(path)
+    return out
+
+
+def plan_tasks(sources: Iterable[str], stride: int = 1, segment: int = SEGMENT_FRAMES,
+               dedupe_frames: int = DEDUPE_FRAMES) -> List[Tuple]:
+    tasks = []
+    for path in sources:
+        if not path.lower().endswith(VIDEO_EXTENSIONS):
+            tasks.append(("image", path)); continue
+        total = 0
+        cap = cv2.VideoCapture(path)
+        if cap.isOpened(): total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        cap.release()
+        if total <= 0 or not segment:
+            tasks.append(("video", path, 0, None, stride, dedupe_frames)); continue
+        # Segmen dibikin kelipatan stride biar frame yang di-sample sama kayak tanpa segmen
+        segment = max(stride, segment - segment % stride)
+        for start in range(0, total, segment):
+            tasks.append(("video", path, start, segment, stride, dedupe_frames))
+    return tasks
+
+
+class Deduper:
+    """
+    Duplicate suppression di proses utama (hasil segmen dateng gak urut).
+    unique=True: tiap isi QR cuma keluar sekali di seluruh batch.
+    """
+
+    def __init__(self, dedupe_frames: int = DEDUPE_FRAMES, unique: bool = False):
+        self.dedupe_frames = dedupe_frames
+        self.unique = unique
+        self._seen_data = set()
+        self._frames: Dict[Tuple[str, str], List[int]] = {}
+        self.suppressed = 0
+
+    def accept(self, result: Dict) -> bool:
+        data = result["data"]
+        if self.unique:
+            if data in self._seen_data:
+                self.suppressed += 1; return False
+            self._seen_data.add(data)
+            return True
+        if not self.dedupe_frames: return True
+        frames = self._frames.setdefault((result["source"], data), [])
+        index = result["frame"]
+        pos = bisect.bisect_left(frames, index)
+        near = [frames[j] for j in (pos - 1, pos) if 0 <= j < len(frames)]
+        bisect.insort(frames, index)
+        if any(abs(index - f) <= self.dedupe_frames for f in near):
+            self.suppressed += 1; return False
+        return True
+
+
+def run_batch(paths: Iterable[str], workers: Optional[int] = None, stride: int = 1, segment: int = SEGMENT_FRAMES,
+              dedupe_frames: int = DEDUPE_FRAMES, unique: bool = False, out=None, err=None) -> Dict:
+    """
+    Decode semua file di `paths` paralel. Hasil di-stream ke `out` (JSON lines)
+    begitu tiap task kelar, statistik throughput ditulis ke `err` di akhir.
+
+    Returns:
+        Dict statistik (files, tasks, frames, results, duplicates, errors, seconds, frames_per_s)
+    """
+    out = out or sys.stdout
+    err = err or sys.stderr
+    started = time.perf_counter()
+    sources = collect_sources(paths)
+    tasks = plan_tasks(sources, stride, segment, dedupe_frames)
+    deduper = Deduper(dedupe_frames, unique)
+    stats = {"files": len(sources), "tasks": len(tasks), "frames": 0, "results": 0, "duplicates": 0, "errors": 0}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(scan_task, t) for t in tasks]
+        for future in as_completed(futures):
+            r = future.result()
+            stats["frames"] += r["frames"]
+            if r.get("error"):
+                stats["errors"] += 1
+                err.write(json.dumps({"source": r["source"], "error": r["error"]}) + "\n")
+                continue
+            for result in r["results"]:
+                if not deduper.accept(result): continue
+                stats["results"] += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    stats["duplicates"] = deduper.suppressed
+    stats["seconds"] = time.perf_counter() - started
+    stats["frames_per_s"] = stats["frames"] / stats["seconds"] if stats["seconds"] else 0.0
+    err.write(json.dumps({"stats": stats}) + "\n")
+    return stats
 
-        detected_qrs = decode(frame)
 
-        for obj in detected_qrs:
-            current_qr_string = obj.data.decode('utf-8')
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scanner QR SIMPEL")
+    sub = parser.add_subparsers(dest="command")
 
-            if current_qr_string != last_qr_data:
-                last_qr_data = current_qr_string
-                
-                # Pas dapet data, kita stop scanner dan balikin datanya
-                cap.release()
-                cv2.destroyAllWindows()
-                return current_qr_string # <--- Ini yang bakal ditangkep Main.py
+    cam = sub.add_parser("camera", help="Scan dari kamera sampe ketemu QR")
+    cam.add_argument("--index", type=int, default=0)
+    cam.add_argument("--no-window", action="store_true")
 
-            (x, y, w, h) = obj.rect
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    batch = sub.add_parser("batch", help="Decode folder gambar / file video secara paralel")
+    batch.add_argument("paths", nargs="+")
+    batch.add_argument("--workers", type=int, default=None, help="Jumlah process (default: jumlah CPU)")
+    batch.add_argument("--stride", type=int, default=1, help="Video: decode tiap N frame")
+    batch.add_argument("--segment", type=int, default=SEGMENT_FRAMES, help="Video: frame per task (0 = 1 task per video)")
+    batch.add_argument("--dedupe-frames", type=int, default=DEDUPE_FRAMES,
+                       help="QR sama di source sama dalam N frame dianggap duplikat (0 = mati)")
+    batch.add_argument("--unique", action="store_true", help="Tiap isi QR cuma keluar sekali di seluruh batch")
+    batch.add_argument("--output", default=None, help="File JSON lines (default stdout)")
 
-        cv2.imshow('Scanner Window', frame)
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        out = open(args.output, "w", encoding="utf-8") if args.output else None
+        try:
+            run_batch(args.paths, args.workers, max(1, args.stride), args.segment, args.dedupe_frames, args.unique, out)
+        finally:
+            if out: out.close()
+    else:
+        qr = start_scanner(getattr(args, "index", 0), show=not getattr(args, "no_window", False))
+        print(qr if qr is not None else "")
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
 
-    cap.release()
-    cv2.destroyAllWindows()
-    return raw_data
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -14,14 +14,11 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-print(f"🔍 Project root: {project_root}")
-
 # Import module kita
 try:
     from context.AuthContext import auth_context
     from lib.api import init_api
     from lib.api_base import get_api_base_url
-    print("✅ Import berhasil!")
 except ImportError as e:
     print(f"❌ Import error: {e}")
     # Coba import dengan cara lain
@@ -50,10 +47,21 @@ except ImportError as e:
         print(f"❌ Manual import juga gagal: {e2}")
         sys.exit(1)
 
-# Initialize API dengan base URL
-api_base_url = get_api_base_url()
-print(f"🌐 API Base URL: {api_base_url}")
-api = init_api(api_base_url)
+# API client dibikin pas pertama dibutuhin, bukan pas modul di-import
+_api = None
+_api_lock = threading.Lock()
+
+
+def get_api():
+    """ApiClient bersama buat login (lazy singleton)"""
+    global _api
+    if _api is None:
+        with _api_lock:
+            if _api is None:
+                api_base_url = get_api_base_url()
+                print(f"🌐 API Base URL: {api_base_url}")
+                _api = init_api(api_base_url)
+    return _api
 
 
 class LoginFrame(ctk.CTkFrame):
@@ -75,6 +83,9 @@ class LoginFrame(ctk.CTkFrame):
         
         # Bind Enter key untuk login
         self.master.bind('<Return>', lambda e: self.handle_login())
+        
+        # Pre-connect ke server selagi user ngetik password
+        get_api().warm_up(background=True)
     
     def setup_ui(self):
         """Setup semua UI components"""
@@ -214,6 +225,7 @@ class LoginFrame(ctk.CTkFrame):
             
             print(f"🔐 Login dengan: username={username}, jenis_aplikasi={self.jenis_aplikasi}")
             
+            api = get_api()
             login_data = api.login(
                 username=username,
                 password=password,
@@ -0,0 +1,166 @@
+# benchmarks/bench_detectors.py
+"""
+Benchmark backend detektor wajah (lib.face_detect): kecepatan & recall.
+
+Tiap gambar disiapin kayak di detect_face_worker: di-resize ke lebar frame
+kamera (--frame-width), di-scale FR_SCALING (--scale), di-enhance, lalu RGB.
+Backend "landmarks" dikasih landmark FaceMesh dari gambar yang sama; waktu
+FaceMesh dilaporin terpisah karena di app udah dibayar sama mediapipe_worker.
+
+Label (--labels, JSON) opsional:
+    {"foto.jpg": [[top, right, bottom, left], ...]}   box di koordinat gambar asli
+    {"foto.jpg": 2}                                   cuma jumlah wajah
+Tanpa label, tiap gambar dianggap berisi tepat 1 wajah (foto galeri assets/).
+
+Backend yang gak bisa jalan di mesin ini (modul / file model gak ada, lihat
+`python -m lib.face_detect`) dilaporin "n/a" plus alasannya, bukan gagal.
+
+Contoh:
+    python benchmarks/bench_detectors.py
+    python benchmarks/bench_detectors.py --images dataset/ --labels dataset/labels.json --detectors hog haar
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+
+from lib.face_detect import DETECTORS, create_detector, unavailable_detectors
+from lib.gallery import IMAGE_EXTENSIONS, apply_enhancement, create_clahe
+
+
+def iou(a, b) -> float:
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0, bottom - top) * max(0, right - left)
+    area = lambda r: max(0, r[2] - r[0]) * max(0, r[1] - r[3])
+    union = area(a) + area(b) - inter
+    return inter / union if union else 0.0
+
+
+def load_samples(images_dir, labels, frame_width, scale, threshold):
+    """List (filename, rgb_small, gambar asli BGR, faktor box asli -> small, label)"""
+    clahe = create_clahe()
+    samples = []
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS): continue
+        img = cv2.imread(os.path.join(images_dir, filename))
+        if img is None: continue
+        factor = frame_width / img.shape[1] * scale
+        small = cv2.resize(img, (0, 0), fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+        small, _ = apply_enhancement(small, clahe, threshold)
+        samples.append((filename, cv2.cvtColor(small, cv2.COLOR_BGR2RGB), img, factor, labels.get(filename, 1)))
+    return samples
+
+
+def mesh_landmarks(images):
+    """Landmark FaceMesh per gambar + median ms/gambar (None kalo mediapipe gak ada)"""
+    try:
+        import mediapipe as mp
+    except ImportError:
+        return [None] * len(images), None
+    out, times = [], []
+    with mp.solutions.face_mesh.FaceMesh(static_image_mode=True, refine_landmarks=True) as mesh:
+        for img in images:
+            h, w = img.shape[:2]
+            mini = cv2.cvtColor(cv2.resize(img, (640, int(h * 640 / w))), cv2.COLOR_BGR2RGB)
+            start = time.perf_counter()
+            res = mesh.process(mini)
+            times.append(time.perf_counter() - start)
+            out.append(res.multi_face_landmarks[0].landmark if res.multi_face_landmarks else None)
+    return out, statistics.median(times) * 1000
+
+
+def score(found, label, factor):
+    """Return (wajah ketemu, total wajah, deteksi lebih)"""
+    if isinstance(label, int):
+        return min(len(found), label), label, max(0, len(found) - label)
+    truth = [tuple(int(v * factor) for v in box) for box in label]
+    hit, used = 0, set()
+    for t in truth:
+        best = max(((iou(t, f), i) for i, f in enumerate(found) if i not in used), default=(0, None))
+        if best[0] >= 0.3:
+            hit += 1; used.add(best[1])
+    return hit, len(truth), len(found) - len(used)
+
+
+def run_detector(name, samples, landmarks, repeat):
+    detector = create_detector(name)
+    times, hits, total, extra = [], 0, 0, 0
+    for (filename, rgb, _, factor, label), lms in zip(samples, landmarks):
+        found = detector.detect(rgb, lms=lms)  # Run pertama juga jadi warm-up
+        for _ in range(repeat):
+            start = time.perf_counter()
+            detector.detect(rgb, lms=lms)
+            times.append(time.perf_counter() - start)
+        h, t, e = score(found, label, factor)
+        hits += h; total += t; extra += e
+    return {
+        "detector": name,
+        "median_ms": statistics.median(times) * 1000 if times else None,
+        "recall": hits / total if total else None,
+        "extra": extra,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark detektor wajah")
+    parser.add_argument("--images", default=os.path.join(project_root, "assets"))
+    parser.add_argument("--labels", default=None, help="JSON label box / jumlah wajah per file")
+    parser.add_argument("--detectors", nargs="+", default=list(DETECTORS), choices=list(DETECTORS))
+    parser.add_argument("--frame-width", type=int, default=1280)
+    parser.add_argument("--scale", type=float, default=0.2, help="FR_SCALING")
+    parser.add_argument("--br-threshold", type=float, default=95)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    labels = {}
+    if args.labels:
+        with open(args.labels, "r", encoding="utf-8") as f:
+            labels = json.load(f)
+    samples = load_samples(args.images, labels, args.frame_width, args.scale, args.br_threshold)
+    if not samples:
+        print(f"❌ Gak ada gambar di {args.images}"); return None
+
+    unavailable = unavailable_detectors()
+    landmarks, mesh_ms = [None] * len(samples), None
+    if "landmarks" in args.detectors and "landmarks" not in unavailable:
+        landmarks, mesh_ms = mesh_landmarks([s[2] for s in samples])
+
+    results = []
+    for name in args.detectors:
+        if name in unavailable:
+            results.append({"detector": name, "unavailable": unavailable[name]}); continue
+        try:
+            results.append(run_detector(name, samples, landmarks, args.repeat))
+        except (Exception, SystemExit) as e:  # SystemExit: face_recognition quit() kalo model-nya gak ada
+            results.append({"detector": name, "error": f"{type(e).__name__}: {e}"})
+
+    if args.json:
+        print(json.dumps({"images": len(samples), "mesh_ms": mesh_ms, "results": results}, indent=2))
+        return results
+
+    print(f"🧪 {len(samples)} gambar, frame {args.frame_width}px x scale {args.scale}")
+    if mesh_ms is not None: print(f"   FaceMesh (udah dibayar mediapipe_worker): {mesh_ms:.1f} ms/gambar")
+    print(f"{'detector':<10} {'ms/img':>8} {'recall':>7} {'extra':>6}")
+    for r in results:
+        if "unavailable" in r:
+            print(f"{r['detector']:<10} {'n/a':>8}  {r['unavailable']}")
+        elif "error" in r:
+            print(f"{r['detector']:<10} GAGAL: {r['error']}")
+        else:
+            print(f"{r['detector']:<10} {r['median_ms']:>8.2f} {r['recall']:>7.3f} {r['extra']:>6}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
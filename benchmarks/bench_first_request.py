@@ -0,0 +1,86 @@
+# benchmarks/bench_first_request.py
+"""
+Benchmark latency request pertama setelah startup.
+
+Bandingin 2 skenario pakai DesktopMiddleware baru (pool kosong):
+  - cold   : langsung GET tanpa warm-up (bayar TCP connect + setup session)
+  - warmed : warm_up() dulu, baru GET (koneksi udah ada di pool)
+
+Tanpa --base-url, benchmark nembak mock backend in-process (benchmarks/mock_server.py).
+
+Contoh:
+    python benchmarks/bench_first_request.py --runs 10 --latency-ms 20
+    python benchmarks/bench_first_request.py --base-url http://127.0.0.1:5234
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from middleware import DesktopMiddleware
+from benchmarks.mock_server import MockBackend, MockConfig
+
+
+def measure_first_request(base_url: str, endpoint: str, warm: bool) -> float:
+    """Latency (detik) GET pertama dari middleware yang baru dibikin"""
+    with contextlib.redirect_stdout(io.StringIO()):  # middleware berisik
+        mw = DesktopMiddleware(max_retries=0)
+        if warm:
+            mw.warm_up(base_url, background=False)
+        url = f"{base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        start = time.perf_counter()
+        try:
+            mw.get(url)
+        except Exception:
+            pass  # 4xx/5xx tetap dihitung, yang diukur latency-nya
+        elapsed = time.perf_counter() - start
+        mw.session.close()
+    return elapsed
+
+
+def run(base_url: str, endpoint: str, runs: int) -> dict:
+    results = {}
+    for label, warm in (("cold", False), ("warmed", True)):
+        samples = [measure_first_request(base_url, endpoint, warm) for _ in range(runs)]
+        results[label] = {
+            "median_ms": statistics.median(samples) * 1000,
+            "min_ms": min(samples) * 1000,
+            "max_ms": max(samples) * 1000,
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency request pertama (cold vs warmed)")
+    parser.add_argument("--base-url", default=None, help="Server target (default: mock in-process)")
+    parser.add_argument("--endpoint", default="/api/Borrowing/GetScanDataByQr/BENCH")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency mock server")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = MockBackend(config=MockConfig(latency_ms=args.latency_ms, require_auth=False)).start()
+        base_url = server.base_url
+
+    try:
+        results = run(base_url, args.endpoint, args.runs)
+    finally:
+        if server: server.stop()
+    print(f"🌐 {base_url}{args.endpoint} ({args.runs} runs)")
+    for label, r in results.items():
+        print(f"  {label:<7} median {r['median_ms']:7.1f} ms  (min {r['min_ms']:.1f} / max {r['max_ms']:.1f})")
+    return results
+
+
+if __name__ == "__main__":
+    main()
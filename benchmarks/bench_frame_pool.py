@@ -0,0 +1,164 @@
+# benchmarks/bench_frame_pool.py
+"""
+Benchmark alokasi per frame: pipeline lama (copy tiap tick) vs FramePool.
+
+Satu tick disimulasiin kayak update_frame tanpa GUI & model: flip, display
+frame, resize+RGB buat MediaPipe, frame buat worker QR (grayscale) & deteksi
+(resize FR_SCALING), lalu resize+RGB buat render. Yang diukur:
+  - alokasi buffer per frame (jumlah & MB) lewat tracemalloc
+  - waktu per tick
+  - peak RSS proses (tiap mode jalan di interpreter baru biar gak kecampur)
+
+Contoh:
+    python benchmarks/bench_frame_pool.py
+    python benchmarks/bench_frame_pool.py --frames 600 --size 1920x1080
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+import numpy as np
+
+from lib.frame_pool import FramePool
+
+RENDER_SIZE = (1366, 705)  # Kira-kira ukuran video_label di layar 1366x768
+MESH_SIZE = (640, 360)
+FR_SCALING = 0.2
+
+
+class _Discard:
+    def append(self, _):
+        pass
+
+
+def tick_legacy(raw, state, keep):
+    frame = cv2.flip(raw, 1); keep.append(frame)
+    display = frame.copy(); keep.append(display)
+    mini = cv2.resize(frame, MESH_SIZE); keep.append(mini)
+    mini_mp = cv2.cvtColor(mini, cv2.COLOR_BGR2RGB); keep.append(mini_mp)
+    qr_copy = frame.copy(); keep.append(qr_copy)
+    keep.append(cv2.cvtColor(qr_copy, cv2.COLOR_BGR2GRAY))
+    det_copy = frame.copy(); keep.append(det_copy)
+    keep.append(cv2.resize(det_copy, (0, 0), fx=FR_SCALING, fy=FR_SCALING))
+    resized = cv2.resize(display, RENDER_SIZE); keep.append(resized)
+    keep.append(cv2.cvtColor(resized, cv2.COLOR_BGR2RGB))
+
+
+def tick_pooled(raw, state, keep):
+    pool = state["pool"]
+    frame = pool.acquire_like(raw)
+    cv2.flip(raw, 1, dst=frame.array)
+    display = pool.acquire_like(raw)
+    display.array[...] = frame.array
+    with pool.acquire((MESH_SIZE[1], MESH_SIZE[0], 3)) as mini:
+        mini_mp = pool.acquire((MESH_SIZE[1], MESH_SIZE[0], 3))
+        cv2.resize(frame.array, MESH_SIZE, dst=mini.array)
+        cv2.cvtColor(mini.array, cv2.COLOR_BGR2RGB, dst=mini_mp.array)
+    mini_mp.release()  # "worker" MediaPipe selesai
+    qr_ref, det_ref = frame.retain(), frame.retain()
+    keep.append(cv2.cvtColor(qr_ref.view(), cv2.COLOR_BGR2GRAY)); qr_ref.release()
+    keep.append(cv2.resize(det_ref.view(), (0, 0), fx=FR_SCALING, fy=FR_SCALING)); det_ref.release()
+    with pool.acquire((RENDER_SIZE[1], RENDER_SIZE[0], 3)) as resized, \
+            pool.acquire((RENDER_SIZE[1], RENDER_SIZE[0], 3)) as rgb:
+        cv2.resize(display.array, RENDER_SIZE, dst=resized.array)
+        cv2.cvtColor(resized.array, cv2.COLOR_BGR2RGB, dst=rgb.array)
+    display.release(); frame.release()
+
+
+MODES = {"legacy": tick_legacy, "pooled": tick_pooled}
+MIN_TRACKED_BYTES = 16 * 1024  # Buffer gambar; objek Python kecil gak dihitung
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def count_allocations(tick, raw, state):
+    """
+    Jalanin 1 tick dengan semua hasil antara ditahan (keep), jadi tiap buffer
+    yang dialokasiin masih hidup pas snapshot: jumlah trace = jumlah alokasi.
+    """
+    keep = []
+    tracemalloc.start()
+    tick(raw, state, keep)
+    snap = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    big = [t for t in snap.traces if t.size >= MIN_TRACKED_BYTES]
+    return len(big), sum(t.size for t in big)
+
+
+def run_mode(mode: str, frames: int, size):
+    raw = np.random.randint(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    state = {"pool": FramePool()}
+    tick, discard = MODES[mode], _Discard()
+    for _ in range(10): tick(raw, state, discard)  # Warm-up: pool keisi, cv2 ke-init
+
+    allocs, alloc_bytes = count_allocations(tick, raw, state)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(frames): tick(raw, state, discard)
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "ms_per_frame": elapsed / frames * 1000,
+        "allocs_per_frame": allocs,
+        "mb_allocated_per_frame": alloc_bytes / 1e6,
+        "traced_peak_mb": traced_peak / 1e6,
+        "peak_rss_mb": peak_rss_mb(),
+        "pool": state["pool"].stats() if mode == "pooled" else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alokasi per frame: copy vs FramePool")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--mode", choices=list(MODES), default=None, help="(internal) jalanin 1 mode doang")
+    args = parser.parse_args(argv)
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    if args.mode:
+        print("@@" + json.dumps(run_mode(args.mode, args.frames, size)))
+        return None
+
+    results = []
+    for mode in MODES:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode,
+                               "--frames", str(args.frames), "--size", args.size],
+                              capture_output=True, text=True, cwd=project_root)
+        line = next((l for l in proc.stdout.splitlines() if l.startswith("@@")), None)
+        results.append(json.loads(line[2:]) if line else {"mode": mode, "error": proc.stderr.strip()[-300:]})
+
+    print(f"🧪 {args.frames} frame {args.size}")
+    print(f"{'mode':<8} {'ms/frame':>9} {'allocs/frame':>13} {'MB/frame':>9} {'peak RSS MB':>12} {'traced peak MB':>15}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['mode']:<8} GAGAL: {r['error']}"); continue
+        rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "-"
+        print(f"{r['mode']:<8} {r['ms_per_frame']:>9.2f} {r['allocs_per_frame']:>13} {r['mb_allocated_per_frame']:>9.2f} "
+              f"{rss:>12} {r['traced_peak_mb']:>15.1f}")
+        if r.get("pool"): print(f"         pool: {r['pool']}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
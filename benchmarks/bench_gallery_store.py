@@ -0,0 +1,138 @@
+# benchmarks/bench_gallery_store.py
+"""
+Benchmark gallery store mmap + delta akurasi kuantisasi.
+
+Tiap dtype (float32/float16/int8) dibandingin sama matching float64 in-memory
+(FaceGallery biasa, sama kayak face_distance):
+  - ukuran store di disk & waktu buka
+  - waktu 1 query match
+  - top-1 agreement, jumlah keputusan accept/reject yang kebalik di tolerance
+  - delta jarak (mean/max)
+
+Sumber data:
+  --synthetic N : N identitas acak (mirip sebaran embedding dlib) + probe bernoise
+  --assets DIR  : galeri asli (butuh face_recognition), probe = --probes DIR
+                  (nama file sama kayak galeri) atau galeri + noise
+
+Contoh:
+    python benchmarks/bench_gallery_store.py --synthetic 5000
+    python benchmarks/bench_gallery_store.py --assets assets --probes probes
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+
+from lib.gallery import FaceGallery, GalleryEntry, create_clahe, encode_image, load_gallery, name_from_filename, scan_folder
+from lib.gallery_store import DTYPES, open_gallery_store, save_gallery_store
+
+
+def synthetic_gallery(n: int, seed: int = 0) -> FaceGallery:
+    rng = np.random.default_rng(seed)
+    enc = rng.normal(0.0, 0.09, size=(n, 128))
+    entries = {f"id_{i:06d}.jpg": GalleryEntry(f"Id {i:06d}", enc[i], (0, 0)) for i in range(n)}
+    return FaceGallery(entries)
+
+
+def noisy_probes(gallery: FaceGallery, count: int, sigma: float, impostors: float, seed: int = 1):
+    """Probe = embedding galeri + noise (genuine) atau vektor acak (impostor)"""
+    rng = np.random.default_rng(seed)
+    probes, labels = [], []
+    for _ in range(count):
+        if rng.random() < impostors:
+            probes.append(rng.normal(0.0, 0.09, size=128)); labels.append(None)
+        else:
+            i = int(rng.integers(len(gallery)))
+            probes.append(gallery.encodings[i] + rng.normal(0.0, sigma, size=128)); labels.append(gallery.names[i])
+    return probes, labels
+
+
+def folder_probes(path: str, threshold: float):
+    clahe = create_clahe()
+    probes, labels = [], []
+    for filename in scan_folder(path):
+        enc = encode_image(os.path.join(path, filename), clahe, threshold)
+        if enc is not None:
+            probes.append(enc); labels.append(name_from_filename(filename))
+    return probes, labels
+
+
+def evaluate(reference: FaceGallery, candidate: FaceGallery, probes, labels, tolerance: float):
+    agree = flips = correct = 0
+    deltas = []
+    query_time = 0.0
+    for probe, label in zip(probes, labels):
+        ref_d = reference.distances(probe)
+        start = time.perf_counter()
+        cand_d = candidate.distances(probe)
+        query_time += time.perf_counter() - start
+        deltas.append(np.abs(ref_d - cand_d).max())
+        ri, ci = int(np.argmin(ref_d)), int(np.argmin(cand_d))
+        agree += ri == ci
+        flips += (ref_d[ri] <= tolerance) != (cand_d[ci] <= tolerance)
+        name = candidate.names[ci] if cand_d[ci] <= tolerance else None
+        correct += name == label
+    n = max(1, len(probes))
+    return {
+        "top1_agreement": agree / n,
+        "decision_flips": flips,
+        "accuracy": correct / n,
+        "mean_abs_delta": float(np.mean(deltas)) if deltas else 0.0,
+        "max_abs_delta": float(np.max(deltas)) if deltas else 0.0,
+        "query_us": query_time / n * 1e6,
+    }
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gallery store mmap + delta akurasi kuantisasi")
+    parser.add_argument("--synthetic", type=int, default=None, help="Jumlah identitas acak")
+    parser.add_argument("--assets", default=None)
+    parser.add_argument("--probes", default=None)
+    parser.add_argument("--probe-count", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=0.03, help="Sigma noise probe genuine")
+    parser.add_argument("--impostors", type=float, default=0.2, help="Porsi probe impostor")
+    parser.add_argument("--tolerance", type=float, default=0.60)
+    parser.add_argument("--br-threshold", type=float, default=95)
+    args = parser.parse_args(argv)
+
+    if args.assets:
+        reference = load_gallery(args.assets, threshold=args.br_threshold)
+    else:
+        reference = synthetic_gallery(args.synthetic or 1000)
+    if args.probes:
+        probes, labels = folder_probes(args.probes, args.br_threshold)
+    else:
+        probes, labels = noisy_probes(reference, args.probe_count, args.noise, args.impostors)
+
+    print(f"🧪 Galeri {len(reference)} identitas, {len(probes)} probe, tolerance {args.tolerance}")
+    print(f"{'dtype':<8} {'disk KB':>9} {'open ms':>8} {'query us':>9} {'top1':>7} {'flips':>6} {'acc':>7} {'mean Δ':>9} {'max Δ':>9}")
+    base = evaluate(reference, reference, probes, labels, args.tolerance)
+    print(f"{'float64':<8} {'-':>9} {'-':>8} {base['query_us']:>9.1f} {1:>7.3f} {0:>6} {base['accuracy']:>7.3f} {0:>9.5f} {0:>9.5f}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in DTYPES:
+            path = os.path.join(tmp, f"{dtype}.store")
+            save_gallery_store(reference, path, dtype)
+            start = time.perf_counter()
+            stored = open_gallery_store(path)
+            open_ms = (time.perf_counter() - start) * 1000
+            r = evaluate(reference, stored, probes, labels, args.tolerance)
+            print(f"{dtype:<8} {dir_size(path) / 1024:>9.1f} {open_ms:>8.2f} {r['query_us']:>9.1f} "
+                  f"{r['top1_agreement']:>7.3f} {r['decision_flips']:>6} {r['accuracy']:>7.3f} "
+                  f"{r['mean_abs_delta']:>9.5f} {r['max_abs_delta']:>9.5f}")
+            del stored  # Lepas mmap sebelum folder temp dihapus (Windows)
+
+
+if __name__ == "__main__":
+    main()
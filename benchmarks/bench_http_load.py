@@ -0,0 +1,141 @@
+# benchmarks/bench_http_load.py
+"""
+Load generator buat jalur API (ApiClient & DesktopMiddleware).
+
+Default-nya nyalain mock backend in-process (benchmarks/mock_server.py), terus
+nembak dengan concurrency naik bertahap. Tiap level ngelaporin throughput dan
+latency p50/p90/p99. Dipake buat regresi pooling, retry, dan caching.
+
+Skenario:
+  middleware : DesktopMiddleware.get() langsung ke GetScanDataByQr
+  scan       : ApiClient full flow kayak run_api() (GET GetScanDataByQr + POST ScanQr*)
+
+Contoh:
+    python benchmarks/bench_http_load.py --levels 1 2 4 8 16 --requests 200 --latency-ms 20
+    python benchmarks/bench_http_load.py --base-url http://127.0.0.1:5234 --scenario scan
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.mock_server import MockBackend, MockConfig
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile (samples gak perlu urut)"""
+    if not samples: return 0.0
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[k]
+
+
+def run_level(call: Callable[[int], None], concurrency: int, total: int) -> Dict[str, float]:
+    """Jalanin `total` panggilan dengan `concurrency` thread, balikin statistik"""
+    latencies: List[float] = []
+    errors = 0
+
+    def one(i: int):
+        start = time.perf_counter()
+        try:
+            call(i)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, ok in pool.map(one, range(total)):
+            latencies.append(elapsed)
+            if not ok: errors += 1
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def build_scenario(name: str, base_url: str) -> Callable[[int], None]:
+    """Bikin fungsi panggilan buat skenario `name`"""
+    from lib.api import init_api
+    import middleware as mw_module
+
+    api = init_api(base_url)
+    api.login("bench", "bench", "Public")
+    api.get_permission("bench", "APP01", "ROL23")
+
+    if name == "middleware":
+        mw = mw_module.middleware
+        url = f"{api.base_url}/api/Borrowing/GetScanDataByQr/"
+
+        def call(i: int):
+            mw.get(f"{url}BENCH{i}")
+        return call
+
+    if name == "scan":
+        def call(i: int):
+            qr = f"BENCH{i}"
+            res = api.get(f"/api/Borrowing/GetScanDataByQr/{qr}")
+            if res.get("status", "").lower() == "dipinjam":
+                api.post(f"/api/Borrowing/ScanQrPengembalian/{qr}")
+            else:
+                api.post(f"/api/Borrowing/ScanQrPeminjaman/{qr}")
+        return call
+
+    raise ValueError(f"Skenario tidak dikenal: {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP load benchmark ApiClient/DesktopMiddleware")
+    parser.add_argument("--base-url", default=None, help="Server target (default: mock in-process)")
+    parser.add_argument("--scenario", choices=["middleware", "scan"], default="middleware")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=200, help="Jumlah panggilan per level")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Latency mock server")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = MockBackend(config=MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                               error_rate=args.error_rate)).start()
+        base_url = server.base_url
+
+    results = []
+    try:
+        # Middleware & ApiClient nge-print tiap request, dibungkam biar angka gak kecampur I/O
+        with contextlib.redirect_stdout(io.StringIO()):
+            call = build_scenario(args.scenario, base_url)
+            for level in args.levels:
+                results.append(run_level(call, level, args.requests))
+    finally:
+        if server: server.stop()
+
+    print(f"🚀 Scenario '{args.scenario}' → {base_url}")
+    print(f"{'conc':>5} {'req':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for r in results:
+        print(f"{r['concurrency']:>5} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>9.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p90_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/bench_idle.py
+"""
+Benchmark CPU idle mode (lib.motion.MotionGate) vs mode aktif.
+
+Tanpa GUI: frame sintetis (atau kamera beneran, --camera) diputer di loop
+dengan jadwal kayak update_frame.
+  active : tick 33ms, buffer pool + resize/cvtColor kayak update_frame, plus
+           stage berat yang ke-install (FaceMesh tiap tick, HOG & pyzbar tiap
+           0.5 detik) dijalanin sinkron
+  idle   : tick 100ms, cuma MotionGate.update + render tiap 2 tick
+
+CPU utilisation = waktu CPU proses / waktu wall (100% = 1 core penuh).
+Wake latency = jumlah tick idle dari gerakan pertama sampe gate balik ACTIVE.
+
+Contoh:
+    python benchmarks/bench_idle.py --seconds 10
+    python benchmarks/bench_idle.py --camera 0
+"""
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_frame_pool import RENDER_SIZE, tick_pooled, _Discard
+from lib.frame_pool import FramePool
+from lib.motion import MotionGate
+
+ACTIVE_INTERVAL = 0.033
+IDLE_INTERVAL = 0.100
+IDLE_RENDER_EVERY = 2
+
+
+def heavy_stages():
+    """Stage berat yang ke-install: list (nama, fn(frame_bgr), interval detik)"""
+    stages = []
+    try:
+        import mediapipe as mp
+        mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True)
+        stages.append(("face_mesh", lambda f: mesh.process(cv2.cvtColor(cv2.resize(f, (640, 360)), cv2.COLOR_BGR2RGB)), 0.0))
+    except ImportError:
+        pass
+    try:
+        import face_recognition
+        stages.append(("hog", lambda f: face_recognition.face_locations(
+            cv2.cvtColor(cv2.resize(f, (0, 0), fx=0.2, fy=0.2), cv2.COLOR_BGR2RGB), model="hog"), 0.5))
+    except ImportError:
+        pass
+    try:
+        from pyzbar import pyzbar
+        stages.append(("pyzbar", lambda f: pyzbar.decode(cv2.cvtColor(f, cv2.COLOR_BGR2GRAY)), 0.5))
+    except ImportError:
+        pass
+    return stages
+
+
+class FrameSource:
+    """Kamera beneran, atau frame sintetis: background statis + kotak "orang" yang geser pas moving"""
+
+    def __init__(self, camera=None, size=(1280, 720)):
+        self.cap = cv2.VideoCapture(camera) if camera is not None else None
+        rng = np.random.default_rng(0)
+        self.static = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+        self.size = size
+        self.moving = False
+        self._step = 0
+
+    def read(self):
+        if self.cap is not None:
+            ok, frame = self.cap.read()
+            if ok: return frame
+        if not self.moving: return self.static
+        self._step += 1
+        frame = self.static.copy()
+        x = (self._step * 60) % (self.size[0] - 300)
+        cv2.rectangle(frame, (x, 150), (x + 300, 700), (40, 60, 90), -1)
+        return frame
+
+    def close(self):
+        if self.cap is not None: self.cap.release()
+
+
+def cpu_window(seconds, interval, tick):
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    ticks = 0
+    next_at = wall0
+    while time.perf_counter() - wall0 < seconds:
+        tick(ticks)
+        ticks += 1
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0: time.sleep(delay)
+    wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+    return {"cpu_pct": cpu / wall * 100, "ticks": ticks, "fps": ticks / wall}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU idle mode vs active")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--camera", type=int, default=None, help="Index kamera (default: frame sintetis)")
+    parser.add_argument("--threshold", type=float, default=6.0)
+    args = parser.parse_args(argv)
+
+    source = FrameSource(args.camera)
+    pool, discard = FramePool(), _Discard()
+    stages = heavy_stages()
+    last_run = {name: 0.0 for name, _, _ in stages}
+    render_rgb = np.empty((RENDER_SIZE[1], RENDER_SIZE[0], 3), np.uint8)
+
+    def active_tick(i):
+        raw = source.read()
+        tick_pooled(raw, {"pool": pool}, discard)
+        now = time.perf_counter()
+        for name, fn, every in stages:
+            if now - last_run[name] >= every:
+                fn(raw); last_run[name] = now
+
+    gate = MotionGate(idle_after=0, threshold=args.threshold)
+
+    def idle_tick(i):
+        raw = source.read()
+        gate.update(raw, activity=False)
+        if i % IDLE_RENDER_EVERY == 0:
+            cv2.cvtColor(cv2.resize(raw, RENDER_SIZE), cv2.COLOR_BGR2RGB, dst=render_rgb)
+
+    print(f"🧪 Stage berat aktif: {', '.join(n for n, _, _ in stages) or '(gak ada yang ke-install, cuma pipeline frame)'}")
+    active = cpu_window(args.seconds, ACTIVE_INTERVAL, active_tick)
+    gate.update(source.read(), activity=False); gate.update(source.read(), activity=False)
+    idle = cpu_window(args.seconds, IDLE_INTERVAL, idle_tick)
+
+    # Wake latency: gate lagi IDLE di frame statis, terus mulai ada gerakan
+    wake_ticks = None
+    if args.camera is None:
+        source.moving = True
+        for i in range(1, 11):
+            if gate.update(source.read(), activity=False):
+                wake_ticks = i; break
+            time.sleep(IDLE_INTERVAL)
+
+    print(f"{'mode':<8} {'CPU %':>7} {'fps':>6}")
+    print(f"{'active':<8} {active['cpu_pct']:>7.1f} {active['fps']:>6.1f}")
+    print(f"{'idle':<8} {idle['cpu_pct']:>7.1f} {idle['fps']:>6.1f}")
+    if wake_ticks is not None:
+        print(f"👋 Wake latency: {wake_ticks} tick idle (≤ {wake_ticks * IDLE_INTERVAL * 1000:.0f} ms), "
+              f"skor gerakan {gate.last_score:.1f}")
+    source.close()
+    return {"active": active, "idle": idle, "wake_ticks": wake_ticks}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/bench_landmark_encoder.py
+"""
+Benchmark encoding pake landmark MediaPipe (lib.landmark_encoder) vs jalur
+face_recognition biasa (shape predictor dlib 5 titik) di foto galeri.
+
+Per gambar:
+  - waktu encode stock (predictor + chip + ResNet) vs landmark (chip + ResNet);
+    FaceMesh dilaporin terpisah karena di app udah dibayar mediapipe_worker
+  - jarak titik alignment MediaPipe vs dlib, dinormalisasi jarak antar mata
+  - jarak L2 encoding stock vs landmark
+  - parity keputusan match leave-one-out: encoding tiap foto dicocokin ke
+    galeri stock tanpa foto itu sendiri, keputusan (nama / None) dibandingin
+
+Contoh:
+    python benchmarks/bench_landmark_encoder.py
+    python benchmarks/bench_landmark_encoder.py --images assets --repeat 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+import dlib
+import face_recognition
+import mediapipe as mp
+import numpy as np
+from face_recognition import api as fr_api
+
+from lib.face_quality import largest_face
+from lib.gallery import IMAGE_EXTENSIONS, FaceGallery, GalleryEntry, name_from_filename
+from lib.landmark_encoder import encode_aligned, five_points
+
+
+def timed(fn, repeat):
+    result = fn()  # warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Landmark MediaPipe vs shape predictor dlib buat encoding")
+    parser.add_argument("--images", default=os.path.join(project_root, "assets"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.60)
+    args = parser.parse_args(argv)
+
+    rows = []
+    with mp.solutions.face_mesh.FaceMesh(static_image_mode=True, refine_landmarks=True) as mesh:
+        for filename in sorted(os.listdir(args.images)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS): continue
+            bgr = cv2.imread(os.path.join(args.images, filename))
+            if bgr is None: continue
+            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            loc = largest_face(face_recognition.face_locations(rgb))
+            if loc is None:
+                print(f"⚠️ {filename}: HOG gak nemu wajah, skip"); continue
+            res, mesh_t = timed(lambda: mesh.process(rgb), 1)
+            if not res.multi_face_landmarks:
+                print(f"⚠️ {filename}: FaceMesh gak nemu wajah, skip"); continue
+            lms = res.multi_face_landmarks[0].landmark
+            h, w = rgb.shape[:2]
+
+            stock, stock_t = timed(lambda: face_recognition.face_encodings(rgb, [loc])[0], args.repeat)
+            points = five_points(lms, w, h)
+            fast, fast_t = timed(lambda: encode_aligned(rgb, five_points(lms, w, h)), args.repeat)
+
+            top, right, bottom, left = loc
+            shape = fr_api.pose_predictor_5_point(rgb, dlib.rectangle(left, top, right, bottom))
+            dlib_pts = np.array([(p.x, p.y) for p in shape.parts()], dtype=float)
+            mp_pts = np.array(points, dtype=float)
+            eye_dist = np.linalg.norm(dlib_pts[0:2].mean(0) - dlib_pts[2:4].mean(0)) or 1.0
+            rows.append({
+                "file": filename, "name": name_from_filename(filename),
+                "stock": stock, "fast": fast,
+                "stock_ms": stock_t * 1000, "fast_ms": fast_t * 1000, "mesh_ms": mesh_t * 1000,
+                "point_err": float(np.linalg.norm(dlib_pts - mp_pts, axis=1).mean() / eye_dist),
+                "enc_dist": float(np.linalg.norm(stock - fast)),
+            })
+
+    if not rows:
+        print("❌ Gak ada gambar yang bisa dibandingin"); return None
+
+    # Leave-one-out: galeri stock tanpa foto itu sendiri
+    parity = 0
+    for i, r in enumerate(rows):
+        others = FaceGallery({o["file"]: GalleryEntry(o["name"], o["stock"], (0, 0)) for j, o in enumerate(rows) if j != i})
+        if not len(others):
+            parity += 1; continue
+        parity += others.match(r["stock"], args.tolerance)[0] == others.match(r["fast"], args.tolerance)[0]
+
+    print(f"{'file':<22} {'stock ms':>9} {'mp ms':>7} {'mesh ms':>8} {'pt err':>7} {'enc Δ':>7}")
+    for r in rows:
+        print(f"{r['file']:<22} {r['stock_ms']:>9.2f} {r['fast_ms']:>7.2f} {r['mesh_ms']:>8.1f} "
+              f"{r['point_err']:>7.3f} {r['enc_dist']:>7.4f}")
+    stock_ms = statistics.median(r["stock_ms"] for r in rows)
+    fast_ms = statistics.median(r["fast_ms"] for r in rows)
+    print(f"\n⚡ Median encode: stock {stock_ms:.2f} ms, landmark {fast_ms:.2f} ms ({stock_ms / fast_ms:.2f}x)")
+    print(f"🎯 Jarak encoding stock vs landmark: mean {statistics.mean(r['enc_dist'] for r in rows):.4f}, "
+          f"max {max(r['enc_dist'] for r in rows):.4f} (tolerance {args.tolerance})")
+    print(f"🤝 Parity keputusan match (leave-one-out): {parity}/{len(rows)}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_match_service.py
+"""
+Benchmark match daemon (lib.match_service) vs matching in-process.
+
+Galeri sintetis N wajah (embedding random), C client paralel (kayak C
+instance scanner di 1 mesin) tiap client kirim R request K wajah. Dibandingin:
+  - inproc : tiap client manggil gallery.match_many sendiri
+  - daemon : lewat Unix socket, micro-batching di daemon (max_wait beda-beda)
+Yang diukur: latency per request (p50/p95), throughput, rata-rata ukuran batch
+daemon, plus cek hasil daemon == in-process.
+
+Contoh:
+    python benchmarks/bench_match_service.py
+    python benchmarks/bench_match_service.py --gallery 5000 --clients 4 --wait-ms 0 1 2 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+
+from lib.gallery import FaceGallery, GalleryEntry
+from lib.match_service import MatchClient, MatchServer
+
+
+def run_clients(clients, requests, queries, call):
+    """Jalanin `clients` thread, tiap thread `requests` kali call(client_idx, queries). Return (latencies, detik)"""
+    latencies, lock = [], threading.Lock()
+
+    def worker(idx):
+        mine = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            call(idx, queries)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return latencies, time.perf_counter() - start
+
+
+def summarize(label, latencies, elapsed, extra=""):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<16} {statistics.median(latencies) * 1000:>8.3f} {p95 * 1000:>8.3f} "
+          f"{len(latencies) / elapsed:>10.0f} {extra}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match daemon vs matching in-process")
+    parser.add_argument("--gallery", type=int, default=1000, help="Jumlah wajah galeri sintetis")
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=300, help="Request per client")
+    parser.add_argument("--faces", type=int, default=1, help="Wajah per request")
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[0.0, 2.0])
+    parser.add_argument("--tolerance", type=float, default=0.60)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    known = (rng.normal(size=(args.gallery, 128)) * 0.1).astype(np.float32)
+    gallery = FaceGallery({f"{i}.jpg": GalleryEntry(f"user{i}", known[i], (0, 0)) for i in range(args.gallery)})
+    queries = known[rng.integers(0, args.gallery, args.faces)] + rng.normal(scale=0.01, size=(args.faces, 128)).astype(np.float32)
+    expected = gallery.match_many(queries, args.tolerance)
+
+    print(f"Galeri {args.gallery}, {args.clients} client x {args.requests} request x {args.faces} wajah\n")
+    print(f"{'mode':<16} {'p50 ms':>8} {'p95 ms':>8} {'req/detik':>10}")
+    lat, elapsed = run_clients(args.clients, args.requests, queries,
+                               lambda _, q: gallery.match_many(q, args.tolerance))
+    summarize("inproc", lat, elapsed)
+
+    for wait_ms in args.wait_ms:
+        path = os.path.join(tempfile.gettempdir(), f"bench-match-{os.getpid()}.sock")
+        server = MatchServer(gallery, path, max_wait=wait_ms / 1000).start()
+        try:
+            clients = [MatchClient(path, timeout=5) for _ in range(args.clients)]
+            same = clients[0].match_many(queries, args.tolerance)
+            same = same is not None and [n for n, _ in same] == [n for n, _ in expected]
+            lat, elapsed = run_clients(args.clients, args.requests, queries,
+                                       lambda i, q: clients[i].match_many(q, args.tolerance))
+            stats = server.stats()
+            summarize(f"daemon {wait_ms:g}ms", lat, elapsed,
+                      f"batch avg {stats['avg_batch']:.1f} max {stats['max_batch']}  {'✅' if same else '❌'}")
+            for client in clients: client.close()
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# benchmarks/bench_micro.py
+"""
+Micro-benchmark fungsi panas + baseline per mesin + cek regresi.
+
+Semua input sintetis (gak perlu kamera, foto, atau server asli), jadi bisa
+jalan offline. Yang diukur kode app yang asli:
+  enhance_bright / enhance_dark   gallery.apply_enhancement di frame kecil FR (terang / gelap)
+  match_<N>                       FaceGallery.match_many 3 wajah, galeri N orang
+  check_liveness                  lib.tracking.liveness_moves + cek challenge (isi check_liveness)
+  qr_decode_hit / qr_decode_miss  Scanner.decode_centers (decode di qr_worker), frame 1280x720 dengan / tanpa QR
+  render_convert                  lib.frame_pool.to_display_image (resize + RGB + PIL, bagian render_ui)
+  http_session / http_middleware  requests.Session vs DesktopMiddleware.request ke mock server lokal
+
+Baseline disimpen per mesin (id dari lib.calibration.host_fingerprint) di
+benchmarks/baselines/<id>.json. Run pertama di mesin baru nyimpen baseline;
+run berikutnya gagal (exit 1) kalo ada fungsi yang lebih lambat dari
+baseline x (1 + threshold). Case yang butuh modul yang gak ada di-skip.
+Main.py gak di-import (GUI, session.json): fungsi panasnya ada di lib/Scanner.
+
+Contoh:
+    python benchmarks/bench_micro.py                      # bandingin sama baseline (bikin kalo belum ada)
+    python benchmarks/bench_micro.py --save               # timpa baseline (habis optimasi yang disengaja)
+    python benchmarks/bench_micro.py --threshold 0.1 --only match enhance
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+
+from lib.calibration import host_fingerprint
+
+BASELINE_DIR = os.path.join(current_dir, "baselines")
+FRAME_SIZE = (1280, 720)
+FR_SCALING = 0.2
+
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[], Callable[[], None]]  # Return fungsi yang diukur (setup gak ikut keukur)
+    noise: float = 0.0  # Threshold minimal case ini (case yang berisik, misal jaringan)
+
+
+# ============ CASES ============
+
+def synthetic_frame(level: int, size=FRAME_SIZE, seed: int = 0):
+    """Frame BGR noise di sekitar kecerahan `level`"""
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.normal(level, 25, (size[1], size[0], 3)), 0, 255).astype(np.uint8)
+
+
+def enhance_case(level: int):
+    def setup():
+        import cv2
+        from lib.gallery import apply_enhancement, create_clahe
+        clahe = create_clahe()
+        small = cv2.resize(synthetic_frame(level), (0, 0), fx=FR_SCALING, fy=FR_SCALING)
+        return lambda: apply_enhancement(small, clahe, 95)
+    return setup
+
+
+def match_case(size: int):
+    def setup():
+        from lib.gallery import FaceGallery, GalleryEntry
+        rng = np.random.default_rng(size)
+        known = (rng.normal(size=(size, 128)) * 0.1).astype(np.float32)
+        gallery = FaceGallery({f"{i}.jpg": GalleryEntry(f"user{i}", known[i], (0, 0)) for i in range(size)})
+        queries = known[:3] + np.float32(0.01)
+        return lambda: gallery.match_many(queries, 0.6)
+    return setup
+
+
+def liveness_setup():
+    from lib.tracking import FaceTrack, liveness_moves
+    # Landmark FaceMesh sintetis: wajah lurus, mulut ketutup
+    lms = [SimpleNamespace(x=0.5, y=0.5, z=0.0) for _ in range(478)]
+    lms[234].x, lms[454].x, lms[10].y, lms[152].y = 0.4, 0.6, 0.3, 0.7
+    track = FaceTrack(1, lms, 1.2)
+    track.challenge = "Tengok Kanan"  # Gak kepenuhin, sama kayak hampir semua tick di app
+    return lambda: track.challenge in liveness_moves(track.lms)
+
+
+def qr_frame(with_qr: bool):
+    import cv2
+    frame = synthetic_frame(128)
+    if with_qr:
+        code = cv2.QRCodeEncoder.create().encode("BENCH-QR-0001")
+        code = cv2.resize(code, (240, 240), interpolation=cv2.INTER_NEAREST)
+        frame[240:480, 520:760] = cv2.cvtColor(code, cv2.COLOR_GRAY2BGR)
+    return frame
+
+
+def qr_case(with_qr: bool):
+    def setup():
+        from Scanner import decode_centers
+        frame = qr_frame(with_qr)
+        if with_qr and not decode_centers(frame): raise RuntimeError("QR sintetis gak kebaca")
+        return lambda: decode_centers(frame)
+    return setup
+
+
+def render_setup():
+    from lib.frame_pool import FramePool, to_display_image
+    pool = FramePool()
+    frame = synthetic_frame(128)
+    return lambda: to_display_image(pool, frame, 1024, 576)
+
+
+_server = None
+
+
+def mock_server():
+    global _server
+    if _server is None:
+        from benchmarks.mock_server import MockBackend, MockConfig
+        _server = MockBackend(config=MockConfig(require_auth=False)).start()
+    return _server
+
+
+def http_case(middleware: bool):
+    def setup():
+        from middleware import DesktopMiddleware
+        url = f"{mock_server().base_url}/api/Borrowing/GetScanDataByQr/BENCH"
+        with contextlib.redirect_stdout(io.StringIO()):
+            mw = DesktopMiddleware(max_retries=0)
+
+        def run():
+            if middleware:
+                with contextlib.redirect_stdout(io.StringIO()):  # Log middleware ikut keukur, output-nya dibuang
+                    mw.request("GET", url)
+            else:
+                mw.session.get(url, timeout=(mw.connect_timeout, mw.read_timeout))
+        return run
+    return setup
+
+
+CASES: List[Case] = [
+    Case("enhance_bright", enhance_case(180)),
+    Case("enhance_dark", enhance_case(40)),
+    Case("match_100", match_case(100)),
+    Case("match_1000", match_case(1000)),
+    Case("match_10000", match_case(10000)),
+    Case("check_liveness", liveness_setup),
+    Case("qr_decode_hit", qr_case(True)),
+    Case("qr_decode_miss", qr_case(False)),
+    Case("render_convert", render_setup),
+    Case("http_session", http_case(False), noise=0.5),
+    Case("http_middleware", http_case(True), noise=0.5),
+]
+
+
+# ============ RUNNER ============
+
+def measure(fn: Callable[[], None], rounds: int, min_time: float) -> float:
+    """Median mikrodetik per panggilan; jumlah panggilan per round diatur biar round >= min_time"""
+    fn()  # Warm-up
+    number, elapsed = 1, 0.0
+    while True:
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20: break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    samples = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples) * 1e6
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(path: str, host: Dict, results: Dict[str, float], old: Optional[Dict] = None):
+    # Case yang di-skip / gak dijalanin kali ini tetap pake baseline lama
+    cases = dict((old or {}).get("cases", {}), **results)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"host": host, "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"), "cases": cases}, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark fungsi panas + cek regresi vs baseline mesin ini")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Lebih lambat dari baseline x (1 + ini) = regresi")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Durasi minimal 1 round (detik)")
+    parser.add_argument("--only", nargs="+", help="Cuma case yang namanya diawali salah satu prefix ini")
+    parser.add_argument("--baseline", help="File baseline (default: benchmarks/baselines/<host id>.json)")
+    parser.add_argument("--save", action="store_true", help="Simpen hasil run ini jadi baseline")
+    args = parser.parse_args(argv)
+
+    host = host_fingerprint()
+    path = args.baseline or os.path.join(BASELINE_DIR, f"{host['id']}.json")
+    baseline = load_baseline(path)
+    base_cases = (baseline or {}).get("cases", {})
+    cases = [c for c in CASES if not args.only or any(c.name.startswith(p) for p in args.only)]
+
+    print(f"🖥️ {host['cpu']} ({host['cores']} core), baseline: {path if baseline else '(belum ada)'}\n")
+    print(f"{'case':<18} {'µs/call':>11} {'baseline':>11} {'delta':>8}")
+    results, regressions = {}, []
+    try:
+        for case in cases:
+            try:
+                fn = case.setup()
+                fn()  # Modul lazy baru ke-import di panggilan pertama: gagal di sini = skip
+            except (Exception, SystemExit) as e:  # SystemExit: modul yang exit pas gagal import
+                print(f"{case.name:<18} {'skip':>11}  ({type(e).__name__}: {e})")
+                continue
+            us = results[case.name] = measure(fn, args.rounds, args.min_time)
+            base = base_cases.get(case.name)
+            if base is None:
+                print(f"{case.name:<18} {us:>11.2f} {'-':>11}")
+                continue
+            delta = us / base - 1
+            limit = max(args.threshold, case.noise)
+            regressed = delta > limit
+            if regressed: regressions.append((case.name, delta, limit))
+            print(f"{case.name:<18} {us:>11.2f} {base:>11.2f} {delta * 100:>+7.1f}% {'❌' if regressed else '✅'}")
+    finally:
+        if _server is not None: _server.stop()
+
+    if args.save or baseline is None:
+        save_baseline(path, host, results, baseline)
+        print(f"\n💾 Baseline disimpen: {path}")
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresi:")
+        for name, delta, limit in regressions:
+            print(f"   {name}: {delta * 100:+.1f}% (batas {limit * 100:.0f}%)")
+        return 0 if args.save else 1
+    print("\n✅ Gak ada regresi")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# benchmarks/bench_multi_face.py
+"""
+Benchmark encoding beberapa wajah sekaligus (multi-person, lib.tracking).
+
+Foto galeri diambil K sekaligus (K = 1..--max-faces, kayak K orang antre di
+depan kiosk). Per K dibandingin:
+  - loop    : encode_aligned per wajah + gallery.match per wajah (pola lama x K)
+  - batch   : encode_aligned_batch (1 panggilan ResNet) + gallery.match_many
+  - fallback: face_recognition.face_encodings per wajah vs encode_locations_batch
+Plus cek hasil batch == hasil loop (jarak encoding maksimal).
+
+Contoh:
+    python benchmarks/bench_multi_face.py
+    python benchmarks/bench_multi_face.py --images assets --max-faces 4
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+import face_recognition
+import mediapipe as mp
+import numpy as np
+
+from lib.face_quality import largest_face
+from lib.gallery import IMAGE_EXTENSIONS, FaceGallery, GalleryEntry, name_from_filename
+from lib.landmark_encoder import encode_aligned, encode_aligned_batch, encode_locations_batch, five_points
+
+
+def timed(fn, repeat):
+    result = fn()  # warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def load_faces(path):
+    """List (file, rgb, loc, points) foto galeri yang kebaca HOG & FaceMesh"""
+    faces = []
+    with mp.solutions.face_mesh.FaceMesh(static_image_mode=True, refine_landmarks=True) as mesh:
+        for filename in sorted(os.listdir(path)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS): continue
+            bgr = cv2.imread(os.path.join(path, filename))
+            if bgr is None: continue
+            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            loc = largest_face(face_recognition.face_locations(rgb))
+            res = mesh.process(rgb)
+            if loc is None or not res.multi_face_landmarks:
+                print(f"⚠️ {filename}: wajah gak kebaca, skip"); continue
+            h, w = rgb.shape[:2]
+            faces.append((filename, rgb, loc, five_points(res.multi_face_landmarks[0].landmark, w, h)))
+    return faces
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encoding & matching K wajah: loop vs batch")
+    parser.add_argument("--images", default=os.path.join(project_root, "assets"))
+    parser.add_argument("--max-faces", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.60)
+    args = parser.parse_args(argv)
+
+    faces = load_faces(args.images)
+    if not faces:
+        print("❌ Gak ada foto yang bisa dipake"); return None
+    gallery = FaceGallery({f: GalleryEntry(name_from_filename(f), encode_aligned(rgb, pts), (0, 0))
+                           for f, rgb, _, pts in faces})
+
+    rows = []
+    for k in range(1, args.max_faces + 1):
+        batch = [faces[i % len(faces)] for i in range(k)]
+        aligned = [(rgb, pts) for _, rgb, _, pts in batch]
+        located = [(rgb, loc) for _, rgb, loc, _ in batch]
+
+        loop, loop_t = timed(lambda: [gallery.match(encode_aligned(rgb, pts), args.tolerance)
+                                      for rgb, pts in aligned], args.repeat)
+        batched, batch_t = timed(lambda: gallery.match_many(encode_aligned_batch(aligned), args.tolerance),
+                                 args.repeat)
+        _, stock_t = timed(lambda: [face_recognition.face_encodings(rgb, [loc])[0] for rgb, loc in located],
+                           args.repeat)
+        _, fallback_t = timed(lambda: encode_locations_batch(located), args.repeat)
+
+        enc_delta = max(float(np.linalg.norm(encode_aligned(rgb, pts) - enc))
+                        for (rgb, pts), enc in zip(aligned, encode_aligned_batch(aligned)))
+        rows.append({"k": k, "loop_ms": loop_t * 1000, "batch_ms": batch_t * 1000,
+                     "stock_ms": stock_t * 1000, "fallback_ms": fallback_t * 1000,
+                     "same": [n for n, _ in loop] == [n for n, _ in batched], "enc_delta": enc_delta})
+
+    print(f"{'K':>2} {'loop ms':>8} {'batch ms':>9} {'stock ms':>9} {'fb batch':>9} {'sama':>5} {'enc Δ':>8}")
+    for r in rows:
+        print(f"{r['k']:>2} {r['loop_ms']:>8.2f} {r['batch_ms']:>9.2f} {r['stock_ms']:>9.2f} "
+              f"{r['fallback_ms']:>9.2f} {'✅' if r['same'] else '❌':>5} {r['enc_delta']:>8.5f}")
+    last = rows[-1]
+    print(f"\n⚡ {last['k']} wajah: batch {last['loop_ms'] / last['batch_ms']:.2f}x vs loop, "
+          f"per wajah {last['batch_ms'] / last['k']:.2f} ms (1 wajah: {rows[0]['batch_ms']:.2f} ms)")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# benchmarks/bench_param_sweep.py
+"""
+Sweep parameter FR: akurasi vs kecepatan di dataset berlabel lokal.
+
+Tiap kombinasi FR_SCALING x BR_THRESHOLD x upsample HOG x resolusi mesh
+dijalanin lewat kode app yang asli (AppSIMPEL.mediapipe_worker,
+detect_face_worker -> apply_enhancement, identify_face_worker), bukan salinan.
+Worker dipanggil sinkron di scanner tanpa UI (SweepScanner), encoding tiap
+frame disimpen, lalu FR_TOLERANCE di-sweep di atas encoding itu (tolerance
+cuma ngaruh ke matching, gak perlu encode ulang). CPU time per frame =
+mesh + deteksi + encode + matching di tolerance itu.
+
+FaceMesh gak dibagi antar probe: foto pake FaceMesh static_image_mode (tiap
+gambar dideteksi dari nol), tiap klip dapet FaceMesh mode video baru, jadi
+tracking klip sebelumnya / konfigurasi mesh lain gak kebawa.
+Butuh Main.py bisa di-import (customtkinter, face_recognition, mediapipe).
+
+Dataset:
+    assets/                      galeri (nama dari nama file, sama kayak app)
+    probes/Nur_Zahra/*.jpg       probe orang yang ada di galeri (nama folder = label)
+    probes/Nur_Zahra/antre.mp4   klip juga boleh (diambil tiap --clip-stride frame)
+    probes/unknown/*.jpg         orang yang GAK ada di galeri (buat false accept)
+
+Metrik per konfigurasi:
+    akurasi : probe genuine yang teridentifikasi dengan nama yang bener
+    FAR     : probe yang diterima sebagai orang yang salah (impostor yang lolos
+              + genuine yang ketuker) dibagi semua probe
+    cpu ms  : median CPU time per frame (time.process_time)
+Frontier Pareto (akurasi maks, FAR min, cpu min) ditandain ★.
+
+Contoh:
+    python benchmarks/bench_param_sweep.py --probes dataset/probes
+    python benchmarks/bench_param_sweep.py --probes dataset/probes --scaling 0.2 0.25 --tolerance 0.5 0.6 \\
+        --br 80 95 --upsample 0 1 --mesh 640x360 480x270 --json sweep.json
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+
+from lib.face_detect import HogDetector
+from lib.face_quality import QualityThresholds
+from lib.frame_pool import FramePool
+from lib.gallery import IMAGE_EXTENSIONS, create_clahe, load_gallery, name_from_filename
+from lib.preload import MAX_FACES, create_face_mesh
+from lib.result_bus import ResultBus
+from lib.tracking import FaceTracker
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+UNKNOWN_LABEL = "unknown"
+WORKERS = ("apply_enhancement", "get_face_detector", "mediapipe_worker", "detect_face_worker", "identify_face_worker")
+
+
+class RecordingClient:
+    """Pengganti match_client: nyimpen encoding dari identify_face_worker, matching-nya di-sweep belakangan"""
+
+    def __init__(self):
+        self.encodings = None
+
+    def match_many(self, encodings, tolerance):
+        self.encodings = encodings
+        return [(None, None)] * len(encodings)
+
+
+class SweepScanner:
+    """Scanner tanpa UI: method worker diambil langsung dari AppSIMPEL (lihat bind_workers)"""
+
+    @classmethod
+    def bind_workers(cls, app_class):
+        for name in WORKERS: setattr(cls, name, getattr(app_class, name))
+
+    def __init__(self, config, face_mesh):
+        self.FR_SCALING = config["scaling"]
+        self.FR_TOLERANCE = None  # Di-sweep di score()
+        self.BR_THRESHOLD = config["br"]
+        self.MESH_SIZE = config["mesh"]
+        self.FR_DETECTOR = "hog"
+        self.FR_LANDMARK_ENCODER = True
+        self.FACE_QUALITY = QualityThresholds()
+        self.last_face_quality = None
+        self.clahe = create_clahe()
+        self.face_detector = HogDetector(upsample=config["upsample"])
+        self.face_mesh = face_mesh
+        self.face_gallery = None
+        self.startup = SimpleNamespace(match_client=RecordingClient())
+        self.tracker = FaceTracker(max_tracks=MAX_FACES)
+        self.results = ResultBus()
+        self.frame_pool = FramePool()
+        self.seq = 0
+        self.is_mesh_processing = self.is_detecting_face = self.is_identifying_face = False
+
+    def process(self, raw):
+        """1 frame kamera lewat mesh -> track -> detect -> encode. Return encoding (None = gak ada yang di-encode)"""
+        self.seq += 1
+        frame = self.frame_pool.acquire_like(raw)
+        cv2.flip(raw, 1, dst=frame.array)  # Kamera di app di-mirror
+        mini = self.frame_pool.acquire((self.MESH_SIZE[1], self.MESH_SIZE[0], 3))
+        cv2.cvtColor(cv2.resize(frame.array, self.MESH_SIZE), cv2.COLOR_BGR2RGB, dst=mini.array)
+        self.mediapipe_worker(mini, self.seq)
+        self.tracker.update(self.results.latest("mesh").value)
+        self.detect_face_worker(frame, self.seq)  # Release frame di dalem
+        ready = [t for t in self.tracker.tracks if t.best_face.has_candidate()]
+        if not ready: return None
+        client = self.startup.match_client
+        client.encodings = None
+        self.identify_face_worker(ready)
+        return client.encodings
+
+
+def load_probes(path, frame_width, clip_stride, clip_frames):
+    """List (label, [frame BGR, ...], klip?); 1 foto = 1 frame, 1 klip = beberapa frame"""
+    probes = []
+    for label_dir in sorted(os.listdir(path)):
+        folder = os.path.join(path, label_dir)
+        if not os.path.isdir(folder): continue
+        label = None if label_dir.lower() == UNKNOWN_LABEL else name_from_filename(label_dir)
+        for filename in sorted(os.listdir(folder)):
+            file_path = os.path.join(folder, filename)
+            lower = filename.lower()
+            is_clip = lower.endswith(VIDEO_EXTENSIONS)
+            if lower.endswith(IMAGE_EXTENSIONS):
+                frames = [cv2.imread(file_path)]
+            elif is_clip:
+                frames, cap, idx = [], cv2.VideoCapture(file_path), 0
+                while len(frames) < clip_frames:
+                    ok, img = cap.read()
+                    if not ok: break
+                    if idx % clip_stride == 0: frames.append(img)
+                    idx += 1
+                cap.release()
+            else:
+                continue
+            frames = [f for f in frames if f is not None]
+            if not frames: continue
+            factor = frame_width / frames[0].shape[1]
+            probes.append((label, [cv2.resize(f, (0, 0), fx=factor, fy=factor) for f in frames], is_clip))
+    return probes
+
+
+def encode_probes(config, probes):
+    """
+    Jalanin semua probe di 1 konfigurasi. Return list (label, [(cpu detik, encoding / None), ...]).
+    Tiap probe dapet scanner (tracker) baru; foto pake FaceMesh statis, klip FaceMesh video baru.
+    """
+    encoded = []
+    static_mesh = create_face_mesh(MAX_FACES, static_image_mode=True)
+    try:
+        for label, frames, is_clip in probes:
+            face_mesh = create_face_mesh(MAX_FACES) if is_clip else static_mesh
+            scanner = SweepScanner(config, face_mesh)
+            try:
+                results = []
+                for raw in frames:
+                    start = time.process_time()
+                    encodings = scanner.process(raw)
+                    results.append((time.process_time() - start, encodings))
+            finally:
+                if is_clip: face_mesh.close()
+            encoded.append((label, results))
+    finally:
+        static_mesh.close()
+    return encoded
+
+
+def score(encoded, face_gallery, tolerance):
+    """Matching encoding yang udah di-cache di 1 tolerance. Klip: keputusan = identitas terakhir yang keluar."""
+    correct = wrong_accept = genuine = 0
+    cpu = []
+    for label, results in encoded:
+        decision = None
+        for cpu_s, encodings in results:
+            if encodings is not None:
+                start = time.process_time()
+                name, _ = face_gallery.match_many(encodings, tolerance)[0]  # Wajah pertama, sama kayak identity[0]
+                cpu_s += time.process_time() - start
+                decision = name or "UNKNOWN"
+            cpu.append(cpu_s)
+        accepted = decision not in (None, "UNKNOWN")
+        if label is not None:
+            genuine += 1
+            if decision == label: correct += 1
+            elif accepted: wrong_accept += 1
+        elif accepted:
+            wrong_accept += 1
+    return {"accuracy": correct / genuine if genuine else 0.0,
+            "far": wrong_accept / len(encoded) if encoded else 0.0,
+            "cpu_ms": statistics.median(cpu) * 1000 if cpu else 0.0}
+
+
+def pareto(rows):
+    """Tandain row yang gak didominasi (akurasi >=, FAR <=, cpu <=, minimal 1 lebih baik)"""
+    def dominates(a, b):
+        no_worse = a["accuracy"] >= b["accuracy"] and a["far"] <= b["far"] and a["cpu_ms"] <= b["cpu_ms"]
+        better = a["accuracy"] > b["accuracy"] or a["far"] < b["far"] or a["cpu_ms"] < b["cpu_ms"]
+        return no_worse and better
+    for row in rows:
+        row["pareto"] = not any(dominates(other, row) for other in rows if other is not row)
+    return rows
+
+
+def parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep parameter FR: akurasi, false accept, CPU per frame")
+    parser.add_argument("--gallery", default=os.path.join(project_root, "assets"))
+    parser.add_argument("--probes", required=True, help="Folder probe: 1 subfolder per orang + 'unknown'")
+    parser.add_argument("--scaling", type=float, nargs="+", default=[0.2, 0.25, 0.33])
+    parser.add_argument("--tolerance", type=float, nargs="+", default=[0.50, 0.55, 0.60])
+    parser.add_argument("--br", type=float, nargs="+", default=[80, 95, 110])
+    parser.add_argument("--upsample", type=int, nargs="+", default=[1])
+    parser.add_argument("--mesh", type=parse_size, nargs="+", default=[(640, 360), (480, 270)])
+    parser.add_argument("--frame-width", type=int, default=1280, help="Probe di-resize ke lebar frame kamera")
+    parser.add_argument("--clip-stride", type=int, default=5)
+    parser.add_argument("--clip-frames", type=int, default=30)
+    parser.add_argument("--json", help="Simpen semua hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        from Main import AppSIMPEL
+    except (ImportError, SystemExit):  # Main.py exit(1) kalo import-nya gagal (pesan Import Error di atas)
+        print("❌ Main.py gak bisa di-import: sweep jalanin worker AppSIMPEL, butuh customtkinter, "
+              "face_recognition & mediapipe ke-install")
+        return None
+    SweepScanner.bind_workers(AppSIMPEL)
+
+    probes = load_probes(args.probes, args.frame_width, args.clip_stride, args.clip_frames)
+    if not probes:
+        print("❌ Gak ada probe yang bisa dipake"); return None
+    genuine = sum(1 for label, _, _ in probes if label is not None)
+    print(f"📂 {len(probes)} probe ({genuine} genuine, {len(probes) - genuine} unknown), "
+          f"{sum(len(f) for _, f, _ in probes)} frame")
+
+    galleries = {}  # Galeri cuma tergantung BR_THRESHOLD
+    rows = []
+    grid = list(itertools.product(args.scaling, args.br, args.upsample, args.mesh))
+    for i, (scaling, br, upsample, mesh) in enumerate(grid, 1):
+        if br not in galleries: galleries[br] = load_gallery(args.gallery, threshold=br)
+        config = {"scaling": scaling, "br": br, "upsample": upsample, "mesh": mesh}
+        print(f"⏳ [{i}/{len(grid)}] {config}", end="\r")
+        encoded = encode_probes(config, probes)  # Encode sekali, tolerance di-sweep di atasnya
+        for tolerance in args.tolerance:
+            rows.append({**config, "tolerance": tolerance, **score(encoded, galleries[br], tolerance)})
+    pareto(rows)
+
+    print(f"\n{'scale':>5} {'tol':>5} {'br':>4} {'up':>3} {'mesh':>8} {'akurasi':>8} {'FAR':>6} {'cpu ms':>7}")
+    for r in sorted(rows, key=lambda r: (-r["accuracy"], r["far"], r["cpu_ms"])):
+        mesh = f"{r['mesh'][0]}x{r['mesh'][1]}"
+        print(f"{r['scaling']:>5.2f} {r['tolerance']:>5.2f} {r['br']:>4.0f} {r['upsample']:>3} {mesh:>8} "
+              f"{r['accuracy'] * 100:>7.1f}% {r['far'] * 100:>5.1f}% {r['cpu_ms']:>7.1f} {'★' if r['pareto'] else ''}")
+    frontier = [r for r in rows if r["pareto"]]
+    print(f"\n★ Frontier Pareto: {len(frontier)} dari {len(rows)} konfigurasi")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 {args.json}")
+    return rows
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() is not None else 1)
@@ -0,0 +1,163 @@
+# benchmarks/bench_startup.py
+"""
+Benchmark startup: waktu import per modul + time-to-first-frame.
+
+Mode:
+  imports     : tiap modul di-import di interpreter baru pakai `-X importtime`,
+                dilaporin waktu kumulatif (ms). Modul app (Main, lib.api, ...)
+                harusnya murah karena dependency berat udah lazy.
+  first-frame : di interpreter baru, ukur waktu dari start proses sampai frame
+                kamera pertama lewat startup graph (lib.preload) tanpa GUI, plus
+                kapan semua subsystem siap dan durasi tiap task.
+  gui         : sama, tapi lewat AppSIMPEL beneran (butuh display, kamera, dan
+                session.json yang valid). Diukur sampai AppSIMPEL.first_frame_at.
+
+Contoh:
+    python benchmarks/bench_startup.py imports
+    python benchmarks/bench_startup.py first-frame --runs 3
+    python benchmarks/bench_startup.py --json imports first-frame
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+
+# Modul app dulu, terus dependency berat buat pembanding
+DEFAULT_MODULES = [
+    "middleware",
+    "lib.api",
+    "app.auth.login",
+    "Main",
+    "customtkinter",
+    "numpy",
+    "cv2",
+    "PIL.ImageTk",
+    "pyzbar.pyzbar",
+    "face_recognition",
+    "mediapipe",
+]
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Driver dijalanin di proses baru; t0 diambil paling awal biar import ikut keukur
+_FIRST_FRAME_DRIVER = r"""
+import time; t0 = time.perf_counter()
+import json, os, sys
+sys.path.insert(0, {root!r})
+from lib.preload import Preloader
+pre = Preloader(os.path.join({root!r}, "assets")).start()
+cap = pre.get("camera"); marks = {{"camera_open": time.perf_counter() - t0}}
+ok, frame = cap.read(); marks["first_frame"] = time.perf_counter() - t0
+pre.graph.wait_all(120); marks["all_ready"] = time.perf_counter() - t0
+cap.release()
+marks["ok"] = bool(ok)
+marks["tasks"] = {{k: v["duration"] for k, v in pre.timings.items()}}
+print("@@" + json.dumps(marks))
+"""
+
+_GUI_DRIVER = r"""
+import time; t0 = time.perf_counter()
+import json, sys
+sys.path.insert(0, {root!r})
+from Main import AppSIMPEL
+marks = {{"import_main": time.perf_counter() - t0}}
+app = AppSIMPEL()
+marks["window"] = time.perf_counter() - t0
+deadline = time.perf_counter() + 60
+def check():
+    if getattr(app, "first_frame_at", None) or time.perf_counter() > deadline: app.quit()
+    else: app.after(5, check)
+app.after(5, check); app.mainloop()
+ff = getattr(app, "first_frame_at", None)
+marks["first_frame"] = (ff - t0) if ff else None
+marks["ok"] = ff is not None
+if getattr(app, "cap", None) is not None: app.cap.release()
+print("@@" + json.dumps(marks))
+app.destroy()
+"""
+
+
+def measure_import(module: str) -> Dict[str, float]:
+    """Import `module` di interpreter baru, balikin cumulative ms (None kalo gagal)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=project_root, capture_output=True, text=True)
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m and m.group(4) == module:
+            cumulative = int(m.group(2)) / 1000.0
+    if proc.returncode != 0:
+        return {"module": module, "cumulative_ms": None, "error": proc.stderr.strip().splitlines()[-1:]}
+    return {"module": module, "cumulative_ms": cumulative}
+
+
+def run_driver(template: str) -> Dict:
+    proc = subprocess.run([sys.executable, "-c", template.format(root=project_root)],
+                          cwd=project_root, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("@@"):
+            return json.loads(line[2:])
+    tail = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+    return {"ok": False, "error": tail}
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    """Median tiap mark (detik -> ms) dari beberapa run"""
+    keys = [k for k in samples[0] if k not in ("ok", "error", "tasks")] if samples else []
+    out = {}
+    for k in keys:
+        values = [s[k] for s in samples if s.get(k) is not None]
+        out[f"{k}_ms"] = statistics.median(values) * 1000 if values else None
+    out["ok_runs"] = sum(1 for s in samples if s.get("ok"))
+    errors = [s["error"] for s in samples if s.get("error")]
+    if errors: out["error"] = errors[0]
+    # Durasi tiap task startup graph (median), biar kelihatan subsystem mana yang paling lama
+    task_names = {name for s in samples for name in (s.get("tasks") or {})}
+    for name in sorted(task_names):
+        values = [s["tasks"][name] for s in samples if (s.get("tasks") or {}).get(name) is not None]
+        if values: out[f"task.{name}_ms"] = statistics.median(values) * 1000
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark startup SIMPEL")
+    parser.add_argument("modes", nargs="*", choices=["imports", "first-frame", "gui"], default=["imports"])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Output JSON (buat dibandingin antar commit)")
+    args = parser.parse_args(argv)
+
+    report = {}
+    if "imports" in args.modes:
+        report["imports"] = [measure_import(m) for m in args.modules]
+    if "first-frame" in args.modes:
+        report["first_frame"] = summarize([run_driver(_FIRST_FRAME_DRIVER) for _ in range(args.runs)])
+    if "gui" in args.modes:
+        report["gui"] = summarize([run_driver(_GUI_DRIVER) for _ in range(args.runs)])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+
+    if "imports" in report:
+        print("📦 Import time (cumulative, interpreter baru)")
+        for r in report["imports"]:
+            value = f"{r['cumulative_ms']:9.1f} ms" if r["cumulative_ms"] is not None else "   GAGAL    "
+            print(f"  {r['module']:<20} {value}")
+    for key in ("first_frame", "gui"):
+        if key in report:
+            print(f"🎬 {key}")
+            for k, v in report[key].items():
+                print(f"  {k:<20} {v if not isinstance(v, float) else f'{v:.1f}'}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# benchmarks/mock_server.py
+"""
+Backend SIMPEL tiruan buat benchmark & development tanpa server asli.
+
+Endpoint yang di-support (sama kayak yang dipake desktop app):
+  POST /api/Auth/login
+  POST /api/Auth/getpermission
+  GET  /api/Borrowing/GetScanDataByQr/{qr}
+  POST /api/Borrowing/ScanQrPeminjaman/{qr}
+  POST /api/Borrowing/ScanQrPengembalian/{qr}
+  HEAD /                       (buat warm-up / keep-alive ping)
+
+Latency dan error bisa diatur biar retry, pooling, dan caching bisa diuji.
+
+Contoh:
+    python benchmarks/mock_server.py --port 5234 --latency-ms 40 --jitter-ms 10 --error-rate 0.05
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+def _b64(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def make_fake_jwt(username: str, ttl: float) -> str:
+    """Token format JWT (tanpa signature valid) dengan klaim `exp`"""
+    exp = int(time.time() + ttl)
+    return f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64({'sub': username, 'exp': exp})}.mock"
+
+
+class MockConfig:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 stall_rate: float = 0.0, stall_s: float = 30.0,
+                 token_ttl: float = 3600.0, require_auth: bool = True):
+        """
+        Args:
+            latency_ms: Delay dasar tiap request
+            jitter_ms: Delay tambahan acak 0..jitter_ms
+            error_rate: Peluang (0-1) request dijawab `error_status`
+            error_status: Status HTTP buat error yang diinjeksi
+            stall_rate: Peluang (0-1) request digantung `stall_s` detik (ngetes timeout)
+            stall_s: Lama request digantung
+            token_ttl: Umur token (detik) yang dikeluarin login/getpermission
+            require_auth: Endpoint Borrowing wajib Bearer token yang belum expired
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stall_rate = stall_rate
+        self.stall_s = stall_s
+        self.token_ttl = token_ttl
+        self.require_auth = require_auth
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, biar pooling client kerasa efeknya
+    disable_nagle_algorithm = True  # Header & body ditulis terpisah: tanpa ini tiap response ketahan ~40ms (delayed ACK)
+    server: "MockBackend"
+
+    def log_message(self, format, *args):
+        pass  # Jangan spam stdout pas load test
+
+    # ---------- helpers ----------
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length: return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, body: Optional[Dict] = None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if payload and self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def _inject(self) -> bool:
+        """Latency + error injection. Return True kalo request udah dijawab error."""
+        cfg = self.server.config
+        if cfg.stall_rate and random.random() < cfg.stall_rate:
+            time.sleep(cfg.stall_s)
+        delay = cfg.latency_ms + random.uniform(0, cfg.jitter_ms)
+        if delay > 0: time.sleep(delay / 1000.0)
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            self._send(cfg.error_status, {"message": "Injected error"})
+            return True
+        return False
+
+    def _authorized(self) -> bool:
+        if not self.server.config.require_auth: return True
+        auth = self.headers.get("Authorization", "")
+        if not auth.startswith("Bearer "): return False
+        try:
+            payload = auth[7:].split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return claims.get("exp", 0) > time.time()
+        except Exception:
+            return False
+
+    # ---------- routes ----------
+
+    def do_HEAD(self):
+        self.server.count("HEAD")
+        self._send(200)
+
+    def do_GET(self):
+        self.server.count("GET")
+        if self._inject(): return
+        prefix = "/api/Borrowing/GetScanDataByQr/"
+        if self.path.startswith(prefix):
+            if not self._authorized(): return self._send(401, {"message": "Unauthorized"})
+            qr = self.path[len(prefix):]
+            status = self.server.status_of(qr)
+            return self._send(200, {
+                "status": status,
+                "peminjaman_detail": [{"kode_barang": f"BRG-{qr}", "jumlah": 1}],
+            })
+        self._send(404, {"message": "Not found"})
+
+    def do_POST(self):
+        self.server.count("POST")
+        body = self._read_json()
+        if self._inject(): return
+        cfg = self.server.config
+
+        if self.path == "/api/Auth/login":
+            username = body.get("Username") or body.get("username")
+            if not username or not (body.get("Password") or body.get("password")):
+                return self._send(400, {"message": "Username dan password wajib"})
+            return self._send(200, {
+                "token": make_fake_jwt(username, cfg.token_ttl),
+                "nama": username.title(),
+                "listAplikasi": [{"appId": "APP01", "roleId": "ROL23"}],
+            })
+
+        if self.path == "/api/Auth/getpermission":
+            username = body.get("username", "")
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=cfg.token_ttl)
+            return self._send(200, {
+                "token": make_fake_jwt(username, cfg.token_ttl),
+                "listPermission": ["scan.peminjaman", "scan.pengembalian"],
+                "expiresAt": expires_at.isoformat(),
+            })
+
+        for prefix, expected, new_status in (
+            ("/api/Borrowing/ScanQrPeminjaman/", "booked", "dipinjam"),
+            ("/api/Borrowing/ScanQrPengembalian/", "dipinjam", "booked"),
+        ):
+            if self.path.startswith(prefix):
+                if not self._authorized(): return self._send(401, {"message": "Unauthorized"})
+                qr = self.path[len(prefix):]
+                if not self.server.transition(qr, expected, new_status):
+                    return self._send(409, {"message": f"Status bukan {expected}"})
+                return self._send(200, {"message": "OK", "status": new_status})
+
+        self._send(404, {"message": "Not found"})
+
+
+class MockBackend(ThreadingHTTPServer):
+    """Server mock yang bisa di-start di thread (buat benchmark in-process)"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[MockConfig] = None):
+        super().__init__((host, port), _Handler)
+        self.config = config or MockConfig()
+        self._status: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        self._state_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def status_of(self, qr: str) -> str:
+        with self._state_lock:
+            return self._status.setdefault(qr, "booked")
+
+    def transition(self, qr: str, expected: str, new_status: str) -> bool:
+        with self._state_lock:
+            if self._status.setdefault(qr, "booked") != expected: return False
+            self._status[qr] = new_status
+            return True
+
+    def count(self, key: str):
+        with self._state_lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._state_lock:
+            return dict(self._counts)
+
+    def start(self) -> "MockBackend":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock backend SIMPEL")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5234)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-s", type=float, default=30.0)
+    parser.add_argument("--token-ttl", type=float, default=3600.0)
+    parser.add_argument("--no-auth", action="store_true", help="Endpoint Borrowing gak cek token")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate, error_status=args.error_status,
+                        stall_rate=args.stall_rate, stall_s=args.stall_s,
+                        token_ttl=args.token_ttl, require_auth=not args.no_auth)
+    server = MockBackend(args.host, args.port, config)
+    print(f"🧪 Mock SIMPEL backend jalan di {server.base_url} (Ctrl+C buat stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Mock server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
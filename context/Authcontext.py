@@ -106,6 +106,16 @@ class AuthContext:
             print(f"✅ AuthContext: User '{username}' signed out")
             self._notify_listeners()
     
+    def update_token(self, token: str, expires_at: str = "", permissions: List[str] = None):
+        """Ganti token (hasil renew) tanpa reset user_info, lalu simpan ke file"""
+        with self._lock:
+            self._token = token
+            if permissions is not None:
+                self._permissions = permissions
+            self._user_info = {**self._user_info, "expires_at": expires_at}
+            self._save_session_to_file()
+            self._notify_listeners()
+    
     def is_authenticated(self) -> bool:
         """Cek apakah user sudah login (cek variable & token)"""
         return self._is_authenticated and self._token is not None
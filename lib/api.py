@@ -3,6 +3,7 @@ import json
 import logging
 import sys
 import os
+from contextlib import nullcontext
 from typing import Dict, Any, Optional
 
 
@@ -11,12 +12,14 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-# Import middleware kita
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Import middleware kita (tanpa print: modul ini di-import pas startup)
 try:
     from middleware import middleware
-    print("✅ Middleware imported successfully")
 except ImportError:
-    print("⚠️ Middleware not found, creating simple fallback")
+    logger.warning("Middleware not found, creating simple fallback")
     import requests
     
     class SimpleMiddleware:
@@ -31,11 +34,15 @@ except ImportError:
                 "Origin": "http://desktop.simpel.local"
             })
         
-        def post(self, url, data=None, **kwargs):
-            return self.session.post(url, json=data, timeout=10, **kwargs)
+        def post(self, url, data=None, idempotency_key=None, **kwargs):
+            if idempotency_key:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), "Idempotency-Key": idempotency_key}
+            kwargs.setdefault('timeout', 10)
+            return self.session.post(url, json=data, **kwargs)
         
         def get(self, url, **kwargs):
-            return self.session.get(url, timeout=10, **kwargs)
+            kwargs.setdefault('timeout', 10)
+            return self.session.get(url, **kwargs)
         
         def add_header(self, key, value):
             self.session.headers[key] = value
@@ -45,24 +52,26 @@ except ImportError:
     
     middleware = SimpleMiddleware()
 
-# Setup logger
-logger = logging.getLogger(__name__)
-
 class ApiClient:
-    def __init__(self, base_url: str, timeout: int = 10):
+    def __init__(self, base_url: str, timeout: float = 10, connect_timeout: float = 3.05):
         """
         Initialize API client dengan middleware.
         
         Args:
             base_url: Base URL API (contoh: "http://127.0.0.1:5234")
-            timeout: Timeout dalam detik
+            timeout: Read timeout dalam detik
+            connect_timeout: Connect timeout dalam detik
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.connect_timeout = connect_timeout
         self._token: Optional[str] = None
+        self.tracer = None # lib.tracing.Tracer (opsional): tiap request jadi span di transaksi yang lagi jalan
         
         # Setup middleware dengan base URL yang benar
         middleware.add_header("X-Base-URL", self.base_url)
+        # Breaker OPEN -> middleware nge-probe server ini sendiri sampe CLOSED lagi
+        if hasattr(middleware, 'set_probe_url'): middleware.set_probe_url(self.base_url)
         
         print(f"🔧 API Client initialized: {self.base_url}")
         
@@ -87,10 +96,42 @@ class ApiClient:
         endpoint = endpoint.lstrip('/')
         return f"{self.base_url}/{endpoint}"
     
-    def post(self, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+    def _span(self, method: str, endpoint: str):
+        if self.tracer is None: return nullcontext()
+        return self.tracer.span(f"{method} /{endpoint.lstrip('/')}", cat="api")
+    
+    def _timeouts(self):
+        """Tuple (connect, read) timeout buat requests"""
+        return (self.connect_timeout, self.timeout)
+    
+    def warm_up(self, background: bool = True) -> Optional[float]:
+        """Pre-connect ke server (lihat DesktopMiddleware.warm_up)"""
+        if not hasattr(middleware, 'warm_up'): return None
+        return middleware.warm_up(self.base_url, background=background)
+    
+    def start_keepalive(self, interval: float = 30.0):
+        """Aktifin keep-alive ping ke server"""
+        if hasattr(middleware, 'start_keepalive'):
+            middleware.start_keepalive(self.base_url, interval)
+    
+    def stop_keepalive(self):
+        if hasattr(middleware, 'stop_keepalive'):
+            middleware.stop_keepalive()
+    
+    def is_degraded(self) -> bool:
+        """True kalo circuit breaker belum CLOSED lagi (OPEN / lagi probe): server dianggap offline"""
+        breaker = getattr(middleware, 'breaker', None)
+        return breaker is not None and breaker.is_open()
+    
+    def post(self, endpoint: str, data: Dict[str, Any] = None, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """
         POST request dengan middleware.
         
+        Args:
+            endpoint: Path endpoint
+            data: JSON body
+            idempotency_key: Kalo diisi, POST boleh di-retry sama middleware
+        
         Returns:
             Dict: JSON response dari server
         """
@@ -98,9 +139,10 @@ class ApiClient:
         logger.debug(f"POST {url}")
         
         try:
-            response = middleware.post(url, data=data)
-            response.raise_for_status()  # Raise exception untuk status 4xx/5xx
-            return response.json()
+            with self._span("POST", endpoint):
+                response = middleware.post(url, data=data, idempotency_key=idempotency_key, timeout=self._timeouts())
+                response.raise_for_status()  # Raise exception untuk status 4xx/5xx
+                return response.json()
             
         except Exception as e:
             logger.error(f"POST failed: {str(e)}")
@@ -127,9 +169,10 @@ class ApiClient:
         logger.debug(f"GET {url}")
         
         try:
-            response = middleware.get(url)
-            response.raise_for_status()
-            return response.json()
+            with self._span("GET", endpoint):
+                response = middleware.get(url, timeout=self._timeouts())
+                response.raise_for_status()
+                return response.json()
             
         except Exception as e:
             logger.error(f"GET failed: {str(e)}")
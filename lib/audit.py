@@ -0,0 +1,264 @@
+# lib/audit.py
+"""
+Audit log lokal tiap percobaan scan (QR, user, challenge, timing, hasil API).
+
+SQLite mode WAL, append-only. Kamera loop / worker cuma `record()` ke queue
+terbatas (gak pernah nunggu; kalo penuh, event dibuang & dihitung). Thread
+writer di background ngumpulin event dan commit per batch.
+
+File dirotasi kalo udah lewat `max_bytes` (audit.db -> audit-YYYYmmdd-HHMMSS.db),
+baris & file rotasi yang lebih tua dari `retention_days` dihapus, jadi disk
+kiosk gak penuh.
+
+    audit = AuditStore("audit/audit.db").start()
+    audit.record(qr="ABC", user="Nur Zahra", outcome="success", api_ms=180.2)
+    audit.query(qr="ABC")
+"""
+import glob
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    qr TEXT,
+    user TEXT,
+    challenge TEXT,
+    status TEXT,
+    outcome TEXT NOT NULL,
+    api_ms REAL,
+    timings TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scans_ts ON scans(ts);
+CREATE INDEX IF NOT EXISTS idx_scans_qr_ts ON scans(qr, ts);
+CREATE INDEX IF NOT EXISTS idx_scans_user_ts ON scans(user, ts);
+"""
+
+COLUMNS = ("ts", "qr", "user", "challenge", "status", "outcome", "api_ms", "timings", "error")
+_STOP = object()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: aman dari korup, commit gak fsync tiap kali
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class AuditStore:
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 1.0, queue_size: int = 2000,
+                 max_bytes: int = 16 * 1024 * 1024, retention_days: float = 30, max_files: int = 8):
+        """
+        Args:
+            path: File database aktif
+            batch_size: Maksimal event per commit
+            flush_interval: Maksimal detik event nunggu di queue sebelum di-commit
+            queue_size: Kapasitas queue; record() buang event kalo penuh
+            max_bytes: Ukuran data di file aktif sebelum dirotasi
+            retention_days: Umur maksimal baris & file rotasi
+            max_files: Jumlah maksimal file rotasi yang disimpen
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.max_files = max_files
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_maintenance = 0.0
+        self._rotate_retry_at = 0.0
+        self._last_size = 0  # Ukuran terakhir dari _maintain (writer thread), dibaca stats()
+        self.dropped = 0
+        self.written = 0
+
+    # ============ WRITE ============
+
+    def start(self) -> "AuditStore":
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def record(self, outcome: str, qr: Optional[str] = None, user: Optional[str] = None,
+               challenge: Optional[str] = None, status: Optional[str] = None, api_ms: Optional[float] = None,
+               timings: Optional[Dict[str, float]] = None, error: Optional[str] = None,
+               ts: Optional[float] = None) -> bool:
+        """Antriin 1 event. Gak pernah nge-block; return False kalo queue penuh (event dibuang)."""
+        row = (ts or time.time(), qr, user, challenge, status, outcome, api_ms,
+               json.dumps(timings) if timings else None, error)
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """Flush sisa queue lalu stop writer"""
+        if self._thread is None: return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = _connect(self.path)
+        except Exception as e:
+            print(f"⚠️ Audit store gak bisa dibuka: {e}")
+            return
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                if item is _STOP: stopping = True
+                else: batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                # Kumpulin event lain yang udah/bakal dateng sampe batch penuh atau lewat flush_interval
+                while not stopping and len(batch) < self.batch_size:
+                    left = deadline - time.monotonic()
+                    if left <= 0: break
+                    item = self._queue.get(timeout=left)
+                    if item is _STOP: stopping = True
+                    else: batch.append(item)
+            except queue.Empty:
+                pass
+            if batch: self._write(batch)
+            try:
+                self._maintain()
+            except (sqlite3.Error, OSError) as e:
+                # Maintenance gagal gak boleh matiin writer: event tetap ditulis, dicoba lagi nanti
+                print(f"⚠️ Maintenance audit gagal: {e}")
+        self._conn.close()
+        self._conn = None
+
+    def _write(self, batch: List[tuple]):
+        try:
+            with self._conn:
+                self._conn.executemany(f"INSERT INTO scans ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", batch)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            print(f"⚠️ Gagal nulis audit ({len(batch)} event): {e}")
+
+    # ============ ROTASI & RETENSI ============
+
+    def _size(self) -> int:
+        """Ukuran data yang kepake (halaman bebas gak diitung: file aktif gak menciut habis rotasi)"""
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        free = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free) * page_size
+
+    def _maintain(self, now: Optional[float] = None):
+        now = now or time.time()
+        self._last_size = self._size()
+        if time.monotonic() >= self._rotate_retry_at and self._last_size > self.max_bytes:
+            self._rotate()
+            self._last_size = self._size()
+        if now - self._last_maintenance < 3600: return
+        self._last_maintenance = now
+        cutoff = now - self.retention_days * 86400
+        try:
+            with self._conn:
+                self._conn.execute("DELETE FROM scans WHERE ts < ?", (cutoff,))
+        except sqlite3.Error as e:
+            print(f"⚠️ Gagal hapus audit lama: {e}")
+        rotated = self.rotated_files()
+        for i, path in enumerate(rotated):
+            # rotated_files urut dari paling baru
+            if i >= self.max_files or os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _rotate(self):
+        """
+        Snapshot file aktif jadi file rotasi (VACUUM INTO), lalu kosongin tabelnya.
+        File aktif gak ditutup/di-rename & journal mode gak diubah, jadi pembaca
+        (query() dari thread lain) yang lagi buka file gak bikin rotasi gagal.
+        """
+        base, ext = os.path.splitext(self.path)
+        target, n = f"{base}-{time.strftime('%Y%m%d-%H%M%S')}{ext}", 1
+        while os.path.exists(target):
+            target, n = f"{base}-{time.strftime('%Y%m%d-%H%M%S')}-{n}{ext}", n + 1
+        try:
+            # Hasil VACUUM INTO pake rollback journal: file rotasi berdiri sendiri (gak ada -wal/-shm)
+            self._conn.execute("VACUUM INTO ?", (target,))
+            with self._conn:
+                self._conn.execute("DELETE FROM scans")
+        except sqlite3.Error as e:
+            print(f"⚠️ Gagal rotasi audit, dicoba lagi nanti: {e}")
+            self._rotate_retry_at = time.monotonic() + 60
+            if os.path.exists(target): os.remove(target)  # Sisa VACUUM INTO yang gagal
+            return
+        self._last_maintenance = 0.0  # Langsung cek jumlah file rotasi
+
+    def rotated_files(self) -> List[str]:
+        base, ext = os.path.splitext(self.path)
+        return sorted(glob.glob(f"{glob.escape(base)}-*{ext}"), key=os.path.getmtime, reverse=True)
+
+    # ============ QUERY ============
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None, qr: Optional[str] = None,
+              user: Optional[str] = None, outcome: Optional[str] = None, limit: int = 100,
+              include_rotated: bool = False) -> List[Dict[str, Any]]:
+        """
+        Cari event (paling baru duluan). Filter pake index (ts, qr+ts, user+ts).
+        Aman dipanggil dari thread mana aja; pake koneksi baca sendiri (WAL).
+
+        Args:
+            start, end: Rentang epoch detik
+            include_rotated: Ikut cari di file rotasi
+        """
+        where, args = [], []
+        if start is not None: where.append("ts >= ?"); args.append(start)
+        if end is not None: where.append("ts < ?"); args.append(end)
+        if qr is not None: where.append("qr = ?"); args.append(qr)
+        if user is not None: where.append("user = ?"); args.append(user)
+        if outcome is not None: where.append("outcome = ?"); args.append(outcome)
+        sql = f"SELECT id, {', '.join(COLUMNS)} FROM scans"
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC LIMIT ?"
+
+        paths = [self.path] + (self.rotated_files() if include_rotated else [])
+        rows: List[Dict[str, Any]] = []
+        for path in paths:
+            if len(rows) >= limit: break
+            if not os.path.exists(path): continue
+            # File aktif (WAL) dibuka biasa biar kebaca walau writer lagi jalan; file rotasi read-only
+            conn = sqlite3.connect(path if path == self.path else f"file:{path}?mode=ro", uri=path != self.path, timeout=5)
+            try:
+                conn.row_factory = sqlite3.Row
+                for r in conn.execute(sql, args + [limit - len(rows)]):
+                    row = dict(r)
+                    row["timings"] = json.loads(row["timings"]) if row["timings"] else None
+                    row["file"] = os.path.basename(path)
+                    rows.append(row)
+            except sqlite3.Error as e:
+                print(f"⚠️ Gagal query audit {path}: {e}")
+            finally:
+                conn.close()
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+        """Aman dari thread mana aja: `bytes` hasil maintenance terakhir, koneksi writer gak disentuh"""
+        return {"written": self.written, "dropped": self.dropped, "queued": self._queue.qsize(),
+                "bytes": self._last_size, "rotated_files": len(self.rotated_files())}
+
+
+__all__ = ['AuditStore', 'SCHEMA']
@@ -0,0 +1,193 @@
+# lib/auth_manager.py
+"""
+AuthManager: jaga token tetap fresh berdasarkan waktu expired-nya.
+
+Token di-renew lewat /api/Auth/getpermission (pake token lama yang masih valid),
+jadi gak perlu password lagi. Renew jalan di background thread sebelum token
+expired, biar jalur scan gak pernah kena 401 di tengah transaksi.
+"""
+import base64
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional
+
+
+def parse_expires_at(value: Any) -> Optional[float]:
+    """
+    Parse `expiresAt` dari BE jadi epoch detik.
+
+    Terima ISO 8601 (boleh pake 'Z' dan pecahan detik 7 digit ala .NET) atau angka epoch.
+    Tanpa timezone dianggap UTC.
+    """
+    if value in (None, ""): return None
+    if isinstance(value, (int, float)): return float(value)
+    text = str(value).strip()
+    if text.endswith("Z"): text = text[:-1] + "+00:00"
+    # datetime.fromisoformat cuma kuat 6 digit microsecond
+    if "." in text:
+        head, frac = text.split(".", 1)
+        digits = "".join(ch for ch in frac if ch.isdigit())
+        text = f"{head}.{digits[:6]}{frac[len(digits):]}"
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def jwt_expiry(token: Optional[str]) -> Optional[float]:
+    """Ambil klaim `exp` dari JWT tanpa verifikasi signature (cuma buat jadwal renew)"""
+    if not token or token.count(".") != 2: return None
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        exp = claims.get("exp")
+        return float(exp) if exp is not None else None
+    except Exception:
+        return None
+
+
+class AuthManager:
+    """Bungkus AuthContext + ApiClient buat tracking expiry dan auto-renew token"""
+
+    def __init__(self, auth, api, refresh_margin: float = 300.0, retry_interval: float = 30.0):
+        """
+        Args:
+            auth: AuthContext
+            api: ApiClient
+            refresh_margin: Renew token sekian detik sebelum expired
+            retry_interval: Jeda retry kalo renew gagal
+        """
+        self.auth = auth
+        self.api = api
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refresh_lock = threading.Lock()
+        self._expired_listeners: List[Callable] = []
+
+    # ============ EXPIRY ============
+
+    def get_expiry(self) -> Optional[float]:
+        """Epoch expired token aktif. Klaim JWT `exp` diutamakan, fallback ke expires_at."""
+        exp = jwt_expiry(self.auth.get_token())
+        if exp is None:
+            exp = parse_expires_at(self.auth.get_user_info().get("expires_at"))
+        return exp
+
+    def seconds_left(self) -> Optional[float]:
+        exp = self.get_expiry()
+        return None if exp is None else exp - time.time()
+
+    def is_token_valid(self, margin: float = 0.0) -> bool:
+        """Cek lokal (tanpa request). Token tanpa info expiry dianggap valid."""
+        if not self.auth.is_authenticated(): return False
+        left = self.seconds_left()
+        return left is None or left > margin
+
+    def validate_session(self) -> bool:
+        """
+        Validasi session hasil restore dari session.json secara lokal pas startup.
+        Token yang udah expired langsung di-sign out, biar gak ketauan baru pas scan.
+        """
+        if not self.auth.is_authenticated(): return False
+        if self.is_token_valid():
+            self.api.set_token(self.auth.get_token())
+            return True
+        print("⌛ Token di session.json sudah expired, perlu login ulang")
+        self.auth.sign_out()
+        self.api.clear_token()
+        return False
+
+    # ============ REFRESH ============
+
+    def refresh(self) -> bool:
+        """Renew token lewat getpermission. Return True kalo berhasil."""
+        with self._refresh_lock:
+            info = self.auth.get_user_info()
+            username = info.get("username")
+            if not username or not self.is_token_valid():
+                return False
+            try:
+                data = self.api.get_permission(
+                    username=username,
+                    app_id=info.get("app_id", "APP01"),
+                    role_id=info.get("role_id", "ROL23"),
+                )
+            except Exception as e:
+                print(f"⚠️ Renew token gagal: {e}")
+                return False
+            token = data.get("token")
+            if not token: return False
+            self.auth.update_token(token, expires_at=data.get("expiresAt", ""),
+                                   permissions=data.get("listPermission"))
+            print("🔄 Token diperbarui")
+            return True
+
+    def ensure_valid(self) -> bool:
+        """
+        Dipanggil sebelum transaksi. Normalnya cuma cek lokal; renew sinkron cuma
+        kalo background refresh telat dan token udah masuk margin.
+        """
+        if self.is_token_valid(margin=self.refresh_margin): return True
+        if self.refresh(): return True
+        return self.is_token_valid()
+
+    def start(self):
+        """Mulai background thread auto-renew"""
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self.auth.add_listener(self.notify_token_changed)
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.auth.remove_listener(self.notify_token_changed)
+        self._stop.set()
+        self._wake.set()
+
+    def notify_token_changed(self):
+        """Bangunin scheduler kalo token diganti dari luar (misal login ulang)"""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            left = self.seconds_left()
+            if not self.auth.is_authenticated() or left is None:
+                wait = None  # Gak ada yang perlu dijadwalin, tunggu token baru
+            elif left <= 0:
+                print("⌛ Token expired")
+                self._notify_expired()
+                wait = None
+            elif left <= self.refresh_margin:
+                # Sukses atau gagal, cek ulang abis jeda (token baru biasanya udah jauh dari margin)
+                self.refresh()
+                wait = min(self.retry_interval, left)
+            else:
+                wait = left - self.refresh_margin
+            if wait:
+                self._wake.wait(wait)
+            elif wait is None:
+                self._wake.wait()
+            self._wake.clear()
+
+    # ============ LISTENERS ============
+
+    def add_expired_listener(self, callback: Callable):
+        if callback not in self._expired_listeners:
+            self._expired_listeners.append(callback)
+
+    def _notify_expired(self):
+        for listener in list(self._expired_listeners):
+            try:
+                listener()
+            except Exception as e:
+                print(f"⚠️ Error notifying expired listener: {e}")
+
+
+__all__ = ['AuthManager', 'parse_expires_at', 'jwt_expiry']
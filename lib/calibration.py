@@ -0,0 +1,304 @@
+# lib/calibration.py
+"""
+Kalibrasi otomatis host -> profil performa scanner.
+
+Spek kiosk beda-beda (Celeron lama sampe i7). Pas pertama jalan, tiap profil
+di PROFILES di-micro-benchmark di host ini (pipeline frame, FaceMesh, HOG,
+encoding, decode QR) lalu dipilih profil paling "berat" yang masih muat di
+budget:
+  - tiap stage makan maksimal STAGE_BUDGET dari intervalnya sendiri
+    (pipeline frame per tick, HOG per detect_interval, dst)
+  - total CPU semua stage <= CPU_BUDGET x jumlah core
+
+Hasilnya disimpen di perf_profile.json bareng sidik jari hardware (model
+CPU, jumlah core, arsitektur, OS) dan daftar stage yang beneran keukur.
+Stage yang modulnya gagal ke-import gak bisa dihitung ke budget, jadi
+kalibrasi yang bolong gak boleh milih profil di atas DEFAULT_PROFILE dan
+gak disimpen (start berikutnya dicoba lagi). Start berikutnya tinggal baca file; kalo
+sidik jarinya beda (hardware ganti / image disk dipindah ke mesin lain)
+kalibrasi diulang otomatis.
+
+Override per lokasi di perf_site.json (gak pernah ditulis otomatis):
+    {"profile": "low"}                          paksa profil, skip kalibrasi
+    {"fr_tolerance": 0.55, "br_threshold": 90}  timpa field tertentu
+
+    python -m lib.calibration            # tampilin profil aktif
+    python -m lib.calibration --force    # kalibrasi ulang sekarang
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+CALIBRATION_VERSION = 2  # v2: ada "stages", hasil v1 (bisa bolong) dikalibrasi ulang
+CALIBRATION_FILE = "perf_profile.json"
+SITE_FILE = "perf_site.json"
+STAGE_BUDGET = 0.5
+CPU_BUDGET = 0.7
+STAGES = ("frame", "mesh", "hog", "encode", "decode")
+
+
+class PerfProfile(NamedTuple):
+    name: str
+    capture_size: Tuple[int, int] = (1280, 720)
+    mesh_size: Tuple[int, int] = (640, 360)
+    fr_scaling: float = 0.2
+    fr_tolerance: float = 0.60
+    br_threshold: float = 95
+    frame_interval_ms: int = 33
+    qr_interval: float = 0.5
+    detect_interval: float = 0.5
+    identify_interval: float = 1.2
+
+
+# Urut dari paling berat; "balanced" = setting lama yang di-hardcode.
+# fr_scaling disesuain biar lebar frame HOG tetep >= ~240px (wajah di jarak kiosk masih kedetect).
+PROFILES = {
+    "high": PerfProfile("high", fr_scaling=0.25, qr_interval=0.3, detect_interval=0.3, identify_interval=0.8),
+    "balanced": PerfProfile("balanced"),
+    "low": PerfProfile("low", capture_size=(960, 540), mesh_size=(480, 270), fr_scaling=0.25,
+                       frame_interval_ms=50, qr_interval=0.7, detect_interval=0.8, identify_interval=1.6),
+    "minimal": PerfProfile("minimal", capture_size=(640, 360), mesh_size=(480, 270), fr_scaling=0.375,
+                           frame_interval_ms=66, qr_interval=1.0, detect_interval=1.0, identify_interval=2.0),
+}
+DEFAULT_PROFILE = "balanced"
+
+
+# ============ SIDIK JARI HARDWARE ============
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                if line.startswith("model name"): return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return os.environ.get("PROCESSOR_IDENTIFIER") or platform.processor() or "unknown"
+
+
+def host_fingerprint() -> Dict[str, Any]:
+    info = {"cpu": _cpu_model(), "cores": os.cpu_count() or 1, "machine": platform.machine(),
+            "system": platform.system()}
+    info["id"] = hashlib.sha1(json.dumps(info, sort_keys=True).encode()).hexdigest()[:16]
+    return info
+
+
+# ============ BENCHMARK ============
+
+def _time_ms(fn, repeat: int) -> float:
+    fn()  # Warm-up (alokasi, cache, lazy init)
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def measure_profile(profile: PerfProfile, repeat: int = 5, face_mesh=None, encode_ms: Optional[float] = None
+                    ) -> Dict[str, Optional[float]]:
+    """
+    Biaya (ms) tiap stage di host ini pake parameter profil. Stage yang modulnya
+    gak ke-install = None (lihat missing_stages).
+
+    Args:
+        face_mesh: FaceMesh sendiri (jangan yang lagi dipake app, gak thread-safe)
+        encode_ms: Biaya encoding kalo udah diukur (gak tergantung profil, chip ukurannya tetap)
+    """
+    import cv2
+    import numpy as np
+    w, h = profile.capture_size
+    rng = np.random.default_rng(0)
+    raw = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+    flipped, display = np.empty_like(raw), np.empty_like(raw)
+    mini = np.empty((profile.mesh_size[1], profile.mesh_size[0], 3), np.uint8)
+    mini_rgb = np.empty_like(mini)
+
+    def frame_tick():
+        # Kerjaan main thread per tick: flip, copy display, resize+cvtColor mesh, render
+        cv2.flip(raw, 1, dst=flipped)
+        display[...] = flipped
+        cv2.resize(flipped, profile.mesh_size, dst=mini)
+        cv2.cvtColor(mini, cv2.COLOR_BGR2RGB, dst=mini_rgb)
+        cv2.cvtColor(cv2.resize(display, (1280, 720)), cv2.COLOR_BGR2RGB)
+
+    costs: Dict[str, Optional[float]] = {"frame": _time_ms(frame_tick, repeat), "mesh": None,
+                                         "hog": None, "encode": encode_ms, "decode": None}
+    if face_mesh is not None:
+        costs["mesh"] = _time_ms(lambda: face_mesh.process(mini_rgb), repeat)
+    try:
+        import face_recognition
+        small = cv2.cvtColor(cv2.resize(flipped, (0, 0), fx=profile.fr_scaling, fy=profile.fr_scaling), cv2.COLOR_BGR2RGB)
+        costs["hog"] = _time_ms(lambda: face_recognition.face_locations(small, model="hog"), repeat)
+        if encode_ms is None:
+            chip = np.zeros((200, 200, 3), np.uint8)  # Ukuran chip CHIP_FACE_SIZE
+            costs["encode"] = _time_ms(lambda: face_recognition.face_encodings(chip, [(25, 175, 175, 25)]), repeat)
+    except ImportError:
+        pass
+    try:
+        from pyzbar import pyzbar
+        gray = cv2.cvtColor(flipped, cv2.COLOR_BGR2GRAY)
+        costs["decode"] = _time_ms(lambda: pyzbar.decode(gray), repeat)
+    except ImportError:
+        pass
+    return costs
+
+
+def estimate_load(profile: PerfProfile, costs: Dict[str, Optional[float]], cores: int) -> Dict[str, Any]:
+    """
+    Cek profil muat di budget. Return dict: fits, cpu (fraksi total core),
+    dan stage yang paling mepet (utilisasi terhadap intervalnya).
+    """
+    frame_s = profile.frame_interval_ms / 1000
+    # FaceMesh jalan tiap tick (kalo worker sebelumnya udah kelar)
+    intervals = {"frame": frame_s, "mesh": frame_s, "hog": profile.detect_interval,
+                 "encode": profile.identify_interval, "decode": profile.qr_interval}
+    usage = {stage: costs[stage] / 1000 / intervals[stage] for stage in intervals if costs.get(stage) is not None}
+    # Worker di-skip selama yang sebelumnya belum kelar, jadi maksimal makan 1 core
+    cpu = sum(min(u, 1.0) for u in usage.values()) / max(cores, 1)
+    worst = max(usage, key=usage.get) if usage else None
+    # Mesh boleh sampe 1 tick penuh (tick berikutnya di-skip), liveness masih responsif
+    limits = {stage: (2 * STAGE_BUDGET if stage == "mesh" else STAGE_BUDGET) for stage in usage}
+    fits = all(usage[s] <= limits[s] for s in usage) and cpu <= CPU_BUDGET
+    return {"fits": fits, "cpu": cpu, "worst": worst, "usage": usage}
+
+
+def missing_stages(costs_by_profile: Dict[str, Dict[str, Optional[float]]]) -> List[str]:
+    """Stage yang gak keukur di salah satu profil (modulnya gak ada / gagal import)"""
+    return [stage for stage in STAGES
+            if not costs_by_profile or any(costs.get(stage) is None for costs in costs_by_profile.values())]
+
+
+def choose_profile(costs_by_profile: Dict[str, Dict[str, Optional[float]]], cores: int) -> str:
+    """
+    Profil paling berat yang muat; kalo gak ada yang muat, yang paling ringan.
+    Kalo ada stage yang gak keukur, "muat" cuma dihitung dari sebagian biaya,
+    jadi profil di atas DEFAULT_PROFILE gak dipertimbangin.
+    """
+    names = list(PROFILES)
+    if missing_stages(costs_by_profile): names = names[names.index(DEFAULT_PROFILE):]
+    for name in names:
+        if name in costs_by_profile and estimate_load(PROFILES[name], costs_by_profile[name], cores)["fits"]:
+            return name
+    return names[-1]
+
+
+def calibrate(repeat: int = 5, verbose: bool = True) -> Dict[str, Any]:
+    """Benchmark semua profil di host ini, return hasil kalibrasi (belum disimpen)"""
+    fingerprint = host_fingerprint()
+    face_mesh = None
+    try:
+        from lib.preload import create_face_mesh
+        face_mesh = create_face_mesh()
+    except ImportError:
+        pass
+    costs, encode_ms = {}, None
+    try:
+        for name, profile in PROFILES.items():
+            costs[name] = measure_profile(profile, repeat, face_mesh, encode_ms)
+            encode_ms = costs[name]["encode"]
+    finally:
+        if face_mesh is not None: face_mesh.close()
+    chosen = choose_profile(costs, fingerprint["cores"])
+    missing = missing_stages(costs)
+    if verbose:
+        print(f"🧪 Kalibrasi {fingerprint['cpu']} ({fingerprint['cores']} core) -> profil '{chosen}'")
+        if missing: print(f"⚠️ Stage gak keukur ({', '.join(missing)}), profil dibatesin ke '{DEFAULT_PROFILE}'")
+    return {"version": CALIBRATION_VERSION, "fingerprint": fingerprint, "profile": chosen,
+            "stages": [s for s in STAGES if s not in missing], "costs": costs, "measured_at": time.time()}
+
+
+# ============ PERSIST & OVERRIDE ============
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def save_calibration(path: str, result: Dict[str, Any]):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def cached_calibration(path: str) -> Optional[Dict[str, Any]]:
+    """Hasil kalibrasi yang masih valid buat host ini (None = harus kalibrasi ulang)"""
+    data = _read_json(path)
+    if not data or data.get("version") != CALIBRATION_VERSION or data.get("profile") not in PROFILES:
+        return None
+    if set(STAGES) - set(data.get("stages") or ()):
+        return None  # Kalibrasi bolong (stage gak keukur), jangan dipercaya
+    if data.get("fingerprint", {}).get("id") != host_fingerprint()["id"]:
+        print("🔁 Hardware berubah sejak kalibrasi terakhir, kalibrasi ulang")
+        return None
+    return data
+
+
+def load_site_overrides(path: str) -> Dict[str, Any]:
+    data = _read_json(path) or {}
+    allowed = {"profile"} | set(PerfProfile._fields) - {"name"}
+    unknown = set(data) - allowed
+    if unknown: print(f"⚠️ Field override gak dikenal di {os.path.basename(path)}: {', '.join(sorted(unknown))}")
+    if data.get("profile", DEFAULT_PROFILE) not in PROFILES:
+        print(f"⚠️ Profil '{data['profile']}' gak ada, override profil diabaikan")
+        data.pop("profile")
+    return {k: v for k, v in data.items() if k in allowed}
+
+
+def resolve_profile(calibration: Optional[Dict[str, Any]], overrides: Dict[str, Any]) -> PerfProfile:
+    """Profil hasil kalibrasi (atau default) + override per lokasi"""
+    name = overrides.get("profile") or (calibration or {}).get("profile") or DEFAULT_PROFILE
+    profile = PROFILES[name]
+    fields = {k: tuple(v) if isinstance(v, list) else v for k, v in overrides.items() if k != "profile"}
+    if fields: profile = profile._replace(name=f"{name}+site", **fields)
+    return profile
+
+
+def ensure_calibrated(path: str, force: bool = False, repeat: int = 5) -> Dict[str, Any]:
+    """Pake hasil yang disimpen kalo valid, kalo gak kalibrasi & simpen"""
+    data = None if force else cached_calibration(path)
+    if data is None:
+        data = calibrate(repeat)
+        if len(data["stages"]) < len(STAGES): return data  # Bolong: dipake sekali ini doang, gak disimpen
+        try:
+            save_calibration(path, data)
+        except OSError as e:
+            print(f"⚠️ Gagal nyimpen kalibrasi: {e}")
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kalibrasi profil performa scanner di host ini")
+    parser.add_argument("--force", action="store_true", help="Kalibrasi ulang walau hasil lama masih valid")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="Folder perf_profile.json / perf_site.json")
+    args = parser.parse_args(argv)
+
+    data = ensure_calibrated(os.path.join(args.dir, CALIBRATION_FILE), args.force, args.repeat)
+    cores = data["fingerprint"]["cores"]
+    print(f"{'profil':<10} {'frame':>7} {'mesh':>7} {'hog':>7} {'encode':>7} {'decode':>7} {'CPU %':>6}  muat")
+    for name, costs in data["costs"].items():
+        load = estimate_load(PROFILES[name], costs, cores)
+        cells = " ".join(f"{costs[s]:>7.1f}" if costs.get(s) is not None else f"{'-':>7}" for s in STAGES)
+        print(f"{name:<10} {cells} {load['cpu'] * 100:>6.1f}  {'✅' if load['fits'] else '❌ ' + str(load['worst'])}")
+    profile = resolve_profile(data, load_site_overrides(os.path.join(args.dir, SITE_FILE)))
+    print(f"✅ Profil aktif: {profile}")
+
+
+__all__ = ['PerfProfile', 'PROFILES', 'DEFAULT_PROFILE', 'CALIBRATION_FILE', 'SITE_FILE', 'STAGES',
+           'host_fingerprint', 'measure_profile', 'estimate_load', 'missing_stages', 'choose_profile', 'calibrate',
+           'save_calibration', 'cached_calibration', 'load_site_overrides', 'resolve_profile',
+           'ensure_calibrated']
+
+
+if __name__ == "__main__":
+    main()
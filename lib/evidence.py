@@ -0,0 +1,172 @@
+# lib/evidence.py
+"""
+Snapshot bukti transaksi (wajah peminjam + frame QR) buat kalau ada sengketa.
+
+Tiap ScanQrPeminjaman/ScanQrPengembalian, run_api cuma `submit()` referensi
+gambar yang udah ada (crop wajah & frame QR yang disimpen track) ke queue
+terbatas. Thread writer yang nge-encode JPEG, nulis (tmp + rename, jadi gak
+ada file setengah jadi), dan jaga kuota disk: snapshot paling lama dihapus
+duluan, per snapshot utuh (json + gambarnya), jadi gak ada sidecar yang
+nunjuk ke gambar yang udah kehapus.
+Kalo queue penuh snapshot dibuang & dihitung, scanner gak pernah nunggu.
+
+    snapshots = SnapshotWriter("evidence", max_bytes=200 * 1024 * 1024).start()
+    snapshots.submit({"qr": "ABC", "user": "Nur Zahra"}, face=chip, qr_frame=frame)
+    # -> evidence/20250101-120000-ABC-face.jpg, ...-qr.jpg, ....json
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+_STOP = object()
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]+")
+_SUFFIXES = ("-face.jpg", "-qr.jpg", ".json")
+
+
+def _snapshot_base(path: str) -> str:
+    """Path file -> path dasar snapshot-nya (tanpa -face.jpg / -qr.jpg / .json)"""
+    for suffix in _SUFFIXES:
+        if path.endswith(suffix): return path[:-len(suffix)]
+    return path
+
+
+class SnapshotWriter:
+    def __init__(self, out_dir: str, queue_size: int = 8, max_bytes: int = 200 * 1024 * 1024,
+                 jpeg_quality: int = 85, max_width: int = 640):
+        """
+        Args:
+            out_dir: Folder snapshot
+            queue_size: Kapasitas queue; submit() buang snapshot kalo penuh
+            max_bytes: Kuota total folder; lewat dari ini snapshot paling lama dihapus
+            jpeg_quality: Kualitas JPEG (0..100)
+            max_width: Frame QR yang lebih lebar di-resize ke sini biar file kecil
+        """
+        self.out_dir = out_dir
+        self.max_bytes = max_bytes
+        self.jpeg_quality = jpeg_quality
+        self.max_width = max_width
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._snapshots: deque = deque()  # ([path file], ukuran total) per snapshot, paling lama di depan
+        self._total = 0
+        self.dropped = 0
+        self.written = 0
+        self.evicted = 0
+
+    def start(self) -> "SnapshotWriter":
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, meta: Dict[str, Any], face=None, qr_frame=None, ts: Optional[float] = None) -> bool:
+        """
+        Antriin 1 snapshot. Gak pernah nge-block; return False kalo queue penuh (dibuang).
+        Gambar (BGR) gak di-copy: caller gak boleh ngubah array-nya lagi.
+        """
+        if face is None and qr_frame is None: return False
+        try:
+            self._queue.put_nowait((ts or time.time(), dict(meta), face, qr_frame))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """Tulis sisa queue lalu stop writer"""
+        if self._thread is None: return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            self._scan()
+        except OSError as e:
+            print(f"⚠️ Folder snapshot gak bisa dibuka: {e}")
+            return
+        while True:
+            item = self._queue.get()
+            if item is _STOP: break
+            try:
+                self._write(*item)
+            except Exception as e:
+                print(f"⚠️ Gagal nulis snapshot: {e}")
+
+    def _scan(self):
+        """Isi daftar snapshot dari folder (snapshot run sebelumnya ikut kuota)"""
+        groups: Dict[str, list] = {}  # path dasar -> [mtime paling lama, [path], ukuran]
+        for entry in os.scandir(self.out_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                group = groups.setdefault(_snapshot_base(entry.path), [stat.st_mtime, [], 0])
+                group[0] = min(group[0], stat.st_mtime)
+                group[1].append(entry.path)
+                group[2] += stat.st_size
+        ordered = sorted(groups.values(), key=lambda g: g[0])
+        self._snapshots = deque((paths, size) for _, paths, size in ordered)
+        self._total = sum(size for _, size in self._snapshots)
+
+    def _write(self, ts: float, meta: Dict[str, Any], face, qr_frame):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(ts)) + f"-{int(ts * 1000) % 1000:03d}"
+        base = os.path.join(self.out_dir, "-".join(p for p in (stamp, _UNSAFE.sub("_", str(meta.get("qr") or ""))) if p))
+        stem, n = base, 1
+        while os.path.exists(base + ".json"):  # Beberapa snapshot di milidetik yang sama
+            base, n = f"{stem}~{n}", n + 1
+        files: List[Tuple[str, bytes]] = []
+        if face is not None: files.append((base + "-face.jpg", self._encode(face)))
+        if qr_frame is not None: files.append((base + "-qr.jpg", self._encode(self._shrink(qr_frame))))
+        meta = dict(meta, ts=ts, files=[os.path.basename(path) for path, _ in files])
+        files.append((base + ".json", json.dumps(meta, default=str).encode("utf-8")))
+        size = sum(len(data) for _, data in files)
+        self._evict(size)
+        for path, data in files:
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+        self._snapshots.append(([path for path, _ in files], size))
+        self._total += size
+        self.written += 1
+
+    def _encode(self, img) -> bytes:
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok: raise ValueError("JPEG encode gagal")
+        return buf.tobytes()
+
+    def _shrink(self, img):
+        h, w = img.shape[:2]
+        if w <= self.max_width: return img
+        return cv2.resize(img, (self.max_width, int(h * self.max_width / w)), interpolation=cv2.INTER_AREA)
+
+    def _evict(self, incoming: int):
+        """Hapus snapshot paling lama (semua file-nya) sampe snapshot baru muat di kuota"""
+        while self._snapshots and self._total + incoming > self.max_bytes:
+            paths, size = self._snapshots.popleft()
+            self._total -= size
+            # Sidecar dihapus terakhir: kalo proses mati di tengah, sisa snapshot tetap ketemu pas _scan
+            for path in sorted(paths, key=lambda p: p.endswith(".json")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"written": self.written, "dropped": self.dropped, "evicted": self.evicted,
+                "bytes": self._total, "snapshots": len(self._snapshots), "queued": self._queue.qsize()}
+
+
+__all__ = ['SnapshotWriter']
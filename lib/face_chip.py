@@ -0,0 +1,63 @@
+# lib/face_chip.py
+"""
+Crop wajah resolusi penuh buat encoding.
+
+Deteksi tetap di thumbnail (FR_SCALING) biar HOG murah, tapi encode dari frame
+asli: box dari thumbnail di-scale balik, dikasih padding, di-crop, dan kalo
+wajahnya jauh lebih gede dari yang dibutuhin encoder, chip-nya di-downscale.
+Alignment (rotasi + scale ke 150x150) tetap dikerjain dlib dari 5 titik
+landmark di dalam chip, jadi hasilnya sama kayak encode full frame tapi
+landmark & chip diambil dari piksel asli, bukan thumbnail ~256x144.
+"""
+from typing import Optional, Tuple
+
+from lib.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+Box = Tuple[int, int, int, int]  # (top, right, bottom, left) format face_recognition
+
+CHIP_PADDING = 0.25   # padding tiap sisi, relatif ke ukuran box
+CHIP_FACE_SIZE = 200  # sisi box wajah maksimal di chip (px); encoder dlib pake 150x150
+
+
+def scale_box(loc: Box, factor: float) -> Box:
+    """Box dari frame kecil -> frame asli (factor = 1 / FR_SCALING)"""
+    top, right, bottom, left = loc
+    return (int(round(top * factor)), int(round(right * factor)),
+            int(round(bottom * factor)), int(round(left * factor)))
+
+
+def crop_face_region(frame, loc: Box, padding: float = CHIP_PADDING,
+                     max_face_size: Optional[int] = CHIP_FACE_SIZE):
+    """
+    Args:
+        frame: Frame resolusi penuh
+        loc: Box wajah di koordinat `frame`
+        padding: Padding tiap sisi relatif ke ukuran box (dlib butuh konteks dagu/alis)
+        max_face_size: Downscale chip kalo sisi box lebih gede dari ini, None = gak usah
+
+    Returns:
+        (chip, loc_di_chip, (x0, y0, f)): titik frame (x, y) ada di chip pada
+        ((x - x0) * f, (y - y0) * f). Semua None kalo box di luar frame.
+    """
+    h, w = frame.shape[:2]
+    top, right, bottom, left = loc
+    bh, bw = bottom - top, right - left
+    py, px = int(bh * padding), int(bw * padding)
+    y0, y1 = max(0, top - py), min(h, bottom + py)
+    x0, x1 = max(0, left - px), min(w, right + px)
+    if y1 <= y0 or x1 <= x0: return None, None, None
+
+    chip = frame[y0:y1, x0:x1]
+    chip_loc = (top - y0, right - x0, bottom - y0, left - x0)
+    f = 1.0
+    face_size = max(bh, bw)
+    if max_face_size and face_size > max_face_size:
+        f = max_face_size / face_size
+        chip = cv2.resize(chip, (0, 0), fx=f, fy=f, interpolation=cv2.INTER_AREA)
+        chip_loc = scale_box(chip_loc, f)
+    return chip, chip_loc, (x0, y0, f)
+
+
+__all__ = ['CHIP_PADDING', 'CHIP_FACE_SIZE', 'scale_box', 'crop_face_region']
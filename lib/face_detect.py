@@ -0,0 +1,257 @@
+# lib/face_detect.py
+"""
+Backend detektor wajah yang bisa dipilih lewat config.
+
+Semua backend nerima frame RGB (biasanya thumbnail FR_SCALING) dan balikin list
+box (top, right, bottom, left) di koordinat frame itu, format face_recognition.
+
+    "hog"       : face_recognition HOG (default lama, paling lambat di CPU)
+    "haar"      : OpenCV Haar cascade, offline. OpenCV 5 mindahin cascade ke
+                  opencv-contrib-python (xobjdetect), XML-nya juga gak dibundel lagi
+    "dnn"       : OpenCV DNN SSD ResNet-10 (res10_300x300), file model di models/
+    "landmarks" : box diturunin dari landmark MediaPipe yang udah dihitung
+                  mediapipe_worker, tanpa deteksi tambahan sama sekali
+
+    detector = create_detector("haar")
+    locs = detector.detect(rgb_small, lms=self.last_known_lms)
+
+File model (DNN + XML Haar buat OpenCV 5) gak ikut di repo, download sekali:
+    python -m lib.face_detect --download
+"""
+import argparse
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lib.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+face_recognition = lazy_import("face_recognition")
+
+Box = Tuple[int, int, int, int]  # (top, right, bottom, left)
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(project_root, "models")
+DNN_PROTOTXT = os.path.join(MODELS_DIR, "deploy.prototxt")
+DNN_MODEL = os.path.join(MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+HAAR_CASCADE = "haarcascade_frontalface_default.xml"
+DOWNLOAD_HINT = "jalanin: python -m lib.face_detect --download"
+
+# File model yang gak ikut di repo: path tujuan -> URL (repo resmi OpenCV)
+MODEL_URLS = {
+    DNN_PROTOTXT: "https://raw.githubusercontent.com/opencv/opencv/4.x/samples/dnn/face_detector/deploy.prototxt",
+    DNN_MODEL: "https://raw.githubusercontent.com/opencv/opencv_3rdparty/dnn_samples_face_detector_20170830/"
+               "res10_300x300_ssd_iter_140000.caffemodel",
+    os.path.join(MODELS_DIR, HAAR_CASCADE): f"https://raw.githubusercontent.com/opencv/opencv/4.x/data/haarcascades/{HAAR_CASCADE}",
+}
+
+
+class FaceDetector(ABC):
+    """Interface detektor. `detect` dipanggil dari worker thread."""
+
+    name = "base"
+    needs_landmarks = False  # True = butuh lms dari MediaPipe
+
+    @classmethod
+    def unavailable_reason(cls) -> Optional[str]:
+        """Alasan backend ini gak bisa dipake di mesin ini (None = bisa)"""
+        return None
+
+    @abstractmethod
+    def detect(self, rgb, lms=None) -> List[Box]:
+        """List box (top, right, bottom, left) di koordinat `rgb`"""
+
+
+class HogDetector(FaceDetector):
+    name = "hog"
+
+    def __init__(self, upsample: int = 1):
+        self.upsample = upsample
+
+    @classmethod
+    def unavailable_reason(cls) -> Optional[str]:
+        try:
+            face_recognition.face_locations
+        except (ImportError, SystemExit) as e:  # face_recognition manggil quit() kalo model-nya gak ada
+            return f"face_recognition gak ke-install ({e or type(e).__name__})"
+        return None
+
+    def detect(self, rgb, lms=None) -> List[Box]:
+        return face_recognition.face_locations(rgb, number_of_times_to_upsample=self.upsample, model="hog")
+
+
+class HaarDetector(FaceDetector):
+    name = "haar"
+
+    def __init__(self, cascade_path: Optional[str] = None, scale_factor: float = 1.1,
+                 min_neighbors: int = 5, min_size: int = 20):
+        reason = self.unavailable_reason()
+        if reason: raise RuntimeError(reason)
+        cascade_path = cascade_path or self.find_cascade()
+        self.cascade = self.classifier_class()(cascade_path)
+        if self.cascade.empty(): raise FileNotFoundError(f"Haar cascade gak kebaca: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    @staticmethod
+    def classifier_class():
+        """cv2.CascadeClassifier (OpenCV 4.x / contrib) atau cv2.xobjdetect.CascadeClassifier, None kalo gak ada"""
+        cls = getattr(cv2, "CascadeClassifier", None)
+        if cls is None: cls = getattr(getattr(cv2, "xobjdetect", None), "CascadeClassifier", None)
+        return cls
+
+    @staticmethod
+    def find_cascade() -> Optional[str]:
+        """XML cascade bawaan opencv-python 4.x, kalo gak ada yang di models/"""
+        bundled = getattr(getattr(cv2, "data", None), "haarcascades", None)
+        for folder in (bundled, MODELS_DIR):
+            if folder and os.path.exists(os.path.join(folder, HAAR_CASCADE)): return os.path.join(folder, HAAR_CASCADE)
+        return None
+
+    @classmethod
+    def unavailable_reason(cls) -> Optional[str]:
+        if cls.classifier_class() is None:
+            return f"OpenCV {cv2.__version__} gak punya CascadeClassifier (OpenCV 5: install opencv-contrib-python)"
+        if cls.find_cascade() is None:
+            return f"{HAAR_CASCADE} gak ada di opencv maupun models/ ({DOWNLOAD_HINT})"
+        return None
+
+    def detect(self, rgb, lms=None) -> List[Box]:
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        rects = self.cascade.detectMultiScale(gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                                              minSize=(self.min_size, self.min_size))
+        return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in rects]
+
+
+class DnnDetector(FaceDetector):
+    name = "dnn"
+
+    def __init__(self, prototxt: str = DNN_PROTOTXT, model: str = DNN_MODEL,
+                 confidence: float = 0.5, input_size: int = 300):
+        for path in (prototxt, model):
+            if not os.path.exists(path): raise FileNotFoundError(f"Model DNN gak ada: {path} ({DOWNLOAD_HINT})")
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, model)
+        self.confidence = confidence
+        self.input_size = input_size
+
+    @classmethod
+    def unavailable_reason(cls) -> Optional[str]:
+        missing = [os.path.basename(p) for p in (DNN_PROTOTXT, DNN_MODEL) if not os.path.exists(p)]
+        if missing: return f"model DNN belum ada di models/: {', '.join(missing)} ({DOWNLOAD_HINT})"
+        return None
+
+    def detect(self, rgb, lms=None) -> List[Box]:
+        h, w = rgb.shape[:2]
+        # Model dilatih di BGR dengan mean (104, 177, 123); swapRB bikin input RGB jadi BGR
+        blob = cv2.dnn.blobFromImage(rgb, 1.0, (self.input_size, self.input_size),
+                                     (104.0, 177.0, 123.0), swapRB=True)
+        self.net.setInput(blob)
+        out = self.net.forward()
+        boxes = []
+        for det in out[0, 0]:
+            if det[2] < self.confidence: continue
+            x0, y0, x1, y1 = (det[3:7] * np.array([w, h, w, h])).astype(int)
+            x0, y0, x1, y1 = max(0, x0), max(0, y0), min(w, x1), min(h, y1)
+            if x1 > x0 and y1 > y0: boxes.append((int(y0), int(x1), int(y1), int(x0)))
+        return boxes
+
+
+class LandmarkDetector(FaceDetector):
+    """
+    Box dari bounding landmark FaceMesh (koordinat ternormalisasi, jadi cocok
+    buat frame ukuran apa aja). Mesh nutup sampe jidat, sedangkan box HOG/dlib
+    mulai kira-kira dari alis, jadi bagian atas dipotong `top_trim` biar
+    shape predictor dlib dapet box yang mirip sama yang dia harapin.
+    """
+
+    name = "landmarks"
+    needs_landmarks = True
+
+    def __init__(self, top_trim: float = 0.15):
+        self.top_trim = top_trim
+
+    @classmethod
+    def unavailable_reason(cls) -> Optional[str]:
+        try:
+            import mediapipe  # noqa: F401  Landmark-nya dari FaceMesh
+        except ImportError as e:
+            return f"mediapipe gak ke-install ({e})"
+        return None
+
+    def detect(self, rgb, lms=None) -> List[Box]:
+        if lms is None: return []
+        h, w = rgb.shape[:2]
+        xs = [p.x for p in lms]; ys = [p.y for p in lms]
+        left, right = max(0, int(min(xs) * w)), min(w, int(max(xs) * w))
+        top, bottom = max(0, int(min(ys) * h)), min(h, int(max(ys) * h))
+        top += int((bottom - top) * self.top_trim)
+        if right <= left or bottom <= top: return []
+        return [(top, right, bottom, left)]
+
+
+DETECTORS: Dict[str, Callable[..., FaceDetector]] = {
+    "hog": HogDetector,
+    "haar": HaarDetector,
+    "dnn": DnnDetector,
+    "landmarks": LandmarkDetector,
+}
+
+
+def create_detector(name: str, **kwargs) -> FaceDetector:
+    """Bikin detektor dari nama config. Raise ValueError kalo nama gak dikenal."""
+    if name not in DETECTORS:
+        raise ValueError(f"Detektor '{name}' gak dikenal, pilih salah satu dari {sorted(DETECTORS)}")
+    return DETECTORS[name](**kwargs)
+
+
+def unavailable_detectors() -> Dict[str, str]:
+    """Nama backend -> alasan gak bisa dipake di mesin ini (backend yang siap gak masuk)"""
+    out = {}
+    for name, cls in DETECTORS.items():
+        reason = cls.unavailable_reason()
+        if reason: out[name] = reason
+    return out
+
+
+def download_models(force: bool = False) -> List[str]:
+    """Download file model yang belum ada ke models/ (tmp + rename). Return path yang di-download."""
+    import requests
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    done = []
+    for path, url in MODEL_URLS.items():
+        if os.path.exists(path) and not force: continue
+        print(f"⬇️ {os.path.basename(path)} ...")
+        resp = requests.get(url, timeout=60)
+        resp.raise_for_status()
+        with open(path + ".tmp", "wb") as f:
+            f.write(resp.content)
+        os.replace(path + ".tmp", path)
+        done.append(path)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Status backend detektor wajah + download file model")
+    parser.add_argument("--download", action="store_true", help="Download model DNN & XML Haar ke models/")
+    parser.add_argument("--force", action="store_true", help="Download ulang walau file udah ada")
+    args = parser.parse_args(argv)
+
+    if args.download:
+        try:
+            fetched = download_models(args.force)
+            print(f"✅ {len(fetched)} file di-download ke {MODELS_DIR}" if fetched else "✅ Semua model udah ada")
+        except Exception as e:
+            print(f"❌ Download gagal: {e}")
+    unavailable = unavailable_detectors()
+    for name in DETECTORS:
+        print(f"{name:<10} {'❌ ' + unavailable[name] if name in unavailable else '✅ siap'}")
+
+
+__all__ = ['Box', 'FaceDetector', 'HogDetector', 'HaarDetector', 'DnnDetector', 'LandmarkDetector',
+           'DETECTORS', 'MODEL_URLS', 'create_detector', 'unavailable_detectors', 'download_models']
+
+
+if __name__ == "__main__":
+    main()
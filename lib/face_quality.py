@@ -0,0 +1,149 @@
+# lib/face_quality.py
+"""
+Quality gate murah sebelum face_encodings (yang mahal).
+
+Wajah kekecilan, blur, kegelapan/silau, atau lagi nengok jauh hampir pasti
+gak ke-match dan cuma bikin "UNKNOWN" kedip-kedip. Skor dihitung dari:
+  - ukuran box (px, sisi terpendek)
+  - ketajaman: variance Laplacian di crop wajah (grayscale)
+  - brightness: rata-rata grayscale crop
+  - yaw: posisi hidung relatif ke 2 pipi dari landmark MediaPipe (last_known_lms)
+
+BestFrameWindow nyimpen frame dengan skor tertinggi dalam window pendek,
+itu yang dipake identify_face_worker.
+"""
+import threading
+import time
+from typing import Any, NamedTuple, Optional, Sequence, Tuple
+
+from lib.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Index landmark MediaPipe FaceMesh (sama kayak check_liveness)
+LM_NOSE = 4
+LM_RIGHT_CHEEK = 234
+LM_LEFT_CHEEK = 454
+
+
+class QualityThresholds(NamedTuple):
+    min_size: int = 20          # px di frame yang dideteksi (0.2 scale -> ~100px asli)
+    min_sharpness: float = 30.0 # variance Laplacian
+    min_brightness: float = 50.0
+    max_brightness: float = 210.0
+    max_yaw: float = 0.5        # 0 = frontal, 1 = nengok penuh
+
+
+class FaceQuality(NamedTuple):
+    score: float                # 0..1, makin tinggi makin bagus
+    passed: bool
+    reason: Optional[str]       # alasan gagal pertama (buat debug), None kalo lolos
+    size: int
+    sharpness: float
+    brightness: float
+    yaw: Optional[float]        # None kalo landmark gak ada
+
+
+def yaw_from_landmarks(lms) -> Optional[float]:
+    """Yaw 0..1 dari rasio hidung di antara 2 pipi (0.5 = frontal)"""
+    if lms is None: return None
+    try:
+        nose, re, le = lms[LM_NOSE].x, lms[LM_RIGHT_CHEEK].x, lms[LM_LEFT_CHEEK].x
+    except (IndexError, AttributeError, TypeError):
+        return None
+    if le - re == 0: return None
+    ratio = (nose - re) / (le - re)
+    return min(1.0, abs(ratio - 0.5) * 2)
+
+
+def largest_face(locs: Sequence[Tuple[int, int, int, int]]):
+    """Box (top, right, bottom, left) paling gede, None kalo kosong"""
+    if not locs: return None
+    return max(locs, key=lambda l: (l[2] - l[0]) * (l[1] - l[3]))
+
+
+def assess_face(image, loc, lms=None, thresholds: QualityThresholds = QualityThresholds()) -> FaceQuality:
+    """
+    Args:
+        image: Frame RGB/BGR tempat box dideteksi
+        loc: Box (top, right, bottom, left) format face_recognition
+        lms: Landmark MediaPipe (opsional) buat yaw
+        thresholds: Batas lolos
+
+    Returns:
+        FaceQuality
+    """
+    h, w = image.shape[:2]
+    top, right, bottom, left = loc
+    top, left = max(0, top), max(0, left)
+    bottom, right = min(h, bottom), min(w, right)
+    size = max(0, min(bottom - top, right - left))
+    if size == 0:
+        return FaceQuality(0.0, False, "empty", 0, 0.0, 0.0, None)
+
+    crop = image[top:bottom, left:right]
+    gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY) if crop.ndim == 3 else crop
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    brightness = float(gray.mean())
+    yaw = yaw_from_landmarks(lms)
+
+    t = thresholds
+    reason = None
+    if size < t.min_size: reason = "small"
+    elif sharpness < t.min_sharpness: reason = "blur"
+    elif brightness < t.min_brightness: reason = "dark"
+    elif brightness > t.max_brightness: reason = "bright"
+    elif yaw is not None and yaw > t.max_yaw: reason = "yaw"
+
+    # Skor gabungan: tiap komponen 0..1, dikali biar 1 komponen jelek = skor jelek
+    size_s = min(1.0, size / (t.min_size * 3))
+    sharp_s = min(1.0, sharpness / (t.min_sharpness * 4))
+    mid = (t.min_brightness + t.max_brightness) / 2
+    bright_s = max(0.0, 1.0 - abs(brightness - mid) / (mid - t.min_brightness + 1e-6) * 0.5)
+    yaw_s = 1.0 if yaw is None else max(0.0, 1.0 - yaw)
+    score = size_s * sharp_s * bright_s * yaw_s
+    return FaceQuality(score, reason is None, reason, size, sharpness, brightness, yaw)
+
+
+class BestFrameWindow:
+    """
+    Simpen kandidat frame terbaik selama `window` detik.
+    Kandidat lebih tua dari window diganti walaupun skornya lebih jelek
+    (wajah yang sekarang lebih relevan daripada yang 3 detik lalu).
+    """
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self._lock = threading.Lock()
+        self._best: Optional[Tuple[float, float, Any]] = None  # (score, timestamp, payload)
+
+    def offer(self, score: float, payload: Any, now: Optional[float] = None) -> bool:
+        """Return True kalo payload jadi kandidat terbaik"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._best is None or now - self._best[1] > self.window or score >= self._best[0]:
+                self._best = (score, now, payload)
+                return True
+            return False
+
+    def has_candidate(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return self._best is not None and now - self._best[1] <= self.window
+
+    def take(self, now: Optional[float] = None) -> Optional[Any]:
+        """Ambil & kosongin kandidat terbaik (None kalo gak ada / udah basi)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            best, self._best = self._best, None
+        if best is None or now - best[1] > self.window: return None
+        return best[2]
+
+    def clear(self):
+        with self._lock:
+            self._best = None
+
+
+__all__ = ['QualityThresholds', 'FaceQuality', 'assess_face', 'yaw_from_landmarks', 'largest_face',
+           'BestFrameWindow']
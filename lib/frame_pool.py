@@ -0,0 +1,128 @@
+# lib/frame_pool.py
+"""
+Pool buffer frame yang di-reference count.
+
+Tiap tick update_frame dulu ngalokasiin frame flip, display_frame.copy(),
+frame.copy() buat tiap worker, frame resize MediaPipe, dan frame resize render
+(beberapa MB per frame di 30 FPS). Sekarang buffer diambil dari pool, diisi
+lewat parameter `dst` cv2 (flip/resize/cvtColor), dan worker cuma minjem
+view read-only. Buffer balik ke pool pas referensi terakhirnya di-release.
+
+    buf = pool.acquire((720, 1280, 3))
+    cv2.flip(raw, 1, dst=buf.array)
+    worker_ref = buf.retain()          # worker: pake worker_ref.view(), lalu release()
+    buf.release()                      # main thread selesai
+"""
+import threading
+from typing import Dict, List, Tuple
+
+from lib.lazy import lazy_import
+
+np = lazy_import("numpy")
+cv2 = lazy_import("cv2")
+Image = lazy_import("PIL.Image")
+
+
+class PooledFrame:
+    """Buffer numpy dari FramePool. Refcount awal 1 (yang acquire)."""
+
+    __slots__ = ("pool", "array", "_refs")
+
+    def __init__(self, pool: "FramePool", array):
+        self.pool = pool
+        self.array = array
+        self._refs = 0
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    def view(self):
+        """View read-only, buat worker yang cuma baca"""
+        v = self.array.view()
+        v.flags.writeable = False
+        return v
+
+    def retain(self) -> "PooledFrame":
+        with self.pool._lock:
+            if self._refs <= 0: raise RuntimeError("Buffer udah balik ke pool")
+            self._refs += 1
+        return self
+
+    def release(self):
+        with self.pool._lock:
+            if self._refs <= 0: raise RuntimeError("Buffer di-release lebih dari sekali")
+            self._refs -= 1
+            if self._refs == 0: self.pool._give_back(self)
+
+    def __enter__(self) -> "PooledFrame":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class FramePool:
+    """
+    Pool buffer per (shape, dtype). Buffer bebas disimpen maksimal `max_free`
+    per shape dan maksimal `max_shapes` shape (yang paling lama gak dipake
+    dibuang, misal pas window di-resize dan ukuran label render berubah-ubah).
+    """
+
+    def __init__(self, max_free: int = 4, max_shapes: int = 8):
+        self.max_free = max_free
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._free: Dict[Tuple, List[PooledFrame]] = {}
+        self.allocations = 0  # Buffer baru yang beneran dialokasiin
+        self.reuses = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def acquire(self, shape, dtype="uint8") -> PooledFrame:
+        key = (tuple(shape), str(dtype))
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buf = free.pop()
+                self.reuses += 1
+            else:
+                buf = None
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        if buf is None:
+            buf = PooledFrame(self, np.empty(key[0], dtype=key[1]))
+            with self._lock:
+                self.allocations += 1
+        buf._refs = 1
+        return buf
+
+    def acquire_like(self, array) -> PooledFrame:
+        return self.acquire(array.shape, array.dtype)
+
+    def _give_back(self, buf: PooledFrame):
+        # Dipanggil dengan self._lock udah dipegang
+        self.in_use -= 1
+        key = (buf.array.shape, str(buf.array.dtype))
+        free = self._free.pop(key, [])
+        if len(free) < self.max_free: free.append(buf)
+        self._free[key] = free  # Pindah ke paling belakang (paling baru dipake)
+        while len(self._free) > self.max_shapes:
+            del self._free[next(iter(self._free))]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            free = sum(len(v) for v in self._free.values())
+            return {"allocations": self.allocations, "reuses": self.reuses, "in_use": self.in_use,
+                    "peak_in_use": self.peak_in_use, "free": free}
+
+
+def to_display_image(pool: FramePool, frame, width: int, height: int):
+    """Frame BGR -> PIL Image ukuran label. Resize cuma sekali, ke buffer pool (PIL nge-copy datanya)"""
+    with pool.acquire((height, width, 3)) as resized, pool.acquire((height, width, 3)) as rgb:
+        cv2.resize(frame, (width, height), dst=resized.array, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(resized.array, cv2.COLOR_BGR2RGB, dst=rgb.array)
+        return Image.fromarray(rgb.array)
+
+
+__all__ = ['FramePool', 'PooledFrame', 'to_display_image']
@@ -0,0 +1,265 @@
+# lib/gallery.py
+"""
+Loader galeri wajah (folder assets/) + enhancement frame gelap.
+
+Dipisah dari AppSIMPEL biar bisa dipanggil sebelum window scanner ada
+(misal di-preload selagi user login). GalleryWatcher nge-reload foto yang
+ditambah/diganti/dihapus di assets/ tanpa restart kiosk.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from lib.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+face_recognition = lazy_import("face_recognition")
+
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+
+
+def create_clahe():
+    return cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+
+def apply_enhancement(frame, clahe, threshold: float):
+    """CLAHE di channel L kalo frame kegelapan. Return (frame, enhanced?)"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if np.mean(gray) < threshold:
+        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        enhanced_l = clahe.apply(l)
+        return cv2.cvtColor(cv2.merge([enhanced_l, a, b]), cv2.COLOR_LAB2BGR), True
+    return frame, False
+
+
+def name_from_filename(filename: str) -> str:
+    """'Nur_Zahra.jpeg' -> 'Nur Zahra'"""
+    return os.path.splitext(filename)[0].replace("_", " ").title()
+
+
+def encode_image(file_path: str, clahe, threshold: float):
+    """
+    Encode 1 foto galeri.
+
+    Returns:
+        Encoding 128-d, None kalo gak ada wajah. Raise IOError kalo file gak kebaca
+        (misal masih dicopy), biar dicoba lagi nanti.
+    """
+    img = cv2.imread(file_path)
+    if img is None: raise IOError(f"Gagal baca {file_path}")
+    enhanced, _ = apply_enhancement(img, clahe, threshold)
+    rgb = cv2.cvtColor(enhanced, cv2.COLOR_BGR2RGB)
+    encs = face_recognition.face_encodings(rgb)
+    return encs[0] if encs else None
+
+
+def scan_folder(path: str) -> Dict[str, Tuple[int, int]]:
+    """Snapshot murah isi folder: {filename: (mtime_ns, size)}"""
+    if not os.path.isdir(path): return {}
+    out = {}
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                st = entry.stat()
+                out[entry.name] = (st.st_mtime_ns, st.st_size)
+    return out
+
+
+class GalleryEntry(NamedTuple):
+    name: str
+    encoding: object  # np.ndarray 128-d
+    signature: Tuple[int, int]
+
+
+class FaceGallery:
+    """
+    Snapshot galeri yang immutable: encoding ditumpuk jadi 1 matrix (N, 128).
+
+    Jangan diubah di tempat. Perubahan bikin instance baru lewat `with_changes()`,
+    terus referensinya diganti sekali assign (atomik), jadi thread identifikasi
+    yang lagi jalan tetap pake snapshot lama yang utuh.
+    """
+
+    _sq_norms = None  # Cache per snapshot, lihat squared_norms()
+    _known = None
+
+    def __init__(self, entries: Dict[str, GalleryEntry]):
+        self.entries = dict(sorted(entries.items()))
+        self.names = [e.name for e in self.entries.values()]
+        # Signature semua file yang udah diproses (termasuk yang gak ada wajahnya)
+        self.scanned = {f: e.signature for f, e in self.entries.items()}
+        if self.entries:
+            self.encodings = np.stack([e.encoding for e in self.entries.values()])
+        else:
+            self.encodings = np.empty((0, 128))
+
+    def __len__(self):
+        return len(self.names)
+
+    def distances(self, encoding):
+        """Jarak Euclid ke semua wajah (sama kayak face_recognition.face_distance)"""
+        if not len(self): return np.empty((0,))
+        return np.linalg.norm(self.encodings - encoding, axis=1)
+
+    def match(self, encoding, tolerance: float) -> Tuple[Optional[str], float]:
+        """Return (nama, jarak) wajah terdekat; nama None kalo di atas tolerance"""
+        dist = self.distances(encoding)
+        if not len(dist): return None, float("inf")
+        idx = int(np.argmin(dist))
+        best = float(dist[idx])
+        return (self.names[idx] if best <= tolerance else None), best
+
+    def distances_many(self, encodings):
+        """Jarak (K, N) dari K wajah ke semua wajah galeri, 1 operasi matrix (bukan K x distances())"""
+        queries = np.asarray(encodings, dtype=np.float32).reshape(-1, 128)
+        if not len(self): return np.empty((len(queries), 0), dtype=np.float32)
+        # |a-b|^2 = |a|^2 + |b|^2 - 2ab: gak bikin array (K, N, 128)
+        sq = (queries * queries).sum(1)[:, None] + self.squared_norms()[None, :] - 2 * self._dot(queries)
+        return np.sqrt(np.maximum(sq, 0))
+
+    def squared_norms(self):
+        """|b|^2 tiap wajah galeri (N,), dihitung sekali per snapshot (snapshot gak pernah berubah)"""
+        if self._sq_norms is None:
+            self._sq_norms = self._compute_squared_norms()
+        return self._sq_norms
+
+    def _compute_squared_norms(self):
+        known = self._known_f32()
+        return np.einsum("ij,ij->i", known, known)
+
+    def _dot(self, queries):
+        """queries (K, 128) float32 . galeri^T -> (K, N)"""
+        return queries @ self._known_f32().T
+
+    def _known_f32(self):
+        # Encoding face_recognition float64: copy float32-nya di-cache, bukan dibikin tiap panggilan
+        if self._known is None:
+            self._known = np.ascontiguousarray(self.encodings, dtype=np.float32)
+        return self._known
+
+    def match_many(self, encodings, tolerance: float) -> List[Tuple[Optional[str], float]]:
+        """match() buat beberapa wajah sekaligus"""
+        return [(top[0][0] if top and top[0][1] <= tolerance else None, top[0][1] if top else float("inf"))
+                for top in self.top_k(encodings, 1)]
+
+    def top_k(self, encodings, k: int = 3) -> List[List[Tuple[str, float]]]:
+        """K identitas terdekat (nama, jarak) per wajah, urut dari yang paling deket"""
+        if not len(encodings): return []
+        dist = self.distances_many(encodings)
+        k = min(k, dist.shape[1])
+        if k == 0: return [[] for _ in range(len(dist))]
+        idx = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        result = []
+        for row, cols in zip(dist, idx):
+            cols = cols[np.argsort(row[cols])]
+            result.append([(self.names[c], float(row[c])) for c in cols])
+        return result
+
+    def with_changes(self, updated: Dict[str, GalleryEntry], removed: Iterable[str]) -> "FaceGallery":
+        entries = dict(self.entries)
+        for filename in removed: entries.pop(filename, None)
+        entries.update(updated)
+        return FaceGallery(entries)
+
+
+def load_gallery(path: str, clahe=None, threshold: float = 95) -> FaceGallery:
+    """Encode semua foto di `path` jadi FaceGallery"""
+    clahe = clahe or create_clahe()
+    entries, scanned = {}, {}
+    for filename, signature in scan_folder(path).items():
+        try:
+            encoding = encode_image(os.path.join(path, filename), clahe, threshold)
+        except IOError:
+            continue
+        scanned[filename] = signature
+        if encoding is not None:
+            entries[filename] = GalleryEntry(name_from_filename(filename), encoding, signature)
+    gallery = FaceGallery(entries)
+    gallery.scanned = scanned
+    return gallery
+
+
+class GalleryWatcher:
+    """
+    Pantau folder galeri (polling os.scandir, murah & jalan di Windows juga).
+    Cuma foto yang baru/berubah yang di-encode ulang, yang dihapus di-drop.
+    Tiap ada perubahan, snapshot FaceGallery baru dikirim ke `on_swap`.
+    """
+
+    def __init__(self, path: str, gallery: FaceGallery, on_swap: Callable[[FaceGallery], None],
+                 threshold: float = 95, interval: float = 2.0, settle: float = 1.0):
+        """
+        Args:
+            path: Folder galeri
+            gallery: Snapshot awal
+            on_swap: Dipanggil (dari thread watcher) dengan snapshot baru
+            threshold: Threshold brightness buat enhancement
+            interval: Jeda polling (detik)
+            settle: File yang baru dimodif < settle detik dilewatin dulu (masih dicopy)
+        """
+        self.path = path
+        self.gallery = gallery
+        self.on_swap = on_swap
+        self.threshold = threshold
+        self.interval = interval
+        self.settle = settle
+        # Signature semua file yang udah diproses, termasuk foto tanpa wajah
+        self._seen = dict(gallery.scanned)
+        self._clahe = None  # CLAHE sendiri, jangan share sama thread lain
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "GalleryWatcher":
+        if self._thread and self._thread.is_alive(): return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="gallery-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        # Scan pertama langsung: foto yang belum ada pas galeri awal di-load ikut ketangkep
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Gallery watcher error: {e}")
+            self._stop.wait(self.interval)
+
+    def poll(self) -> bool:
+        """Cek 1x. Return True kalo galeri di-swap."""
+        current = scan_folder(self.path)
+        now_ns = time.time_ns()
+        removed = [f for f in self._seen if f not in current]
+        changed = [f for f, sig in current.items()
+                   if self._seen.get(f) != sig and now_ns - sig[0] >= self.settle * 1e9]
+        if not removed and not changed: return False
+
+        if self._clahe is None: self._clahe = create_clahe()
+        updated, dropped = {}, list(removed)
+        for filename in changed:
+            try:
+                encoding = encode_image(os.path.join(self.path, filename), self._clahe, self.threshold)
+            except IOError:
+                continue  # Coba lagi di polling berikutnya
+            self._seen[filename] = current[filename]
+            if encoding is None:
+                dropped.append(filename)  # Foto diganti jadi gak ada wajahnya
+            else:
+                updated[filename] = GalleryEntry(name_from_filename(filename), encoding, current[filename])
+        for filename in removed: self._seen.pop(filename, None)
+
+        if not updated and not any(f in self.gallery.entries for f in dropped): return False
+        self.gallery = self.gallery.with_changes(updated, dropped)
+        print(f"🔄 Galeri di-reload: +{len(updated)} / -{len(dropped)} → {len(self.gallery)} wajah")
+        self.on_swap(self.gallery)
+        return True
+
+
+__all__ = ['IMAGE_EXTENSIONS', 'create_clahe', 'apply_enhancement', 'name_from_filename', 'encode_image',
+           'scan_folder', 'GalleryEntry', 'FaceGallery', 'load_gallery', 'GalleryWatcher']
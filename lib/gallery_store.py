@@ -0,0 +1,220 @@
+# lib/gallery_store.py
+"""
+Gallery store di disk: embedding jadi 1 matrix kontigu yang di-memory-map.
+
+Layout folder store (misal `gallery.store/`):
+    embeddings-<gen>-<id>.npy  matrix (N, 128) float32 / float16 / int8
+    scale-<gen>-<id>.npy       skala per dimensi (cuma buat int8)
+                          (generasi aktif + KEEP_GENERATIONS - 1 generasi sebelumnya)
+    identities.json       generasi aktif, nama, filename, signature file, dtype,
+                          dan daftar file yang udah discan
+
+Dibuka pake np.load(mmap_mode="r"): gak ada parse/encode, halaman dibaca lazy
+sama OS dan di-share antar proses kiosk di mesin yang sama (page cache).
+"""
+import json
+import os
+import re
+import tempfile
+import uuid
+from typing import Dict, Optional
+
+from lib.gallery import FaceGallery, GalleryEntry, load_gallery
+from lib.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+STORE_VERSION = 1
+MATCH_CHUNK = 4096  # Baris matrix per blok di distances_many (temporary float32 tetap kecil)
+DTYPES = ("float32", "float16", "int8")
+# Generasi sebelumnya gak langsung dihapus: proses lain yang baru baca identities.json lama
+# masih harus bisa np.load matrix-nya walau swap kejadian di antaranya
+KEEP_GENERATIONS = 2
+_GENERATION_FILE = re.compile(r"^(?:embeddings|scale)-(\d+)(?:-[0-9a-f]+)?\.npy$")
+
+
+def quantize(encodings, dtype: str):
+    """Return (matrix, scale). Int8 pake skala simetris per dimensi."""
+    if dtype not in DTYPES: raise ValueError(f"dtype harus salah satu dari {DTYPES}")
+    encodings = np.asarray(encodings, dtype=np.float32)
+    if dtype != "int8":
+        return encodings.astype(dtype), None
+    scale = np.abs(encodings).max(axis=0) / 127.0 if len(encodings) else np.ones(128, np.float32)
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    q = np.clip(np.rint(encodings / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+def dequantize(matrix, scale):
+    if scale is None: return np.asarray(matrix, dtype=np.float32)
+    return matrix.astype(np.float32) * scale
+
+
+def save_gallery_store(gallery: FaceGallery, path: str, dtype: str = "float16"):
+    """
+    Tulis generasi baru store. File matrix generasi lama gak ditimpa (mungkin lagi
+    di-mmap proses lain), yang di-swap atomik cuma identities.json via os.replace.
+    """
+    matrix, scale = quantize(gallery.encodings, dtype)
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, "identities.json")
+    generation = 0
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                generation = int(json.load(f).get("generation", 0)) + 1
+        except Exception:
+            generation = 1
+    # Nama unik per tulis: 2 proses yang baca generasi sama (atau identities.json korup)
+    # gak pernah nimpa file yang mungkin udah dipublish & lagi di-mmap proses lain
+    token = uuid.uuid4().hex[:12]
+    emb_name, scale_name = f"embeddings-{generation}-{token}.npy", f"scale-{generation}-{token}.npy"
+    _save_npy(path, emb_name, np.ascontiguousarray(matrix))
+    if scale is not None:
+        _save_npy(path, scale_name, scale)
+    meta = {
+        "version": STORE_VERSION,
+        "generation": generation,
+        "dtype": dtype,
+        "embeddings": emb_name,
+        "scale": scale_name if scale is not None else None,
+        "names": gallery.names,
+        "filenames": list(gallery.entries.keys()),
+        "signatures": [list(e.signature) for e in gallery.entries.values()],
+        "scanned": {f: list(sig) for f, sig in gallery.scanned.items()},
+    }
+    fd, tmp = tempfile.mkstemp(prefix=".identities-", suffix=".json", dir=path)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+    _cleanup_generations(path, generation)
+
+
+def _save_npy(path: str, name: str, array):
+    """np.save ke file tmp lalu os.replace: nama final cuma muncul kalo isinya udah lengkap"""
+    fd, tmp = tempfile.mkstemp(prefix=f".{name}-", suffix=".tmp", dir=path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, os.path.join(path, name))
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _cleanup_generations(path: str, generation: int, keep: int = KEEP_GENERATIONS):
+    """
+    Hapus matrix generasi yang lebih lama dari `keep` generasi terakhir (termasuk yang aktif).
+    Gagal (file masih di-mmap di Windows) = biarin, dicoba lagi nanti.
+    """
+    for name in os.listdir(path):
+        match = _GENERATION_FILE.match(name)
+        if match and int(match.group(1)) <= generation - keep:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+class StoredGallery(FaceGallery):
+    """
+    FaceGallery yang datanya langsung dari store mmap.
+    `match()` ngitung jarak langsung dari matrix terkuantisasi, `entries`
+    baru di-dequantize kalo diminta (misal sama GalleryWatcher pas ada perubahan).
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "identities.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Versi store {meta.get('version')} gak didukung")
+        self.path = path
+        self.dtype = meta["dtype"]
+        self.names = meta["names"]
+        self._filenames = meta["filenames"]
+        self._signatures = [tuple(s) for s in meta["signatures"]]
+        self.scanned = {f: tuple(sig) for f, sig in meta.get("scanned", {}).items()}
+        self.matrix = np.load(os.path.join(path, meta["embeddings"]), mmap_mode="r")
+        self.scale = np.load(os.path.join(path, meta["scale"])) if meta.get("scale") else None
+        self._entries: Optional[Dict[str, GalleryEntry]] = None
+        if len(self.names) != len(self.matrix) or len(self._filenames) != len(self.names):
+            raise ValueError("Store korup: jumlah identitas & embedding beda")
+
+    @property
+    def encodings(self):
+        return dequantize(self.matrix, self.scale)
+
+    @property
+    def entries(self) -> Dict[str, GalleryEntry]:
+        if self._entries is None:
+            enc = self.encodings
+            self._entries = {
+                f: GalleryEntry(name, enc[i], sig)
+                for i, (f, name, sig) in enumerate(zip(self._filenames, self.names, self._signatures))
+            }
+        return self._entries
+
+    def distances(self, encoding):
+        if not len(self): return np.empty((0,))
+        query = np.asarray(encoding, dtype=np.float32)
+        if self.scale is None:
+            diff = self.matrix - query  # float16 naik ke float32 otomatis, float32 tanpa copy
+        else:
+            diff = self.matrix * self.scale - query  # int8 * float32 -> float32
+        return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+
+    # distances_many: norm di-cache per snapshot (1 StoredGallery = 1 generasi), perkalian
+    # langsung di matrix mmap per blok, gak pernah dequantize seluruh matrix
+
+    def _blocks(self):
+        for start in range(0, len(self.matrix), MATCH_CHUNK):
+            yield start, np.asarray(self.matrix[start:start + MATCH_CHUNK], dtype=np.float32)
+
+    def _compute_squared_norms(self):
+        out = np.empty(len(self.matrix), dtype=np.float32)
+        for start, block in self._blocks():
+            if self.scale is not None: block *= self.scale
+            out[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+        return out
+
+    def _dot(self, queries):
+        # int8: a . (m * s) = (a * s) . m, skala pindah ke query (K baris) bukan ke matrix (N baris)
+        if self.scale is not None: queries = queries * self.scale
+        out = np.empty((len(queries), len(self.matrix)), dtype=np.float32)
+        for start, block in self._blocks():
+            out[:, start:start + len(block)] = queries @ block.T
+        return out
+
+
+def open_gallery_store(path: str) -> Optional[StoredGallery]:
+    """Buka store, None kalo gak ada / korup"""
+    if not os.path.exists(os.path.join(path, "identities.json")): return None
+    try:
+        return StoredGallery(path)
+    except Exception as e:
+        print(f"⚠️ Gallery store gak kebaca ({e}), encode ulang dari foto")
+        return None
+
+
+def load_gallery_cached(assets_path: str, store_path: str, threshold: float = 95,
+                        dtype: str = "float16") -> FaceGallery:
+    """
+    Buka store kalo ada (instan). Kalo belum ada, encode dari foto lalu simpen store.
+    Selisih store vs isi folder diberesin GalleryWatcher di polling pertamanya.
+    """
+    stored = open_gallery_store(store_path)
+    if stored is not None and stored.dtype == dtype:
+        return stored
+    gallery = load_gallery(assets_path, threshold=threshold)
+    try:
+        save_gallery_store(gallery, store_path, dtype)
+    except Exception as e:
+        print(f"⚠️ Gagal nyimpen gallery store: {e}")
+    return gallery
+
+
+__all__ = ['DTYPES', 'KEEP_GENERATIONS', 'quantize', 'dequantize', 'save_gallery_store', 'StoredGallery',
+           'open_gallery_store', 'load_gallery_cached']
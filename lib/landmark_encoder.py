@@ -0,0 +1,145 @@
+# lib/landmark_encoder.py
+"""
+Encoding wajah pake landmark MediaPipe, tanpa shape predictor dlib.
+
+face_recognition.face_encodings = shape predictor 5 titik (dlib) -> chip 150x150
+yang di-align -> ResNet embedding. Padahal mediapipe_worker udah punya 468
+landmark refined buat wajah yang sama. Di sini 5 titik yang dipake dlib
+(2 sudut tiap mata + pangkal hidung) diambil dari landmark MediaPipe, chip
+dibikin pake dlib.get_face_chip (size & padding sama kayak face_recognition),
+lalu langsung masuk ke encoder. Predictor gak dipanggil sama sekali.
+
+Urutan titik dlib 5-point: 0/1 = mata di sisi kanan gambar (luar, dalam),
+2/3 = mata di sisi kiri gambar (luar, dalam), 4 = pangkal hidung. Mata
+ditentuin dari posisi x, jadi aman buat frame yang di-flip (mirror).
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from lib.lazy import lazy_import
+
+np = lazy_import("numpy")
+dlib = lazy_import("dlib")
+face_recognition_api = lazy_import("face_recognition.api")
+
+# Index landmark MediaPipe FaceMesh
+MP_EYE_A = (33, 133)    # (sudut luar, sudut dalam) mata kanan subjek
+MP_EYE_B = (263, 362)   # (sudut luar, sudut dalam) mata kiri subjek
+MP_NOSE_BASE = 2
+
+CHIP_SIZE = 150         # Sama kayak face_recognition / dlib_face_recognition_resnet_model_v1
+CHIP_PADDING = 0.25
+
+Point = Tuple[float, float]
+
+
+def five_points(lms, width: int, height: int, offset: Tuple[float, float, float] = (0, 0, 1.0)) -> List[Point]:
+    """
+    5 titik alignment format dlib dari landmark MediaPipe (ternormalisasi).
+
+    Args:
+        lms: Landmark FaceMesh (koordinat 0..1 relatif ke frame asli)
+        width, height: Ukuran frame asli
+        offset: (x0, y0, f) dari lib.face_chip.crop_face_region kalo titiknya mau di koordinat chip
+    """
+    x0, y0, f = offset
+    px = lambda i: ((lms[i].x * width - x0) * f, (lms[i].y * height - y0) * f)
+    eye_a, eye_b = [px(i) for i in MP_EYE_A], [px(i) for i in MP_EYE_B]
+    # Mata yang rata-rata x-nya lebih gede = sisi kanan gambar = titik 0/1
+    if eye_a[0][0] + eye_a[1][0] > eye_b[0][0] + eye_b[1][0]:
+        right_img, left_img = eye_a, eye_b
+    else:
+        right_img, left_img = eye_b, eye_a
+    return [right_img[0], right_img[1], left_img[0], left_img[1], px(MP_NOSE_BASE)]
+
+
+def landmark_box(lms, width: int, height: int) -> Tuple[int, int, int, int]:
+    """Bounding box (top, right, bottom, left) semua landmark di koordinat frame asli"""
+    xs = [p.x for p in lms]; ys = [p.y for p in lms]
+    return (int(min(ys) * height), int(max(xs) * width), int(max(ys) * height), int(min(xs) * width))
+
+
+def landmarks_match_box(lms, loc, width: int, height: int, min_overlap: float = 0.5) -> bool:
+    """
+    Cek landmark (dari thread MediaPipe, beda frame dikit) masih nempel sama box
+    deteksi: porsi box deteksi yang ketutup box landmark >= min_overlap.
+    """
+    if lms is None or loc is None: return False
+    lt, lr, lb, ll = landmark_box(lms, width, height)
+    top, right, bottom, left = loc
+    inter = max(0, min(lb, bottom) - max(lt, top)) * max(0, min(lr, right) - max(ll, left))
+    area = max(1, (bottom - top) * (right - left))
+    return inter / area >= min_overlap
+
+
+def _full_object_detection(points: Sequence[Point]):
+    xs = [p[0] for p in points]; ys = [p[1] for p in points]
+    rect = dlib.rectangle(int(min(xs)), int(min(ys)), int(max(xs)) + 1, int(max(ys)) + 1)
+    return dlib.full_object_detection(rect, [dlib.point(int(round(x)), int(round(y))) for x, y in points])
+
+
+def encode_aligned(rgb, points: Sequence[Point], num_jitters: int = 0):
+    """
+    Args:
+        rgb: Gambar RGB uint8 (frame atau chip) tempat `points` berada
+        points: 5 titik dari five_points()
+
+    Returns:
+        Encoding 128-d (np.ndarray)
+    """
+    rgb = np.ascontiguousarray(rgb)
+    chip = dlib.get_face_chip(rgb, _full_object_detection(points), size=CHIP_SIZE, padding=CHIP_PADDING)
+    return np.array(face_recognition_api.face_encoder.compute_face_descriptor(chip, num_jitters))
+
+
+def encode_aligned_batch(items: Sequence[Tuple[object, Sequence[Point]]], num_jitters: int = 0) -> list:
+    """
+    Beberapa wajah sekaligus: semua chip di-align dulu, ResNet dipanggil sekali
+    buat satu batch (bukan sekali per wajah).
+
+    Args:
+        items: List (rgb, points) kayak argumen encode_aligned
+
+    Returns:
+        List encoding 128-d, urutannya sama kayak items
+    """
+    chips = [dlib.get_face_chip(np.ascontiguousarray(rgb), _full_object_detection(points), size=CHIP_SIZE,
+                                padding=CHIP_PADDING) for rgb, points in items]
+    if not chips: return []
+    return [np.array(d) for d in face_recognition_api.face_encoder.compute_face_descriptor(chips, num_jitters)]
+
+
+def encode_locations_batch(items: Sequence[Tuple[object, Tuple[int, int, int, int]]], num_jitters: int = 0) -> list:
+    """
+    Jalur tanpa landmark MediaPipe: shape predictor 5 titik dlib per wajah
+    (kayak face_recognition.face_encodings), tapi encoder-nya 1 panggilan batch.
+
+    Args:
+        items: List (rgb, (top, right, bottom, left))
+    """
+    images, faces = [], []
+    for rgb, loc in items:
+        rgb = np.ascontiguousarray(rgb)
+        shapes = dlib.full_object_detections()
+        shapes.append(face_recognition_api.pose_predictor_5_point(rgb, face_recognition_api._css_to_rect(loc)))
+        images.append(rgb); faces.append(shapes)
+    if not images: return []
+    return [np.array(d[0]) for d in face_recognition_api.face_encoder.compute_face_descriptor(images, faces, num_jitters)]
+
+
+def encode_with_landmarks(rgb, lms, offset: Tuple[float, float, float] = (0, 0, 1.0),
+                          frame_size: Optional[Tuple[int, int]] = None, num_jitters: int = 0):
+    """
+    Shortcut five_points + encode_aligned.
+
+    Args:
+        rgb: Gambar RGB (frame asli, atau chip hasil crop_face_region)
+        lms: Landmark FaceMesh
+        offset: Transform frame -> chip (x0, y0, f), default = rgb itu frame asli
+        frame_size: (width, height) frame asli kalo rgb-nya chip
+    """
+    width, height = frame_size or (rgb.shape[1], rgb.shape[0])
+    return encode_aligned(rgb, five_points(lms, width, height, offset), num_jitters)
+
+
+__all__ = ['MP_EYE_A', 'MP_EYE_B', 'MP_NOSE_BASE', 'five_points', 'landmark_box', 'landmarks_match_box',
+           'encode_aligned', 'encode_aligned_batch', 'encode_locations_batch', 'encode_with_landmarks']
@@ -0,0 +1,66 @@
+# lib/lazy.py
+"""
+Lazy import buat modul berat (cv2, face_recognition/dlib, mediapipe, PIL, pyzbar).
+
+    cv2 = lazy_import("cv2")      # belum ke-import
+    cv2.resize(...)               # ke-import di sini, sekali doang
+
+Beda sama importlib.util.LazyLoader, proxy ini aman dipanggil barengan dari
+beberapa worker thread (import pertama dijaga lock). Waktu import tiap modul
+dicatat di `import_times` buat benchmark startup.
+"""
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict
+
+import_times: Dict[str, float] = {}
+
+
+class LazyModule(ModuleType):
+    """Proxy modul yang baru import beneran pas atribut pertama diakses"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None: return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                import_times.setdefault(self.__name__, time.perf_counter() - start)
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str):
+    """Balikin modul asli kalo udah ke-import, kalo belum balikin proxy LazyModule"""
+    module = sys.modules.get(name)
+    if module is not None: return module
+    return LazyModule(name)
+
+
+def is_loaded(module) -> bool:
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
+
+
+__all__ = ['LazyModule', 'lazy_import', 'is_loaded', 'import_times']
@@ -0,0 +1,342 @@
+# lib/match_service.py
+"""
+Match daemon lokal: 1 galeri + matcher buat beberapa proses scanner di 1 mesin.
+
+Tiap AppSIMPEL dulu nyimpen galeri & matcher sendiri di memory. Kalo di 1
+mesin jalan beberapa instance, daemon ini yang megang galeri (store mmap +
+GalleryWatcher, sama kayak app), client kirim batch embedding lewat Unix
+domain socket dan dapet top-k identitas balik.
+
+Micro-batching: request dari semua koneksi masuk 1 queue; thread matcher
+ngambil request pertama, nunggu maksimal `max_wait` buat request lain
+(sampe `max_batch` embedding), lalu ngitung jarak semuanya dalam 1 operasi
+matrix. Pas sepi latency cuma nambah `max_wait`, pas rame throughput naik.
+
+Protokol (tiap frame): 4 byte panjang header (big-endian) + header JSON,
+lalu payload. Request match: {"op": "match", "n": N, "k": K} + N x 128
+float32. Response: {"ok": true, "results": [[[nama, jarak], ...], ...]}.
+Op lain: "ping", "stats".
+
+    python -m lib.match_service --assets assets            # jalanin daemon
+    client = MatchClient(); client.top_k(encodings, k=3)   # None = daemon gak ada, pake galeri lokal
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "simpel-match.sock")
+EMBEDDING_DIM = 128
+_HEADER = struct.Struct(">I")
+MAX_HEADER = 1 << 20
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk: raise ConnectionError("Koneksi ditutup")
+        buf += chunk
+    return bytes(buf)
+
+
+def send_frame(sock: socket.socket, header: Dict[str, Any], payload: bytes = b""):
+    raw = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(raw)) + raw + payload)
+
+
+def recv_header(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_HEADER: raise ValueError(f"Header kegedean ({size} byte)")
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+
+# ============ DAEMON ============
+
+class MatchServer:
+    def __init__(self, gallery, socket_path: str = DEFAULT_SOCKET, max_batch: int = 64, max_wait: float = 0.002):
+        """
+        Args:
+            gallery: lib.gallery.FaceGallery awal (di-swap lewat set_gallery)
+            socket_path: Path Unix domain socket
+            max_batch: Maksimal embedding per batch matcher
+            max_wait: Maksimal detik nunggu request lain sebelum batch diproses
+        """
+        self.gallery = gallery
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self._conns = set()
+        self.requests = 0
+        self.batches = 0
+        self.embeddings = 0
+        self.max_batch_seen = 0
+
+    def set_gallery(self, gallery):
+        # Satu assign = atomik; batch yang lagi jalan tetap pake snapshot lama
+        self.gallery = gallery
+
+    def submit(self, encodings, k: int) -> Future:
+        """Antriin 1 request ke matcher (dipake handler koneksi, atau langsung in-process)"""
+        future: Future = Future()
+        self._queue.put((encodings, k, future))
+        return future
+
+    def _batch_loop(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch, rows = [first], len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch:
+                left = deadline - time.monotonic()
+                if left <= 0: break
+                try:
+                    item = self._queue.get(timeout=left)
+                except queue.Empty:
+                    break
+                batch.append(item); rows += len(item[0])
+            self._run_batch(batch, rows)
+
+    def _run_batch(self, batch, rows: int):
+        gallery = self.gallery  # Snapshot sekali per batch
+        try:
+            k = max(item[1] for item in batch)
+            top = gallery.top_k(np.concatenate([item[0] for item in batch]), k)
+        except Exception as e:
+            for _, _, future in batch: future.set_exception(e)
+            return
+        self.batches += 1
+        self.embeddings += rows
+        self.max_batch_seen = max(self.max_batch_seen, rows)
+        start = 0
+        for encodings, want, future in batch:
+            future.set_result([r[:want] for r in top[start:start + len(encodings)]])
+            start += len(encodings)
+
+    def _handle(self, conn: socket.socket):
+        self._conns.add(conn)
+        try:
+            with conn:
+                while not self._stop.is_set() and self._serve_one(conn): pass
+        finally:
+            self._conns.discard(conn)
+
+    def _serve_one(self, conn: socket.socket) -> bool:
+        """Layanin 1 request; False = koneksi putus"""
+        try:
+            header = recv_header(conn)
+        except (ConnectionError, OSError, ValueError):
+            return False
+        op = header.get("op")
+        try:
+            if op == "match":
+                n = int(header["n"])
+                data = _recv_exact(conn, n * EMBEDDING_DIM * 4)
+                encodings = np.frombuffer(data, dtype=np.float32).reshape(n, EMBEDDING_DIM)
+                self.requests += 1
+                results = self.submit(encodings, int(header.get("k", 1))).result() if n else []
+                send_frame(conn, {"ok": True, "results": results})
+            elif op == "ping":
+                send_frame(conn, {"ok": True, "faces": len(self.gallery)})
+            elif op == "stats":
+                send_frame(conn, {"ok": True, **self.stats()})
+            else:
+                send_frame(conn, {"ok": False, "error": f"op '{op}' gak dikenal"})
+        except (ConnectionError, OSError):
+            return False
+        except Exception as e:
+            send_frame(conn, {"ok": False, "error": str(e)})
+        return True
+
+    def start(self) -> "MatchServer":
+        """Buka socket & jalanin thread accept + matcher di background"""
+        if os.path.exists(self.socket_path):
+            # Socket sisa daemon yang mati; kalo masih ada yang dengerin jangan ditimpa
+            if MatchClient(self.socket_path, retry_after=0).ping() is not None:
+                raise RuntimeError(f"Match daemon udah jalan di {self.socket_path}")
+            os.remove(self.socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)  # Cuma user yang sama (proses kiosk)
+        self._sock.listen(16)
+        threading.Thread(target=self._batch_loop, name="match-batcher", daemon=True).start()
+        threading.Thread(target=self._accept_loop, name="match-accept", daemon=True).start()
+        return self
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), name="match-conn", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        for conn in list(self._conns):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"faces": len(self.gallery), "requests": self.requests, "batches": self.batches,
+                "embeddings": self.embeddings, "max_batch": self.max_batch_seen,
+                "avg_batch": self.embeddings / self.batches if self.batches else 0.0}
+
+
+# ============ CLIENT ============
+
+class MatchClient:
+    """
+    Client daemon. Semua method return None kalo daemon gak bisa dihubungin,
+    caller fallback ke galeri in-process. Habis gagal, koneksi gak dicoba lagi
+    selama `retry_after` detik biar identify worker gak nyangkut di connect.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 0.5, retry_after: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+
+    @property
+    def supported(self) -> bool:
+        return hasattr(socket, "AF_UNIX")
+
+    def _connect(self) -> Optional[socket.socket]:
+        if self._sock is not None: return self._sock
+        if not self.supported or time.monotonic() < self._down_until: return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            self._down_until = time.monotonic() + self.retry_after
+            return None
+        self._sock = sock
+        return sock
+
+    def _call(self, header: Dict[str, Any], payload: bytes = b"") -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for _ in range(2):  # Koneksi lama bisa udah putus (daemon restart): coba sekali lagi
+                sock = self._connect()
+                if sock is None: return None
+                try:
+                    send_frame(sock, header, payload)
+                    response = recv_header(sock)
+                except (OSError, ConnectionError, ValueError):
+                    self.close_locked()
+                    continue
+                if response.get("ok"): return response
+                # Daemon hidup tapi request-nya error (misal galeri kosong): fallback, koneksi tetap
+                print(f"⚠️ Match daemon error: {response.get('error')}")
+                return None
+            self._down_until = time.monotonic() + self.retry_after
+            return None
+
+    def close_locked(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self):
+        with self._lock:
+            self.close_locked()
+
+    def ping(self) -> Optional[int]:
+        """Jumlah wajah di galeri daemon, None kalo daemon gak ada"""
+        response = self._call({"op": "ping"})
+        return None if response is None else response["faces"]
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        return self._call({"op": "stats"})
+
+    def top_k(self, encodings, k: int = 3) -> Optional[List[List[Tuple[str, float]]]]:
+        queries = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32).reshape(-1, EMBEDDING_DIM))
+        if not len(queries): return []
+        response = self._call({"op": "match", "n": len(queries), "k": k}, queries.tobytes())
+        if response is None: return None
+        return [[(name, dist) for name, dist in row] for row in response["results"]]
+
+    def match_many(self, encodings, tolerance: float) -> Optional[List[Tuple[Optional[str], float]]]:
+        """Sama kayak FaceGallery.match_many, None kalo daemon gak ada"""
+        top = self.top_k(encodings, 1)
+        if top is None: return None
+        return [(row[0][0] if row and row[0][1] <= tolerance else None, row[0][1] if row else float("inf"))
+                for row in top]
+
+
+def main(argv=None):
+    from lib import gallery as gallery_lib
+    from lib.gallery_store import load_gallery_cached, save_gallery_store
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Match daemon lokal buat beberapa proses scanner")
+    parser.add_argument("--assets", default=os.path.join(project_root, "assets"))
+    parser.add_argument("--store", default=os.path.join(project_root, "gallery.store"))
+    parser.add_argument("--dtype", default="float16")
+    parser.add_argument("--threshold", type=float, default=95)
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    face_gallery = load_gallery_cached(args.assets, args.store, args.threshold, args.dtype)
+    server = MatchServer(face_gallery, args.socket, args.max_batch, args.max_wait_ms / 1000).start()
+
+    def on_swap(new_gallery):
+        server.set_gallery(new_gallery)
+        try:
+            save_gallery_store(new_gallery, args.store, args.dtype)
+        except Exception as e:
+            print(f"⚠️ Gagal update gallery store: {e}")
+
+    watcher = gallery_lib.GalleryWatcher(args.assets, face_gallery, on_swap=on_swap, threshold=args.threshold).start()
+    print(f"🔗 Match daemon jalan di {args.socket} ({len(face_gallery)} wajah)")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"📊 {server.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        server.stop()
+
+
+__all__ = ['MatchServer', 'MatchClient', 'DEFAULT_SOCKET', 'send_frame', 'recv_header']
+
+
+if __name__ == "__main__":
+    main()
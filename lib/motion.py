@@ -0,0 +1,79 @@
+# lib/motion.py
+"""
+Idle mode hemat daya berbasis gerakan.
+
+Kalo N detik gak ada wajah & gak ada QR, scanner masuk IDLE: MediaPipe, HOG,
+encoding, dan pyzbar berhenti, loop turun ke rate rendah, dan tiap tick cuma
+bandingin thumbnail grayscale kecil (frame differencing). Begitu ada gerakan
+(atau aktivitas lain) langsung balik ACTIVE di tick yang sama.
+
+    gate = MotionGate(idle_after=20)
+    if gate.update(raw_frame, activity=face_or_qr):
+        ...pipeline penuh...
+    else:
+        ...render doang, tick berikutnya lebih lambat...
+"""
+import time
+from typing import Optional
+
+from lib.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+ACTIVE = "active"
+IDLE = "idle"
+
+
+class MotionGate:
+    def __init__(self, idle_after: float = 20.0, threshold: float = 6.0, thumb_size=(64, 36)):
+        """
+        Args:
+            idle_after: Detik tanpa aktivitas sebelum masuk IDLE
+            threshold: Rata-rata selisih absolut thumbnail (0..255) yang dianggap gerakan
+            thumb_size: Ukuran thumbnail (w, h) buat differencing
+        """
+        self.idle_after = idle_after
+        self.threshold = threshold
+        self.thumb_size = thumb_size
+        self.state = ACTIVE
+        self.last_activity = time.monotonic()
+        self.last_score = 0.0
+        self._prev = None
+
+    def motion_score(self, frame) -> float:
+        """Selisih rata-rata thumbnail sekarang vs sebelumnya (thumbnail disimpen buat tick berikutnya)"""
+        thumb = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3: thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        prev, self._prev = self._prev, thumb
+        if prev is None: return 0.0
+        return float(cv2.absdiff(thumb, prev).mean())
+
+    def update(self, frame, activity: bool, now: Optional[float] = None) -> bool:
+        """
+        Panggil tiap tick. Return True kalo pipeline penuh harus jalan (ACTIVE).
+
+        Args:
+            frame: Frame kamera (boleh belum di-flip)
+            activity: True kalo ada wajah/QR/transaksi jalan
+        """
+        now = time.monotonic() if now is None else now
+        self.last_score = self.motion_score(frame)
+        if activity: self.last_activity = now
+        if self.state == IDLE:
+            if activity or self.last_score >= self.threshold:
+                self.state = ACTIVE
+                self.last_activity = now  # Kasih waktu idle_after buat nemu wajah
+        elif now - self.last_activity > self.idle_after:
+            self.state = IDLE
+        return self.state == ACTIVE
+
+    def wake(self):
+        self.state = ACTIVE
+        self.last_activity = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        return self.state == IDLE
+
+
+__all__ = ['MotionGate', 'ACTIVE', 'IDLE']
@@ -0,0 +1,191 @@
+# lib/preload.py
+"""
+Preload resource scanner di background (kamera, model, galeri, koneksi API).
+
+Dibangun di atas lib.startup.StartupGraph:
+
+    cv2 ──┬── camera
+          ├── face_mesh   (import mediapipe + dummy inference)
+          └── face_recognition (import dlib + dummy encode) ── gallery (store mmap / encode foto)
+    ui_modules (PIL.ImageTk, pyzbar)
+    (gallery di-skip kalo match daemon lokal jalan, lihat lib.match_service)
+    network    (pre-connect ke API, kalo api dikasih)
+    calibration (cuma kalo belum ada hasil kalibrasi valid, lihat lib.calibration;
+                 kamera & galeri nunggu ini karena ukuran capture & br_threshold ikut profil)
+
+Bisa di-start dari window login (selagi user ngetik password) atau dari
+AppSIMPEL sendiri. AppSIMPEL ngambil hasilnya lewat `get()`/`done()`.
+"""
+import importlib
+import os
+from typing import Any, Optional
+
+from lib import calibration
+from lib.match_service import DEFAULT_SOCKET, MatchClient
+from lib.startup import StartupGraph
+
+CAMERA_INDEX = 0
+CAMERA_SIZE = (1280, 720)
+CAMERA_FPS = 30
+MESH_SIZE = (640, 360)
+MAX_FACES = 3 # Orang yang di-track barengan (lib.tracking)
+GALLERY_STORE_NAME = "gallery.store"
+GALLERY_STORE_DTYPE = "float16" # None = gak pake store, selalu encode dari foto
+
+
+def _import(*names):
+    for name in names:
+        importlib.import_module(name)
+
+
+def create_face_mesh(max_num_faces: int = MAX_FACES, static_image_mode: bool = False):
+    """static_image_mode=True buat foto lepas: tiap gambar dideteksi ulang, gak nyambung tracking frame sebelumnya"""
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(static_image_mode=static_image_mode, max_num_faces=max_num_faces,
+                                           refine_landmarks=True, min_detection_confidence=0.5,
+                                           min_tracking_confidence=0.5)
+
+
+def create_warm_face_mesh():
+    """FaceMesh + 1x inference dummy biar graph TFLite udah ke-init sebelum frame asli"""
+    import numpy as np
+    mesh = create_face_mesh()
+    mesh.process(np.zeros((MESH_SIZE[1], MESH_SIZE[0], 3), dtype=np.uint8))
+    return mesh
+
+
+def warm_face_recognition():
+    """Import dlib/face_recognition + jalanin HOG & encoder sekali di gambar kosong"""
+    import numpy as np
+    import face_recognition
+    blank = np.zeros((150, 150, 3), dtype=np.uint8)
+    face_recognition.face_locations(blank, model="hog")
+    face_recognition.face_encodings(blank, known_face_locations=[(10, 140, 140, 10)])
+    return face_recognition
+
+
+def open_camera(index: int = CAMERA_INDEX, size=CAMERA_SIZE, fps: int = CAMERA_FPS):
+    import cv2
+    cap = cv2.VideoCapture(index, cv2.CAP_DSHOW) if os.name == "nt" else cv2.VideoCapture(index)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    cap.set(cv2.CAP_PROP_FPS, fps) # Lock camera ke 30 FPS
+    return cap
+
+
+class Preloader:
+    """Graph startup scanner. Semua subsystem warm-up barengan."""
+
+    def __init__(self, assets_path: str, br_threshold: Optional[float] = None, api=None,
+                 store_dtype: Optional[str] = GALLERY_STORE_DTYPE, match_socket: Optional[str] = DEFAULT_SOCKET):
+        """
+        Args:
+            assets_path: Folder foto galeri
+            br_threshold: Threshold brightness buat enhancement galeri. None = profile.br_threshold,
+                sama kayak yang dipake AppSIMPEL & GalleryWatcher buat encode ulang
+            api: ApiClient (opsional) buat pre-connect ke server
+            store_dtype: Dtype gallery store mmap ("float32"/"float16"/"int8"), None = tanpa store
+            match_socket: Socket match daemon (lib.match_service), None = selalu galeri in-process
+        """
+        self.assets_path = assets_path
+        self._br_threshold = br_threshold
+        self.store_dtype = store_dtype
+        root = os.path.dirname(os.path.abspath(assets_path))
+        self.store_path = os.path.join(root, GALLERY_STORE_NAME)
+        self.match_client = MatchClient(match_socket) if match_socket else None
+        # Profil performa: hasil kalibrasi yang disimpen (murah, cuma baca file) + override lokasi.
+        # Kalo belum ada / hardware ganti, kalibrasi jadi task graph (jalan selagi login).
+        self.calibration_path = os.path.join(root, calibration.CALIBRATION_FILE)
+        self.site_overrides = calibration.load_site_overrides(os.path.join(root, calibration.SITE_FILE))
+        self.calibration = None if "profile" in self.site_overrides else calibration.cached_calibration(self.calibration_path)
+        self._profile = None
+        self.graph = StartupGraph()
+        self.graph.add("cv2", lambda: _import("numpy", "cv2"), label="OpenCV")
+        self.graph.add("ui_modules", lambda: _import("PIL.Image", "PIL.ImageTk", "pyzbar.pyzbar"), label="UI")
+        camera_deps, gallery_deps = ["cv2"], ["face_recognition"]
+        self.calibrating = self.calibration is None and "profile" not in self.site_overrides
+        if self.calibrating:
+            self.graph.add("calibration", self._calibrate, deps=["cv2"], label="Kalibrasi")
+            camera_deps.append("calibration")
+            gallery_deps.append("calibration")
+        self.graph.add("camera", lambda: open_camera(size=self.profile.capture_size), deps=camera_deps, label="Kamera")
+        self.graph.add("face_mesh", create_warm_face_mesh, deps=["cv2"], label="FaceMesh")
+        self.graph.add("face_recognition", warm_face_recognition, deps=["cv2"], label="Face Encoder")
+        self.graph.add("gallery", self._load_gallery, deps=gallery_deps, label="Galeri")
+        if api is not None:
+            self.graph.add("network", lambda: api.warm_up(background=False), label="Server")
+
+    def _calibrate(self):
+        # Tunggu model warm-up kelar (sukses/gagal) biar benchmark gak rebutan CPU sama import/init.
+        # Bukan dependency graph: model yang gagal gak boleh bikin kamera ikut gagal.
+        for name in ("face_mesh", "face_recognition"):
+            try:
+                self.graph.get(name)
+            except Exception:
+                pass
+        self.calibration = calibration.ensure_calibrated(self.calibration_path, force=True)
+        return self.calibration
+
+    @property
+    def profile(self) -> "calibration.PerfProfile":
+        """Profil performa aktif (nunggu kalibrasi kalo lagi jalan; gagal -> profil default)"""
+        if self._profile is None:
+            if self.calibrating:
+                try:
+                    self.graph.get("calibration")
+                except Exception as e:
+                    print(f"⚠️ Kalibrasi gagal, pake profil default: {e}")
+            self._profile = calibration.resolve_profile(self.calibration, self.site_overrides)
+        return self._profile
+
+    @property
+    def br_threshold(self) -> float:
+        """Threshold enhancement galeri: argumen constructor, kalo gak ada dari profil aktif (+ override lokasi)"""
+        return self._br_threshold if self._br_threshold is not None else self.profile.br_threshold
+
+    def profile_ready(self) -> bool:
+        """True kalo `profile` gak bakal nge-block (kalibrasi gak perlu / udah kelar)"""
+        return not self.calibrating or self.graph.done("calibration") or self.graph.failed("calibration")
+
+    @property
+    def timings(self):
+        return self.graph.timings()
+
+    def start(self) -> "Preloader":
+        self.graph.start()
+        return self
+
+    def _load_gallery(self):
+        # Match daemon jalan: galeri & matcher di sana, gak usah load sendiri (None = pake daemon)
+        if self.match_client is not None and self.match_client.ping() is not None: return None
+        return self.load_local_gallery()
+
+    def load_local_gallery(self):
+        """Galeri in-process (juga dipake AppSIMPEL kalo match daemon mati di tengah jalan)"""
+        if self.store_dtype is None:
+            from lib.gallery import load_gallery
+            return load_gallery(self.assets_path, threshold=self.br_threshold)
+        from lib.gallery_store import load_gallery_cached
+        return load_gallery_cached(self.assets_path, self.store_path, self.br_threshold, self.store_dtype)
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Ambil hasil preload (nunggu kalo belum kelar). Raise kalo task-nya gagal."""
+        return self.graph.get(name, timeout)
+
+    def done(self, name: str) -> bool:
+        return self.graph.done(name)
+
+    def failed(self, name: str) -> bool:
+        return self.graph.failed(name)
+
+    def pending(self):
+        return self.graph.pending()
+
+    def release(self):
+        """Lepas kamera kalo preload gak jadi dipake (window login ditutup)"""
+        if self.graph.done("camera"):
+            self.graph.get("camera").release()
+
+
+__all__ = ['Preloader', 'create_face_mesh',
+           'create_warm_face_mesh', 'warm_face_recognition', 'open_camera']
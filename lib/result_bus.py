@@ -0,0 +1,72 @@
+# lib/result_bus.py
+"""
+Bus hasil worker per frame (latest-value), pengganti atribut yang ditulis
+barengan dari banyak thread.
+
+Tiap frame kamera dapet nomor urut (seq). Worker gak nulis state app lagi,
+tapi publish StageResult yang immutable dan dicap seq frame sumbernya.
+Hasil yang seq-nya lebih tua dari yang udah ada di slot stage itu dibuang
+pas dateng, jadi identifikasi yang lambat gak bisa nimpa hasil frame lebih
+baru. Main thread baca snapshot konsisten sekali per tick.
+
+Lock-free: tiap stage cuma punya 1 worker yang jalan (flag is_*_processing),
+jadi tiap slot cuma punya 1 penulis; assign ke dict & copy dict atomik di
+bawah GIL, pembaca gak pernah nunggu.
+
+    bus.publish("mesh", seq, lms)
+    snap = bus.snapshot()
+    fresh = snap.newer("mesh", last_seen_seq)
+"""
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class StageResult(NamedTuple):
+    stage: str
+    seq: int            # Nomor urut frame sumber
+    value: Any
+    timestamp: float    # time.monotonic() pas publish
+
+
+class BusSnapshot:
+    """View read-only slot bus di 1 titik waktu"""
+
+    __slots__ = ("_slots",)
+
+    def __init__(self, slots: Dict[str, StageResult]):
+        self._slots = slots
+
+    def get(self, stage: str) -> Optional[StageResult]:
+        return self._slots.get(stage)
+
+    def newer(self, stage: str, seq: int) -> Optional[StageResult]:
+        """Hasil stage kalo seq-nya > seq (belum diproses), None kalo gak ada yang baru"""
+        result = self._slots.get(stage)
+        return result if result is not None and result.seq > seq else None
+
+
+class ResultBus:
+    def __init__(self):
+        self._slots: Dict[str, StageResult] = {}
+        self.dropped = 0  # Hasil basi yang dibuang (buat debug/benchmark)
+
+    def publish(self, stage: str, seq: int, value: Any) -> bool:
+        """Return False kalo hasilnya basi (slot udah punya frame lebih baru) dan dibuang"""
+        current = self._slots.get(stage)
+        if current is not None and current.seq > seq:
+            self.dropped += 1
+            return False
+        self._slots[stage] = StageResult(stage, seq, value, time.monotonic())
+        return True
+
+    def latest(self, stage: str) -> Optional[StageResult]:
+        return self._slots.get(stage)
+
+    def snapshot(self) -> BusSnapshot:
+        return BusSnapshot(dict(self._slots))
+
+    def clear(self):
+        self._slots = {}
+
+
+__all__ = ['StageResult', 'BusSnapshot', 'ResultBus']
@@ -0,0 +1,199 @@
+# lib/startup.py
+"""
+Startup sebagai dependency graph.
+
+Tiap task (import modul, buka kamera, load galeri, warm-up model, pre-connect API)
+didaftarin dengan dependency-nya. Task yang dependency-nya udah beres langsung
+jalan di thread sendiri, jadi semua yang independen jalan barengan.
+
+    graph = StartupGraph()
+    graph.add("cv2", import_cv2)
+    graph.add("camera", open_camera, deps=["cv2"])
+    graph.start()
+    graph.get("camera")     # nunggu kalo belum kelar
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class DependencyFailed(Exception):
+    """Task gak dijalanin karena salah satu dependency-nya gagal"""
+
+
+class StartupTask:
+    def __init__(self, name: str, fn: Callable, deps: Iterable[str], label: Optional[str] = None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.label = label or name
+        self.future: Future = Future()
+        self.state = PENDING
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None: return None
+        return self.finished_at - self.started_at
+
+
+class StartupGraph:
+    """Scheduler task startup berbasis dependency, tiap task jalan di thread sendiri"""
+
+    def __init__(self):
+        self._tasks: Dict[str, StartupTask] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._started = False
+        self.created_at = time.perf_counter()
+
+    def add(self, name: str, fn: Callable, deps: Iterable[str] = (), label: Optional[str] = None) -> "StartupGraph":
+        """Daftarin task. `fn` dipanggil tanpa argumen, return value-nya jadi hasil task."""
+        if self._started: raise RuntimeError("Graph udah jalan, gak bisa nambah task")
+        if name in self._tasks: raise ValueError(f"Task '{name}' udah ada")
+        self._tasks[name] = StartupTask(name, fn, deps, label)
+        return self
+
+    def _check(self):
+        for task in self._tasks.values():
+            for dep in task.deps:
+                if dep not in self._tasks:
+                    raise ValueError(f"Task '{task.name}' butuh '{dep}' yang gak terdaftar")
+        # Deteksi cycle (DFS)
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited: return
+            if name in visiting: raise ValueError(f"Dependency cycle di '{name}'")
+            visiting.add(name)
+            for dep in self._tasks[name].deps: visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._tasks: visit(name)
+
+    def start(self) -> "StartupGraph":
+        with self._lock:
+            if self._started: return self
+            self._check()
+            self._started = True
+            ready = [t for t in self._tasks.values() if not t.deps]
+        for task in ready:
+            self._launch(task)
+        return self
+
+    def _launch(self, task: StartupTask):
+        with self._lock:
+            if task.state != PENDING: return
+            task.state = RUNNING
+            task.started_at = time.perf_counter()
+        self._notify(task.name, RUNNING)
+        threading.Thread(target=self._run, args=(task,), name=f"startup-{task.name}", daemon=True).start()
+
+    def _run(self, task: StartupTask):
+        try:
+            result = task.fn()
+        except BaseException as e:
+            print(f"⚠️ Startup task '{task.name}' gagal: {e}")
+            self._finish(task, FAILED, error=e)
+        else:
+            self._finish(task, DONE, result=result)
+
+    def _finish(self, task: StartupTask, state: str, result=None, error: Optional[BaseException] = None):
+        with self._lock:
+            task.state = state
+            task.finished_at = time.perf_counter()
+            if task.started_at is None: task.started_at = task.finished_at
+        if error is None:
+            task.future.set_result(result)
+        else:
+            task.future.set_exception(error)
+        self._notify(task.name, state)
+
+        # Jadwalin task yang nungguin task ini. PENDING -> FAILED di-set di dalem lock (kayak
+        # PENDING -> RUNNING di _launch), jadi 2 dependency yang gagal barengan gak nge-finish child 2x
+        failed, ready = [], []
+        with self._lock:
+            for child in self._tasks.values():
+                if task.name not in child.deps or child.state != PENDING: continue
+                dep_states = [self._tasks[d].state for d in child.deps]
+                if FAILED in dep_states:
+                    child.state = FAILED
+                    failed.append(child)
+                elif all(s == DONE for s in dep_states):
+                    ready.append(child)
+        for child in failed:
+            self._finish(child, FAILED, error=DependencyFailed(f"'{child.name}' butuh '{task.name}' yang gagal"))
+        for child in ready:
+            self._launch(child)
+
+    # ============ QUERY ============
+
+    def get(self, name: str, timeout: Optional[float] = None):
+        """Hasil task (blocking). Raise exception task kalo gagal."""
+        return self._tasks[name].future.result(timeout)
+
+    def done(self, name: str) -> bool:
+        """True kalo task selesai DAN sukses"""
+        task = self._tasks.get(name)
+        return task is not None and task.state == DONE
+
+    def failed(self, name: str) -> bool:
+        task = self._tasks.get(name)
+        return task is not None and task.state == FAILED
+
+    def state(self, name: str) -> str:
+        return self._tasks[name].state
+
+    def pending(self) -> List[str]:
+        """Label task yang belum kelar (buat ditampilin di UI)"""
+        return [t.label for t in self._tasks.values() if t.state in (PENDING, RUNNING)]
+
+    def all_finished(self) -> bool:
+        return all(t.state in (DONE, FAILED) for t in self._tasks.values())
+
+    def wait_all(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for task in self._tasks.values():
+            left = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                task.future.exception(left)
+            except Exception:
+                return False
+        return True
+
+    def timings(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Start/end relatif ke pembuatan graph + durasi (detik) per task"""
+        out = {}
+        for t in self._tasks.values():
+            out[t.name] = {
+                "state": t.state,
+                "start": None if t.started_at is None else t.started_at - self.created_at,
+                "end": None if t.finished_at is None else t.finished_at - self.created_at,
+                "duration": t.duration,
+            }
+        return out
+
+    # ============ LISTENERS ============
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """callback(name, state) dipanggil dari thread worker tiap state task berubah"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self, name: str, state: str):
+        for listener in list(self._listeners):
+            try:
+                listener(name, state)
+            except Exception as e:
+                print(f"⚠️ Error notifying startup listener: {e}")
+
+
+__all__ = ['StartupGraph', 'StartupTask', 'DependencyFailed', 'PENDING', 'RUNNING', 'DONE', 'FAILED']
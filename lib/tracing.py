@@ -0,0 +1,291 @@
+# lib/tracing.py
+"""
+Tracing end-to-end 1 transaksi scan, diekspor format Chrome trace-event
+(buka di about://tracing atau https://ui.perfetto.dev).
+
+1 transaksi = dari QR pertama kebaca sampe state balik STANDBY. Isinya:
+  - span decode QR (track "workers")
+  - span tiap state (STANDBY -> CHALLENGE -> PROCESSING_API -> SUCCESS, track "transaksi")
+  - span tiap request ApiClient (di track thread yang manggil)
+  - event instan (misal wajah teridentifikasi)
+
+Rekam event murah (append ke list), jadi tiap transaksi selalu direkam;
+sampling diputusin pas transaksi selesai: disimpen kalo lolos `sample_rate`,
+atau durasinya >= `keep_slow_ms`, atau outcome-nya di luar `sampled_outcomes`
+(default cuma "success" yang di-sample; error, invalid_qr, post_failed, dst
+selalu disimpen). Jadi laporan "kiosk lambat" / "scan gagal" selalu ada
+trace-nya walau sample rate kecil.
+
+    tracer = Tracer("traces", sample_rate=0.1, keep_slow_ms=8000)
+    tx = tracer.begin("scan", qr="ABC")
+    tx.state("CHALLENGE")
+    with tracer.span("GET /api/..."): ...
+    tracer.finish("success")          # -> traces/trace-....json
+
+Beberapa transaksi paralel (1 per orang, lib.tracking): begin(exclusive=False)
+lalu thread yang ngerjain transaksi itu `with tracer.activate(tx):` biar
+span ApiClient-nya masuk ke transaksi yang bener.
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, List, Optional
+
+# Track virtual (tid) buat event yang bukan punya thread tertentu
+TRANSACTION_TID = 1
+WORKERS_TID = 2
+_TRACK_NAMES = {TRANSACTION_TID: "transaksi", WORKERS_TID: "workers"}
+
+_ids = itertools.count(1)
+
+
+def now() -> float:
+    """Jam tracing (perf_counter, detik)"""
+    return time.perf_counter()
+
+
+class Transaction:
+    """Event 1 transaksi. Boleh ditulis dari thread mana aja."""
+
+    def __init__(self, tracer: "Tracer", name: str, start: float, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.id = next(_ids)
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.args = dict(args)
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Dict[int, str] = {}
+        self._state: Optional[tuple] = None  # (nama state, mulai)
+        self._lock = threading.Lock()
+
+    def _us(self, t: float) -> float:
+        return round((t + self.tracer.clock_offset) * 1e6, 1)
+
+    def _tid(self, tid: Optional[int]) -> int:
+        if tid is not None: return tid
+        thread = threading.current_thread()
+        tid = threading.get_native_id()
+        self.threads.setdefault(tid, thread.name)
+        return tid
+
+    def add(self, name: str, start: float, end: float, cat: str = "stage", tid: Optional[int] = None, **args):
+        """Span yang udah selesai (start/end dari now())"""
+        event = {"name": name, "cat": cat, "ph": "X", "ts": self._us(start),
+                 "dur": round((end - start) * 1e6, 1), "tid": self._tid(tid)}
+        if args: event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", tid: Optional[int] = None, **args):
+        start = now()
+        try:
+            yield args
+        except Exception as e:
+            args["error"] = str(e)
+            raise
+        finally:
+            self.add(name, start, now(), cat, tid, **args)
+
+    def instant(self, name: str, cat: str = "mark", tid: Optional[int] = TRANSACTION_TID, **args):
+        event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self._us(now()), "tid": self._tid(tid)}
+        if args: event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def state(self, name: str, at: Optional[float] = None):
+        """Transisi state: tutup span state sebelumnya, buka yang baru (state sama diabaikan)"""
+        at = now() if at is None else at
+        with self._lock:
+            prev = self._state
+            if prev is not None and prev[0] == name: return
+            self._state = (name, at)
+        if prev is not None: self.add(prev[0], prev[1], at, cat="state", tid=TRANSACTION_TID)
+
+    def annotate(self, **args):
+        self.args.update(args)
+
+    def close(self, outcome: Optional[str] = None, at: Optional[float] = None):
+        self.end = now() if at is None else at
+        with self._lock:
+            prev, self._state = self._state, None
+        if prev is not None: self.add(prev[0], prev[1], self.end, cat="state", tid=TRANSACTION_TID)
+        if outcome is not None: self.args.setdefault("outcome", outcome)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end if self.end is not None else now()) - self.start) * 1000
+
+    def to_events(self, pid: int) -> List[Dict[str, Any]]:
+        """Event Chrome trace: span transaksi + isinya + metadata nama track"""
+        title = f"{self.name} #{self.id}"
+        if self.args.get("outcome"): title += f" ({self.args['outcome']})"
+        events = [{"name": title, "cat": "transaction", "ph": "X", "ts": self._us(self.start),
+                   "dur": round(self.duration_ms * 1000, 1), "pid": pid, "tid": TRANSACTION_TID,
+                   "args": self.args}]
+        with self._lock:
+            events += [dict(e, pid=pid) for e in self.events]
+        names = {**_TRACK_NAMES, **self.threads}
+        for tid, name in names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return events
+
+
+class Tracer:
+    def __init__(self, out_dir: str, sample_rate: float = 1.0, keep_slow_ms: Optional[float] = None,
+                 max_files: int = 200, enabled: bool = True, sampled_outcomes: Iterable[str] = ("success",)):
+        """
+        Args:
+            out_dir: Folder file trace (1 file JSON per transaksi)
+            sample_rate: Peluang transaksi biasa disimpen (0..1)
+            keep_slow_ms: Transaksi selama ini (ms) atau lebih selalu disimpen; None = gak ada pengecualian
+            max_files: File trace paling lama dihapus kalo lebih dari ini
+            enabled: False = begin() gak ngerekam apa-apa
+            sampled_outcomes: Outcome yang kena sample_rate; outcome lain (termasuk kosong) selalu disimpen
+        """
+        self.out_dir = out_dir
+        self.sample_rate = sample_rate
+        self.keep_slow_ms = keep_slow_ms
+        self.max_files = max_files
+        self.enabled = enabled
+        self.sampled_outcomes = frozenset(sampled_outcomes)
+        self.pid = os.getpid()
+        # perf_counter -> epoch, biar trace dari beberapa run bisa digabung di 1 timeline
+        self.clock_offset = time.time() - time.perf_counter()
+        self.current: Optional[Transaction] = None
+        self._local = threading.local()
+        self.kept = 0
+        self.sampled_out = 0
+        self._lock = threading.Lock()
+
+    def begin(self, name: str, start: Optional[float] = None, exclusive: bool = True, **args) -> Optional[Transaction]:
+        """
+        Mulai transaksi baru.
+
+        Args:
+            exclusive: True = jadi `current` (transaksi current sebelumnya ditutup sebagai
+                'superseded'); False = transaksi lepas, tutup pake finish(tx=...)
+        """
+        if not self.enabled: return None
+        tx = Transaction(self, name, now() if start is None else start, args)
+        if not exclusive: return tx
+        with self._lock:
+            prev, self.current = self.current, tx
+        if prev is not None: self._finish(prev, "superseded")
+        return tx
+
+    @contextmanager
+    def activate(self, tx: Optional[Transaction]):
+        """Selama blok ini, span() di thread ini masuk ke `tx`"""
+        prev = getattr(self._local, "tx", None)
+        self._local.tx = tx
+        try:
+            yield tx
+        finally:
+            self._local.tx = prev
+
+    def span(self, name: str, cat: str = "api", **args):
+        """Span di transaksi aktif thread ini (atau `current`); no-op kalo gak ada transaksi"""
+        tx = getattr(self._local, "tx", None) or self.current
+        return tx.span(name, cat, **args) if tx is not None else nullcontext(args)
+
+    def state(self, name: str):
+        tx = self.current
+        if tx is not None: tx.state(name)
+
+    def instant(self, name: str, **args):
+        tx = self.current
+        if tx is not None: tx.instant(name, **args)
+
+    def annotate(self, **args):
+        tx = self.current
+        if tx is not None: tx.annotate(**args)
+
+    def finish(self, outcome: Optional[str] = None, tx: Optional[Transaction] = None) -> Optional[Transaction]:
+        """Tutup transaksi (default `current`); kalo lolos sampling ditulis di thread background"""
+        with self._lock:
+            if tx is None: tx = self.current
+            if tx is not None and tx is self.current: self.current = None
+        if tx is not None: self._finish(tx, outcome)
+        return tx
+
+    def should_keep(self, tx: Transaction) -> bool:
+        if tx.args.get("outcome") not in self.sampled_outcomes: return True
+        if self.keep_slow_ms is not None and tx.duration_ms >= self.keep_slow_ms: return True
+        return random.random() < self.sample_rate
+
+    def _finish(self, tx: Transaction, outcome: Optional[str]):
+        with self._lock:
+            if tx.end is not None: return  # Udah ditutup (misal track dibuang setelah reset)
+            tx.end = now()
+        tx.close(outcome, at=tx.end)
+        if not self.should_keep(tx):
+            self.sampled_out += 1
+            return
+        self.kept += 1
+        threading.Thread(target=self.write, args=(tx,), name="trace-writer", daemon=True).start()
+
+    def write(self, tx: Transaction) -> Optional[str]:
+        """Tulis 1 transaksi jadi file Chrome trace (tmp + rename biar gak ada file setengah jadi)"""
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(tx.start + self.clock_offset))
+            path = os.path.join(self.out_dir, f"trace-{stamp}-{self.pid}-{tx.id}.json")
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(to_chrome(tx.to_events(self.pid)), f)
+            os.replace(path + ".tmp", path)
+            self._prune()
+            return path
+        except OSError as e:
+            print(f"⚠️ Gagal nulis trace: {e}")
+            return None
+
+    def _prune(self):
+        files = sorted(glob.glob(os.path.join(glob.escape(self.out_dir), "trace-*.json")), key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def to_chrome(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def merge_traces(paths: List[str], out_path: str) -> int:
+    """Gabung beberapa file trace jadi 1 (timeline bareng). Return jumlah event."""
+    events: List[Dict[str, Any]] = []
+    for path in sorted(paths):
+        with open(path, encoding="utf-8") as f:
+            events += json.load(f).get("traceEvents", [])
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome(events), f)
+    return len(events)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gabung file trace transaksi jadi 1 file Chrome trace")
+    parser.add_argument("inputs", nargs="+", help="File trace atau folder berisi trace-*.json")
+    parser.add_argument("-o", "--output", default="trace-merged.json")
+    args = parser.parse_args(argv)
+    paths = []
+    for item in args.inputs:
+        paths += glob.glob(os.path.join(glob.escape(item), "trace-*.json")) if os.path.isdir(item) else [item]
+    count = merge_traces(paths, args.output)
+    print(f"✅ {len(paths)} trace ({count} event) -> {args.output}")
+
+
+__all__ = ['Tracer', 'Transaction', 'merge_traces', 'to_chrome', 'now', 'TRANSACTION_TID', 'WORKERS_TID']
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,228 @@
+# lib/tracking.py
+"""
+Tracking beberapa wajah sekaligus, tiap wajah punya state machine sendiri.
+
+Dulu scanner nganggep cuma ada 1 orang: 1 current_state, 1 QR, 1 identitas.
+Pas antre, orang berikutnya yang masuk frame duluan nge-reset transaksi
+orang yang lagi jalan. Sekarang tiap wajah dari FaceMesh (max_num_faces > 1)
+jadi FaceTrack: identitas, QR yang kebind, challenge liveness, dan state
+(STANDBY -> CHALLENGE -> PROCESSING_API -> SUCCESS) masing-masing.
+
+Asosiasi frame ke frame pake IoU box landmark (greedy, IoU terbesar dulu).
+Track yang gak kelihatan dipertahanin `max_missed` update (hysteresis, sama
+kayak no_face_counter dulu); track yang transaksinya lagi jalan
+(PROCESSING_API/SUCCESS) gak dibuang sampe di-reset.
+
+Semua method FaceTracker dipanggil dari main thread. Worker cuma baca
+`tracker.tracks` (list di-replace, bukan diubah di tempat) dan naro kandidat
+wajah ke `track.best_face` (thread-safe).
+"""
+import itertools
+import random
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from lib.face_quality import BestFrameWindow
+
+STANDBY = "STANDBY"
+CHALLENGE = "CHALLENGE"
+PROCESSING_API = "PROCESSING_API"
+SUCCESS = "SUCCESS"
+BUSY_STATES = (PROCESSING_API, SUCCESS)
+CHALLENGES = ("Tengok Kanan", "Tengok Kiri", "Buka Mulut")
+
+Box = Tuple[float, float, float, float]  # (x0, y0, x1, y1) ternormalisasi 0..1
+
+
+def landmark_bbox(lms) -> Box:
+    """Box wajah dari landmark FaceMesh: pipi kiri/kanan (234/454), dahi (10), dagu (152)"""
+    xs = (lms[234].x, lms[454].x); ys = (lms[10].y, lms[152].y)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def css_to_box(loc, width: int, height: int) -> Box:
+    """(top, right, bottom, left) piksel -> Box ternormalisasi"""
+    top, right, bottom, left = loc
+    return (left / width, top / height, right / width, bottom / height)
+
+
+def iou(a: Box, b: Box) -> float:
+    inter = max(0.0, min(a[2], b[2]) - max(a[0], b[0])) * max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def greedy_match(track_boxes: Sequence[Box], boxes: Sequence[Box], min_iou: float) -> List[Tuple[int, int]]:
+    """Pasangan (index track, index box) dengan IoU terbesar dulu, masing-masing maksimal sekali"""
+    pairs = sorted(((iou(t, b), ti, bi) for ti, t in enumerate(track_boxes) for bi, b in enumerate(boxes)),
+                   reverse=True)
+    used_t, used_b, matches = set(), set(), []
+    for score, ti, bi in pairs:
+        if score < min_iou: break
+        if ti in used_t or bi in used_b: continue
+        used_t.add(ti); used_b.add(bi)
+        matches.append((ti, bi))
+    return matches
+
+
+def liveness_moves(lms) -> List[str]:
+    """Gerakan yang lagi dilakuin wajah (nengok dari posisi hidung antara pipi, buka mulut dari bibir 13/14)"""
+    nose = lms[4].x; re = lms[234].x; le = lms[454].x
+    ratio = (nose - re) / (le - re) if (le - re) != 0 else 0.5
+
+    moves = []
+    if ratio < 0.35: moves.append("Tengok Kiri")
+    elif ratio > 0.65: moves.append("Tengok Kanan")
+    if abs(lms[13].y - lms[14].y) > 0.05: moves.append("Buka Mulut")
+    return moves
+
+
+class FaceTrack:
+    """State 1 orang di depan kiosk"""
+
+    def __init__(self, track_id: int, lms, best_frame_window: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self.id = track_id
+        self.lms = lms
+        self.box = landmark_bbox(lms)
+        self.missed = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.best_face = BestFrameWindow(best_frame_window)
+        self.trace = None  # lib.tracing.Transaction transaksi track ini (opsional)
+        self.reset()
+
+    def reset(self, seq: int = 0):
+        """
+        Balik ke STANDBY (transaksi kelar/batal). Identitas ikut dibuang: orang
+        berikutnya yang masuk ke posisi yang sama bisa "mewarisi" track ini (IoU),
+        jadi transaksi baru harus nunggu identifikasi dari frame setelah reset.
+        """
+        self.identified_user: Optional[str] = None
+        self.face_chip = None  # Crop wajah (BGR) yang terakhir diidentifikasi, buat snapshot bukti
+        self.best_face.clear()
+        self.state = STANDBY
+        self.qr_data: Optional[str] = None
+        self.qr_frame = None  # Frame (BGR) tempat QR kebaca, buat snapshot bukti
+        self.challenge = random.choice(CHALLENGES)
+        self.reset_seq = seq  # QR dari frame sebelum reset gak di-bind lagi
+
+    def set_state(self, state: str):
+        if state == self.state: return
+        self.state = state
+        if self.trace is not None: self.trace.state(state)
+
+    @property
+    def busy(self) -> bool:
+        return self.state in BUSY_STATES
+
+    @property
+    def visible(self) -> bool:
+        return self.missed == 0
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return ((self.box[0] + self.box[2]) / 2, (self.box[1] + self.box[3]) / 2)
+
+    def __repr__(self):
+        return f"FaceTrack(#{self.id}, {self.state}, user={self.identified_user}, qr={self.qr_data})"
+
+
+class FaceTracker:
+    def __init__(self, max_tracks: int = 3, max_missed: int = 5, min_iou: float = 0.3,
+                 best_frame_window: float = 1.2, on_drop: Optional[Callable[[FaceTrack], None]] = None):
+        """
+        Args:
+            max_tracks: Maksimal orang yang di-track (samain sama max_num_faces FaceMesh)
+            max_missed: Update berturut-turut wajah gak kelihatan sebelum track dibuang
+            min_iou: IoU minimal box landmark buat dianggap wajah yang sama
+            best_frame_window: Window BestFrameWindow tiap track (detik)
+            on_drop: Dipanggil pas track dibuang (buat nutup trace/transaksi)
+        """
+        self.max_tracks = max_tracks
+        self.max_missed = max_missed
+        self.min_iou = min_iou
+        self.best_frame_window = best_frame_window
+        self.on_drop = on_drop
+        self.tracks: List[FaceTrack] = []
+        self._ids = itertools.count(1)
+
+    def update(self, faces: Sequence, now: Optional[float] = None) -> List[FaceTrack]:
+        """
+        Update track dari hasil FaceMesh 1 frame.
+
+        Args:
+            faces: List landmark per wajah (boleh kosong)
+        """
+        now = time.time() if now is None else now
+        tracks = list(self.tracks)
+        boxes = [landmark_bbox(lms) for lms in faces]
+        matched_t, matched_f = set(), set()
+        for ti, fi in greedy_match([t.box for t in tracks], boxes, self.min_iou):
+            track = tracks[ti]
+            track.lms, track.box, track.missed, track.last_seen = faces[fi], boxes[fi], 0, now
+            matched_t.add(ti); matched_f.add(fi)
+
+        kept = []
+        for ti, track in enumerate(tracks):
+            if ti not in matched_t:
+                track.missed += 1
+                if track.missed > self.max_missed and not track.busy:
+                    self._drop(track)
+                    continue
+            kept.append(track)
+        for fi, lms in enumerate(faces):
+            if fi in matched_f or len(kept) >= self.max_tracks: continue
+            kept.append(FaceTrack(next(self._ids), lms, self.best_frame_window, now))
+        self.tracks = kept  # Replace, bukan mutate: worker yang lagi iterasi tetap pake list lama
+        return kept
+
+    def get(self, track_id: int) -> Optional[FaceTrack]:
+        for track in self.tracks:
+            if track.id == track_id: return track
+        return None
+
+    def assign_boxes(self, boxes: Sequence[Box], min_iou: float = 0.2) -> List[Optional[FaceTrack]]:
+        """Track yang kelihatan buat tiap box deteksi (HOG dll); None kalo gak ada yang cocok"""
+        tracks = [t for t in self.tracks if t.visible]
+        result: List[Optional[FaceTrack]] = [None] * len(boxes)
+        for ti, bi in greedy_match([t.box for t in tracks], boxes, min_iou):
+            result[bi] = tracks[ti]
+        return result
+
+    def nearest(self, point: Tuple[float, float], where: Optional[Callable[[FaceTrack], bool]] = None
+                ) -> Optional[FaceTrack]:
+        """
+        Track kelihatan yang gak lagi transaksi, paling deket ke titik (x, y)
+        ternormalisasi (misal pusat QR). `where` = filter tambahan.
+        """
+        candidates = [t for t in self.tracks if t.visible and not t.busy and (where is None or where(t))]
+        if not candidates: return None
+        return min(candidates, key=lambda t: (t.center[0] - point[0]) ** 2 + (t.center[1] - point[1]) ** 2)
+
+    def set_window(self, window: float):
+        self.best_frame_window = window
+        for track in self.tracks: track.best_face.window = window
+
+    def _drop(self, track: FaceTrack):
+        track.best_face.clear()
+        if self.on_drop: self.on_drop(track)
+
+    def clear(self, keep_busy: bool = False):
+        """Buang semua track (misal masuk idle); keep_busy=True pertahanin yang transaksinya jalan"""
+        kept = []
+        for track in self.tracks:
+            if keep_busy and track.busy: kept.append(track)
+            else: self._drop(track)
+        self.tracks = kept
+
+    @property
+    def busy(self) -> bool:
+        return any(t.busy for t in self.tracks)
+
+    def __len__(self):
+        return len(self.tracks)
+
+
+__all__ = ['STANDBY', 'CHALLENGE', 'PROCESSING_API', 'SUCCESS', 'BUSY_STATES', 'CHALLENGES',
+           'landmark_bbox', 'css_to_box', 'iou', 'greedy_match', 'liveness_moves', 'FaceTrack', 'FaceTracker']
@@ -3,25 +3,187 @@
 Middleware untuk handle CORS dan headers khusus desktop app.
 """
 import functools
+import random
+import threading
+import time
 import requests
-from typing import Dict, Any, Callable, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Callable, Optional, List
 import urllib3
 import json
 
 # Matiin SSL warning
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Default timeout (detik). Connect dibikin pendek biar server mati cepet ketauan.
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+
+# Status yang aman buat di-retry (server lagi sibuk / gateway error)
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Pool koneksi keep-alive. Kiosk cuma ngomong ke 1 host, tapi worker thread bisa
+# nembak barengan (GET + POST + ping), jadi maxsize dibikin sedikit lebih lega.
+DEFAULT_POOL_CONNECTIONS = 2
+DEFAULT_POOL_MAXSIZE = 8
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Dilempar kalo circuit breaker lagi OPEN (request gak dikirim sama sekali)"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker sederhana: CLOSED -> OPEN -> HALF_OPEN -> CLOSED.
+
+    Setelah `failure_threshold` kegagalan berturut-turut, breaker OPEN dan semua
+    request langsung gagal selama `recovery_timeout` detik. Abis itu satu request
+    percobaan (HALF_OPEN) dibolehin lewat buat ngecek server udah hidup lagi.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    @property
+    def state(self) -> str:
+        # Lewat recovery_timeout tetap OPEN; HALF_OPEN baru pas request percobaan beneran dikirim
+        with self._lock:
+            return self._state
+
+    def is_open(self) -> bool:
+        """True sampe ada request percobaan yang sukses (HALF_OPEN masih dianggap offline)"""
+        return self.state != self.CLOSED
+
+    def allow_request(self) -> bool:
+        """Cek apakah request boleh dikirim sekarang"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                return False
+            # Udah lewat recovery_timeout: cuma 1 request percobaan yang boleh lewat
+            now = time.monotonic()
+            if self._probe_started_at is not None and now - self._probe_started_at < self.recovery_timeout:
+                return False
+            self._probe_started_at = now
+            changed = self._set_state(self.HALF_OPEN)
+        if changed: self._notify(self.HALF_OPEN)
+        return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_started_at = None
+            changed = self._set_state(self.CLOSED)
+        if changed: self._notify(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_started_at = None
+            changed = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                changed = self._set_state(self.OPEN)
+        if changed: self._notify(self.OPEN)
+
+    def reset(self):
+        self.record_success()
+
+    def _set_state(self, new_state: str) -> bool:
+        if self._state == new_state: return False
+        self._state = new_state
+        return True
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Callback dipanggil dengan nama state baru tiap kali state berubah"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, state: str):
+        print(f"🔌 Circuit breaker: {state}")
+        for listener in list(self._listeners):
+            try:
+                listener(state)
+            except Exception as e:
+                print(f"⚠️ Error notifying breaker listener: {e}")
+
+
 class DesktopMiddleware:
     """Middleware untuk desktop app dengan headers khusus"""
     
-    def __init__(self):
+    def __init__(self,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_retries: int = 2,
+                 backoff_base: float = 0.25,
+                 backoff_max: float = 2.0,
+                 breaker: Optional[CircuitBreaker] = None,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE):
+        """
+        Args:
+            connect_timeout: Timeout buka koneksi TCP (detik)
+            read_timeout: Timeout nunggu response (detik)
+            max_retries: Jumlah retry maksimal (di luar percobaan pertama)
+            backoff_base: Delay dasar exponential backoff (detik)
+            backoff_max: Batas atas delay backoff (detik)
+            breaker: Circuit breaker (default: bikin baru)
+            pool_connections: Jumlah host yang di-cache pool-nya
+            pool_maxsize: Koneksi keep-alive maksimal per host
+        """
         self.session = requests.Session()
         self.session.verify = False  # Penting untuk localhost
         self._setup_headers()
+        self._mount_adapter(pool_connections, pool_maxsize)
+        
+        # Timeout & retry policy
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
         
         # Setup hooks untuk debugging
         self.request_hook = None
         self.response_hook = None
+        
+        # Keep-alive ping
+        self._last_activity = 0.0
+        self._keepalive_stop: Optional[threading.Event] = None
+        self._keepalive_thread: Optional[threading.Thread] = None
+
+        # Probe recovery: selama breaker OPEN scan gak ngirim request, jadi middleware
+        # nge-ping sendiri tiap recovery_timeout (gak nunggu keep-alive yang bisa dimatiin)
+        self._probe_url: Optional[str] = None
+        self._probe_timer: Optional[threading.Timer] = None
+        self._probe_lock = threading.Lock()
+        self.breaker.add_listener(self._on_breaker_state)
+
+    def _mount_adapter(self, pool_connections: int, pool_maxsize: int):
+        """Pasang HTTPAdapter dengan pool yang di-tune (retry di-handle sendiri di request())"""
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=0, pool_block=False)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def _setup_headers(self):
         """Setup headers dengan Host yang sesuai"""
@@ -91,8 +253,28 @@ class DesktopMiddleware:
         self.session.headers.update(web_headers)
         print("🌐 Applied web-like headers")
     
+    def set_timeouts(self, connect_timeout: float = None, read_timeout: float = None):
+        """Ubah default connect/read timeout"""
+        if connect_timeout is not None: self.connect_timeout = connect_timeout
+        if read_timeout is not None: self.read_timeout = read_timeout
+
+    def _is_retryable(self, method: str, kwargs: Dict[str, Any]) -> bool:
+        """GET selalu aman di-retry, POST cuma kalo ada Idempotency-Key"""
+        if method.upper() in ("GET", "HEAD", "OPTIONS"):
+            return True
+        headers = kwargs.get('headers') or {}
+        return IDEMPOTENCY_HEADER in headers or IDEMPOTENCY_HEADER in self.session.headers
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Exponential backoff dengan full jitter (hormati Retry-After kalo ada)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
     def request(self, method: str, url: str, **kwargs) -> requests.Response:
-        """Wrapper untuk requests dengan middleware"""
+        """Wrapper untuk requests dengan middleware (timeout, retry, circuit breaker)"""
         print(f"\n{'='*50}")
         print(f"🌐 {method} {url}")
         
@@ -110,71 +292,188 @@ class DesktopMiddleware:
         if self.request_hook:
             self.request_hook(method, url, kwargs)
         
-        # Auto tambah timeout kalo ga ada
-        if 'timeout' not in kwargs:
-            kwargs['timeout'] = 15
+        # Auto tambah timeout (connect, read) kalo ga ada
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = (self.connect_timeout, self.read_timeout)
         
-        try:
-            response = self.session.request(method, url, **kwargs)
-            
-            print(f"\n📥 Response Status: {response.status_code}")
-            print(f"📋 Response Headers:")
-            for key, value in response.headers.items():
-                print(f"  {key}: {value}")
+        retryable = self._is_retryable(method, kwargs)
+        attempts = 1 + (self.max_retries if retryable else 0)
+        
+        for attempt in range(attempts):
+            # Fail fast kalo server lagi dianggap mati
+            if not self.breaker.allow_request():
+                print(f"⛔ Circuit breaker OPEN, skip {method} {url}")
+                raise CircuitOpenError(f"Circuit breaker open, server dianggap offline ({url})")
             
-            # Log response body (partial)
+            last_try = attempt == attempts - 1
+            self._last_activity = time.monotonic()
             try:
-                if response.text:
-                    if len(response.text) > 500:
-                        print(f"📄 Response (first 500 chars): {response.text[:500]}...")
-                    else:
-                        print(f"📄 Response: {response.text}")
-            except:
-                pass
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self.breaker.record_failure()
+                if isinstance(e, requests.exceptions.Timeout):
+                    print(f"⏰ Timeout untuk {url} (timeout: {kwargs['timeout']}s)")
+                else:
+                    print(f"🔌 Connection error: {e}")
+                if last_try or self.breaker.is_open(): raise
+                delay = self._backoff_delay(attempt)
+                print(f"🔁 Retry {attempt + 1}/{attempts - 1} dalam {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            except Exception as e:
+                print(f"⚠️ Unexpected error: {type(e).__name__}: {e}")
+                raise
             
-            # Call response hook
-            if self.response_hook:
-                self.response_hook(response)
+            # 5xx dihitung sebagai kegagalan server, 4xx bukan
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
             
-            # Auto-raise untuk error status
-            if response.status_code >= 400:
-                print(f"❌ HTTP Error {response.status_code}")
-                response.raise_for_status()
-            
-            return response
+            if response.status_code in RETRY_STATUS_CODES and not last_try and not self.breaker.is_open():
+                delay = self._backoff_delay(attempt, response)
+                print(f"🔁 HTTP {response.status_code}, retry {attempt + 1}/{attempts - 1} dalam {delay:.2f}s")
+                time.sleep(delay)
+                continue
             
-        except requests.exceptions.Timeout:
-            print(f"⏰ Timeout untuk {url} (timeout: {kwargs.get('timeout', 15)}s)")
-            raise
-        except requests.exceptions.ConnectionError as e:
-            print(f"🔌 Connection error: {e}")
-            raise
-        except requests.exceptions.HTTPError as e:
-            print(f"🚫 HTTP Error: {e}")
-            if hasattr(e, 'response') and e.response is not None:
+            return self._handle_response(response)
+
+    def _handle_response(self, response: requests.Response) -> requests.Response:
+        """Log response, panggil hook, dan raise kalo status error"""
+        print(f"\n📥 Response Status: {response.status_code}")
+        print(f"📋 Response Headers:")
+        for key, value in response.headers.items():
+            print(f"  {key}: {value}")
+        
+        # Log response body (partial)
+        try:
+            if response.text:
+                if len(response.text) > 500:
+                    print(f"📄 Response (first 500 chars): {response.text[:500]}...")
+                else:
+                    print(f"📄 Response: {response.text}")
+        except:
+            pass
+        
+        # Call response hook
+        if self.response_hook:
+            self.response_hook(response)
+        
+        # Auto-raise untuk error status
+        if response.status_code >= 400:
+            print(f"❌ HTTP Error {response.status_code}")
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                print(f"🚫 HTTP Error: {e}")
                 try:
-                    error_data = e.response.json()
+                    error_data = response.json()
                     print(f"📋 Error details: {json.dumps(error_data, indent=2)}")
                 except:
-                    print(f"📋 Error text: {e.response.text[:200]}")
-            raise
-        except Exception as e:
-            print(f"⚠️ Unexpected error: {type(e).__name__}: {e}")
-            raise
+                    print(f"📋 Error text: {response.text[:200]}")
+                raise
+        
+        return response
     
-    def post(self, url: str, data: Dict = None, **kwargs) -> requests.Response:
-        """POST request dengan middleware"""
+    def post(self, url: str, data: Dict = None, idempotency_key: Optional[str] = None, **kwargs) -> requests.Response:
+        """POST request dengan middleware (idempotency_key bikin POST boleh di-retry)"""
+        if idempotency_key:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), IDEMPOTENCY_HEADER: idempotency_key}
         return self.request('POST', url, json=data, **kwargs)
     
     def get(self, url: str, **kwargs) -> requests.Response:
         """GET request dengan middleware"""
         return self.request('GET', url, **kwargs)
     
+    def warm_up(self, base_url: str, background: bool = True) -> Optional[float]:
+        """
+        Buka koneksi TCP ke server duluan biar scan pertama gak bayar connect.
+        
+        Args:
+            base_url: Base URL API
+            background: Jalan di thread terpisah (gak nge-block startup)
+        
+        Returns:
+            float: Latency (detik) kalo sync dan berhasil, selain itu None
+        """
+        if background:
+            threading.Thread(target=self.warm_up, args=(base_url, False), daemon=True).start()
+            return None
+        return self._ping(base_url)
+
+    def _ping(self, base_url: str) -> Optional[float]:
+        """HEAD ringan ke root server. Status apapun = koneksi hidup."""
+        if not self.breaker.allow_request():
+            return None
+        url = f"{base_url.rstrip('/')}/"
+        start = time.perf_counter()
+        try:
+            self.session.head(url, timeout=(self.connect_timeout, 5), allow_redirects=False)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            self.breaker.record_failure()
+            print(f"🔌 Warm-up gagal: {type(e).__name__}")
+            return None
+        self.breaker.record_success()
+        self._last_activity = time.monotonic()
+        return time.perf_counter() - start
+
+    def set_probe_url(self, base_url: str):
+        """Base URL yang di-ping otomatis pas breaker OPEN (None = gak ada probe otomatis)"""
+        self._probe_url = base_url
+        if base_url and self.breaker.is_open(): self._schedule_probe()
+
+    def _on_breaker_state(self, state: str):
+        if state == CircuitBreaker.OPEN: self._schedule_probe()
+
+    def _schedule_probe(self):
+        if not self._probe_url: return
+        timer = threading.Timer(self.breaker.recovery_timeout, self._probe)
+        timer.daemon = True
+        with self._probe_lock:
+            if self._probe_timer is not None: self._probe_timer.cancel()
+            self._probe_timer = timer
+        timer.start()
+
+    def _probe(self):
+        with self._probe_lock:
+            timer = self._probe_timer
+        if not self._probe_url or not self.breaker.is_open(): return
+        self._ping(self._probe_url)
+        # Gagal -> breaker OPEN lagi & listener udah jadwalin timer baru. Kalo probe gak dikirim
+        # (request percobaan lain lagi jalan) atau gak ngubah state, jadwalin ulang di sini.
+        with self._probe_lock:
+            again = self._probe_timer is timer
+        if again and self.breaker.is_open(): self._schedule_probe()
+
+    def start_keepalive(self, base_url: str, interval: float = 30.0):
+        """
+        Ping periodik biar socket idle gak di-drop server/NAT.
+        Ping cuma dikirim kalo gak ada request lain selama `interval` detik.
+        """
+        self.stop_keepalive()
+        stop = threading.Event()
+        
+        def loop():
+            while not stop.wait(interval / 2):
+                if time.monotonic() - self._last_activity >= interval:
+                    self._ping(base_url)
+        
+        self._keepalive_stop = stop
+        self._keepalive_thread = threading.Thread(target=loop, daemon=True)
+        self._keepalive_thread.start()
+        print(f"💓 Keep-alive aktif tiap {interval:.0f}s")
+
+    def stop_keepalive(self):
+        if self._keepalive_stop is not None:
+            self._keepalive_stop.set()
+            self._keepalive_stop = None
+            self._keepalive_thread = None
+
     def test_connection(self, base_url: str) -> bool:
         """Test koneksi ke server"""
         test_url = f"{base_url.rstrip('/')}/"
         try:
-            response = self.get(test_url, timeout=5)
+            response = self.get(test_url, timeout=(self.connect_timeout, 5))
             print(f"✅ Connection test: {response.status_code}")
             return response.status_code < 400
         except Exception as e:
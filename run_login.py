@@ -1,7 +1,6 @@
 # run_login.py
 import sys
 import os
-import subprocess
 import customtkinter as ctk
 from tkinter import messagebox
 
@@ -12,8 +11,10 @@ if project_root not in sys.path:
 
 # Import komponen lokal
 try:
-    from app.auth.login import LoginFrame
+    from app.auth.login import LoginFrame, get_api
     from context.AuthContext import auth_context
+    from lib.auth_manager import AuthManager
+    from lib.preload import Preloader
     print("✅ Module Auth & Login berhasil di-load")
 except ImportError as e:
     print(f"❌ Gagal load module: {e}")
@@ -25,6 +26,18 @@ class LoginApp:
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
         
+        # 🔥 Preload kamera, model & galeri dari sekarang, selagi user ngetik password
+        self.preloader = Preloader(os.path.join(project_root, "assets"), api=get_api()).start()
+        self.root = None
+        self.logged_in = False
+        
+        # Cek apakah sudah ada session aktif (Auto-login logic)
+        # Token expired di session.json langsung dibuang, user disuruh login ulang
+        if AuthManager(auth_context, get_api()).validate_session():
+            print(f"⚡ Session ditemukan untuk {auth_context.get_username()}, langsung gaskeun!")
+            self.logged_in = True
+            return
+        
         # Inisialisasi Root Window
         self.root = ctk.CTk()
         self.root.title("🔐 SIMPEL - Secure Login")
@@ -32,12 +45,6 @@ class LoginApp:
         
         # Bikin window di tengah layar
         self._center_window(500, 650)
-        
-        # Cek apakah sudah ada session aktif (Auto-login logic)
-        if auth_context.is_authenticated():
-            print(f"⚡ Session ditemukan untuk {auth_context.get_username()}, langsung gaskeun!")
-            self.root.after(100, self.launch_main_app)
-            return
 
         # Tampilkan Frame Login
         self.login_frame = LoginFrame(self.root, on_login_success=self.handle_login_success)
@@ -65,41 +72,35 @@ class LoginApp:
         print(f"🔑 Token persistent sudah aman di session.json")
         print("="*50)
         
-        # Tutup window login dan buka app utama
+        # Tutup window login, scanner dibuka di proses yang sama setelah mainloop selesai
+        self.logged_in = True
         self.root.destroy()
-        self.launch_main_app()
 
     def launch_main_app(self):
-        """Membuka main.py sebagai proses baru biar fresh"""
+        """Buka scanner di proses yang sama, pake resource hasil preload"""
         print("\n🚀 Launching main application...")
         
-        main_path = os.path.join(project_root, "main.py")
-        
-        if not os.path.exists(main_path):
-            messagebox.showerror("Error", f"File {main_path} tidak ditemukan!")
-            return
-
         try:
-            # Kita pake subprocess.Popen supaya script ini (run_login) bisa beneran close
-            # dan script main.py jalan di environment Python yang sama (venv)
-            python_executable = sys.executable
-            subprocess.Popen([python_executable, main_path])
-            
-            print("✅ Main scanner app started. Closing login process...")
-            sys.exit(0)
-            
+            # Import di sini: modul berat udah di-import preloader, jadi murah
+            from Main import AppSIMPEL
+            app = AppSIMPEL(preloaded=self.preloader)
+            app.mainloop()
         except Exception as e:
             print(f"❌ Gagal buka main app: {e}")
+            self.preloader.release()
             messagebox.showerror("Launch Error", f"Gagal buka scanner:\n{str(e)}")
 
     def run(self):
-        self.root.mainloop()
+        if self.root is not None:
+            self.root.mainloop()
+        if self.logged_in:
+            self.launch_main_app()
+        else:
+            self.preloader.release()
 
 if __name__ == "__main__":
     try:
         app = LoginApp()
-        # Kalo root masih ada (gak langsung auto-login), jalanin mainloop
-        if hasattr(app, 'root') and app.root.winfo_exists():
-            app.run()
+        app.run()
     except KeyboardInterrupt:
         print("\n👋 App closed by user")
\ No newline at end of file